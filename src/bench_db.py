@@ -0,0 +1,232 @@
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+
+from db_simulada import FabricaSimulada
+from guardarDb import CONFIG_DB, MODO_FILA, MODO_LOTES, MODO_UPSERT, ScraperDatabaseError, SubidorDeBaseDeDatos
+from salida import EscritorJSONL
+from sitio_simulado import DatosSinteticos
+
+# Consultas medidas: (nombre, SQL válido en MySQL y en la base simulada)
+CONSULTAS = (
+    ("expediente por número",
+     "SELECT id, situacion_actual FROM expedientes WHERE expediente = %s"),
+    ("movimientos de un expediente entre fechas",
+     "SELECT fecha, detalle FROM movimientos WHERE expediente_id = %s AND fecha BETWEEN %s AND %s ORDER BY fecha"),
+    ("movimientos de un año",
+     "SELECT COUNT(*) FROM movimientos WHERE fecha BETWEEN %s AND %s"),
+    ("participante por tipo y nombre",
+     "SELECT p.expediente_id FROM participantes p "
+     "WHERE p.tipo_id = (SELECT id FROM tipos_participante WHERE nombre = %s) AND p.nombre = %s"),
+)
+
+def generar_archivo(args, ruta):
+    """
+    Escribe los expedientes sintéticos en un archivo JSONL.
+
+    Returns:
+        list: Expedientes generados, para armar los parámetros de las consultas
+    """
+    datos = DatosSinteticos(args.expedientes, args.movimientos, args.participantes, args.semilla)
+    escritor = EscritorJSONL(ruta, fsync_segundos=None)
+    casos = []
+    try:
+        for indice in range(args.expedientes):
+            caso = datos.expediente(indice, "benchmark", "10")
+            escritor.escribir(caso)
+            casos.append(caso)
+    finally:
+        escritor.cerrar()
+    return casos
+
+def preparar_mysql(vaciar):
+    """
+    Migra la base de CONFIG_DB y comprueba que esté vacía (o la vacía).
+
+    Args:
+        vaciar (bool): Borrar los expedientes, movimientos y participantes existentes
+    """
+    subidor = SubidorDeBaseDeDatos(CONFIG_DB)
+    subidor.migrar_esquema()
+    subidor._conectar()
+    cursor = subidor.conexion.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM expedientes")
+        (existentes,) = cursor.fetchone()
+        if existentes and not vaciar:
+            print(f"La base {CONFIG_DB['base_de_datos']} ya tiene {existentes} expedientes; "
+                  f"usar --vaciar sobre una base de prueba para medir desde cero.")
+            sys.exit(1)
+        if existentes:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            for tabla in ("participantes", "movimientos", "expedientes"):
+                cursor.execute(f"TRUNCATE TABLE {tabla}")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    finally:
+        cursor.close()
+        subidor.cerrar()
+
+def medir_carga(args, archivo, diferir, fabrica):
+    """
+    Carga el archivo y mide el tiempo total, incluida la construcción de índices diferidos.
+
+    Returns:
+        dict: Segundos, expedientes por segundo y filas insertadas por tabla
+    """
+    subidor = SubidorDeBaseDeDatos(CONFIG_DB, fabrica_conexion=fabrica)
+    inicio = time.perf_counter()
+    if diferir:
+        with SubidorDeBaseDeDatos(CONFIG_DB, fabrica_conexion=fabrica).indices_diferidos():
+            resumen = subidor.subir_expedientes(archivo, modo=args.modo, tamano_lote=args.tamano_lote,
+                                                usar_infile=args.infile)
+    else:
+        resumen = subidor.subir_expedientes(archivo, modo=args.modo, tamano_lote=args.tamano_lote,
+                                            usar_infile=args.infile)
+    segundos = time.perf_counter() - inicio
+    return {
+        "segundos": segundos,
+        "exp_por_s": args.expedientes / segundos if segundos else 0.0,
+        "filas": {tabla: conteo["insertados"] for tabla, conteo in resumen.items()},
+    }
+
+def parametros_de_consultas(casos, ids, azar):
+    """
+    Arma los parámetros de cada consulta a partir de los datos cargados.
+
+    Returns:
+        dict: Función que devuelve parámetros al azar, por nombre de consulta
+    """
+    participantes = [("ACTOR", nombre) for caso in casos for nombre in caso["actores"]]
+    participantes += [("DEMANDADO", nombre) for caso in casos for nombre in caso["demandados"]]
+
+    def rango_de_fechas():
+        anio = azar.randint(2010, 2024)
+        return f"{anio}-01-01", f"{anio}-12-31"
+
+    return {
+        CONSULTAS[0][0]: lambda: (azar.choice(casos)["expediente"],),
+        CONSULTAS[1][0]: lambda: (azar.choice(ids),) + rango_de_fechas(),
+        CONSULTAS[2][0]: rango_de_fechas,
+        CONSULTAS[3][0]: lambda: azar.choice(participantes),
+    }
+
+def plan(cursor, consulta, parametros, mysql):
+    """
+    Devuelve un resumen del plan de ejecución: índices usados y, en MySQL, particiones leídas.
+    """
+    if not mysql:
+        cursor.execute("EXPLAIN QUERY PLAN " + consulta, parametros)
+        return "; ".join(fila[-1] for fila in cursor.fetchall())
+    cursor.execute("EXPLAIN " + consulta, parametros)
+    columnas = [descripcion[0] for descripcion in cursor.description]
+    pasos = []
+    for fila in cursor.fetchall():
+        paso = dict(zip(columnas, fila))
+        pasos.append(f"{paso['table']}: índice {paso['key'] or 'ninguno'}, particiones {paso['partitions'] or '-'}")
+    return "; ".join(pasos)
+
+def medir_consultas(args, casos, fabrica):
+    """
+    Ejecuta cada consulta con parámetros al azar y mide su latencia.
+
+    Returns:
+        list: Nombre, tiempos en segundos, filas promedio y plan de cada consulta
+    """
+    subidor = SubidorDeBaseDeDatos(CONFIG_DB, fabrica_conexion=fabrica)
+    subidor._conectar()
+    cursor = subidor.conexion.cursor()
+    resultados = []
+    try:
+        cursor.execute("SELECT id FROM expedientes")
+        ids = [expediente_id for (expediente_id,) in cursor.fetchall()]
+        generadores = parametros_de_consultas(casos, ids, random.Random(args.semilla))
+        for nombre, consulta in CONSULTAS:
+            tiempos, filas = [], 0
+            for _ in range(args.repeticiones):
+                parametros = generadores[nombre]()
+                inicio = time.perf_counter()
+                cursor.execute(consulta, parametros)
+                filas += len(cursor.fetchall())
+                tiempos.append(time.perf_counter() - inicio)
+            resultados.append({
+                "consulta": nombre,
+                "tiempos": tiempos,
+                "filas": filas / args.repeticiones,
+                "plan": plan(cursor, consulta, generadores[nombre](), fabrica is None),
+            })
+    finally:
+        cursor.close()
+        subidor.cerrar()
+    return resultados
+
+def main():
+    """
+    Mide la carga y las consultas frecuentes sobre el esquema de la base.
+
+    Genera expedientes sintéticos, los carga con y sin índices diferidos y mide
+    las búsquedas por número de expediente, por expediente y rango de fechas,
+    por año y por participante. Usa SQLite en memoria salvo que se indique
+    --mysql, que migra y usa la base de CONFIG_DB (por ejemplo, un contenedor
+    local con DB_HOST=127.0.0.1).
+
+    Uso: python bench_db.py [--expedientes 5000] [--mysql --vaciar] [--repeticiones 200]
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de carga y consultas de la base de expedientes")
+    parser.add_argument("--expedientes", type=int, default=2000)
+    parser.add_argument("--movimientos", type=int, default=30, help="Movimientos promedio por expediente")
+    parser.add_argument("--participantes", type=int, default=4)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--modo", choices=[MODO_FILA, MODO_LOTES, MODO_UPSERT], default=MODO_LOTES)
+    parser.add_argument("--tamano-lote", type=int, default=1000)
+    parser.add_argument("--infile", action="store_true",
+                        help="Cargar movimientos y participantes con LOAD DATA LOCAL INFILE (solo MySQL)")
+    parser.add_argument("--repeticiones", type=int, default=200, help="Ejecuciones de cada consulta")
+    parser.add_argument("--mysql", action="store_true", help="Medir sobre la base de CONFIG_DB en lugar de SQLite")
+    parser.add_argument("--vaciar", action="store_true",
+                        help="Con --mysql, borrar los expedientes existentes antes de cada carga")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-db-") as directorio:
+        original = os.path.join(directorio, "expedientes.jsonl")
+        casos = generar_archivo(args, original)
+
+        for diferir in (False, True):
+            # La carga elimina el archivo al terminar: cada variante usa una copia
+            archivo = os.path.join(directorio, f"carga-{int(diferir)}.jsonl")
+            shutil.copyfile(original, archivo)
+            fabrica = None
+            try:
+                if args.mysql:
+                    preparar_mysql(args.vaciar)
+                else:
+                    fabrica = FabricaSimulada()
+                carga = medir_carga(args, archivo, diferir, fabrica)
+            except ScraperDatabaseError as e:
+                print(f"No se pudo cargar la base: {e}")
+                sys.exit(1)
+
+            variante = "índices diferidos" if diferir else "con índices"
+            filas = ", ".join(f"{tabla} {cantidad}" for tabla, cantidad in carga["filas"].items())
+            print(f"\nCarga '{args.modo}' {variante}: {carga['segundos']:.2f} s "
+                  f"({carga['exp_por_s']:.0f} exp/s) | {filas}")
+
+            if diferir:
+                # Las consultas se miden una vez, con todos los índices construidos
+                for resultado in medir_consultas(args, casos, fabrica):
+                    tiempos = sorted(resultado["tiempos"])
+                    print(
+                        f"  {resultado['consulta']:<45} mediana {statistics.median(tiempos) * 1000:7.2f} ms"
+                        f"  p95 {tiempos[int(len(tiempos) * 0.95) - 1] * 1000:7.2f} ms"
+                        f"  filas {resultado['filas']:8.1f}"
+                    )
+                    print(f"    plan: {resultado['plan']}")
+            if fabrica:
+                fabrica.base.cerrar_definitivamente()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import glob
+import time
+import argparse
+import pathlib
+import statistics
+
+from navegador import ConfiguracionNavegador, crear_driver
+from scraper import MOTOR_ELEMENTOS, MOTOR_HTML, MOTOR_SCRIPT, extraer_datos_expediente
+
+def crear_driver_headless():
+    """
+    Crea un driver de Chrome sin interfaz gráfica para las mediciones.
+    """
+    return crear_driver(ConfiguracionNavegador(headless=True))
+
+def medir_motor(driver, url, motor, repeticiones):
+    """
+    Carga el fixture y mide el tiempo de extracción de un motor.
+
+    Args:
+        driver: Instancia del webdriver
+        url (str): URL del fixture
+        motor (str): Motor de extracción a medir
+        repeticiones (int): Cantidad de mediciones
+
+    Returns:
+        tuple: (tiempos en segundos, datos extraídos en la última medición)
+    """
+    tiempos = []
+    datos = None
+    for _ in range(repeticiones):
+        driver.get(url)
+        inicio = time.perf_counter()
+        datos = extraer_datos_expediente(driver, motor)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos, datos
+
+def main():
+    """
+    Compara los motores de extracción sobre páginas de expediente guardadas.
+
+    Uso: python bench_extraccion.py [fixtures...] [--repeticiones N]
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de extracción")
+    parser.add_argument("fixtures", nargs="*", help="Archivos HTML de expedientes guardados")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    fixtures = args.fixtures or sorted(
+        glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "*.html"))
+    )
+    if not fixtures:
+        print("No se encontraron fixtures para medir.")
+        sys.exit(1)
+
+    driver = crear_driver_headless()
+    try:
+        for fixture in fixtures:
+            url = pathlib.Path(fixture).resolve().as_uri()
+            print(f"\n{os.path.basename(fixture)}")
+
+            resultados = {}
+            for motor in (MOTOR_ELEMENTOS, MOTOR_SCRIPT, MOTOR_HTML):
+                tiempos, datos = medir_motor(driver, url, motor, args.repeticiones)
+                resultados[motor] = datos
+                print(
+                    f"  {motor:<10} mediana {statistics.median(tiempos) * 1000:8.1f} ms"
+                    f"  mín {min(tiempos) * 1000:8.1f} ms"
+                    f"  movimientos {len(datos['registros_tabla'])}"
+                )
+
+            referencia = resultados[MOTOR_ELEMENTOS]
+            for motor in (MOTOR_SCRIPT, MOTOR_HTML):
+                estado = "idénticos" if resultados[motor] == referencia else "DIFERENTES"
+                print(f"  datos de '{motor}' frente a '{MOTOR_ELEMENTOS}': {estado}")
+    finally:
+        driver.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from db_simulada import FabricaSimulada
+from esperas import limitador, telemetria
+from guardarDb import CONFIG_DB, MODO_FILA, MODO_LOTES, MODO_UPSERT, SubidorDeBaseDeDatos
+from instrumentacion import metricas
+import navegador
+from memoria import MuestreadorDeMemoria, formatear_bytes, rss_maximo_propio
+from salida import EscritorJSONL, cerrar_escritores, registrar_escritor
+from scraper import (
+    JURISDICCION_BUSQUEDA,
+    MOTOR_ELEMENTOS,
+    MOTOR_HTML,
+    MOTOR_HTTP,
+    MOTOR_SCRIPT,
+    TERMINO_BUSQUEDA,
+    buscar_parte,
+    navegar_y_extraer,
+    ruta_salida,
+)
+from sitio_simulado import DatosSinteticos, SitioSimulado
+
+def medir_corrida(args, motor, directorio):
+    """
+    Ejecuta una corrida completa contra el sitio simulado y mide cada fase.
+
+    Fases: búsqueda (formulario y resultados), extracción (todas las páginas
+    con el motor indicado, escribiendo JSONL) y carga en la base.
+
+    Args:
+        args (argparse.Namespace): Opciones del benchmark
+        motor (str): Motor de extracción de la vista de detalle
+        directorio (str): Directorio temporal para la salida intermedia
+
+    Returns:
+        dict: Tiempos por fase, rendimiento y memoria
+    """
+    datos = DatosSinteticos(args.expedientes, args.movimientos, args.participantes, args.semilla)
+    sitio = SitioSimulado(datos=datos, por_pagina=args.por_pagina, latencia=args.latencia)
+    sitio.iniciar_en_segundo_plano()
+
+    archivo = os.path.join(directorio, f"expedientes.{motor}.jsonl")
+    registrar_escritor(ruta_salida(), EscritorJSONL(archivo))
+
+    telemetria.reiniciar()
+    metricas.reiniciar()
+    limitador.configurar(minimo=args.pausa_minima)
+    inicio = time.perf_counter()
+    driver = navegador.crear_driver()
+    resultado_inicio = time.perf_counter() - inicio
+    muestreador = MuestreadorDeMemoria(driver.service.process.pid)
+    muestreador.start()
+    resultado = {"motor": motor, "inicio_navegador_s": resultado_inicio}
+
+    try:
+        inicio = time.perf_counter()
+        buscar_parte(driver, TERMINO_BUSQUEDA, JURISDICCION_BUSQUEDA, url=sitio.url, resolver_captcha=None)
+        resultado["busqueda_s"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        extraidos = navegar_y_extraer(driver, motor)
+        resultado["extraccion_s"] = time.perf_counter() - inicio
+        resultado["extraidos"] = extraidos
+    finally:
+        cerrar_escritores()
+        resultado["rss_navegador_pico"] = muestreador.detener()
+        navegador.cerrar_driver(driver)
+        sitio.shutdown()
+        sitio.server_close()
+
+    resultado["solicitudes_http"] = sitio.solicitudes
+    resultado["esperas"] = telemetria.resumen()
+    resultado["exp_por_s"] = extraidos / resultado["extraccion_s"] if resultado["extraccion_s"] else 0.0
+
+    fabrica = None if args.mysql else FabricaSimulada()
+    subidor = SubidorDeBaseDeDatos(CONFIG_DB, fabrica_conexion=fabrica)
+    inicio = time.perf_counter()
+    resumen = subidor.subir_expedientes(archivo, modo=args.modo_db, tamano_lote=args.tamano_lote)
+    resultado["carga_s"] = time.perf_counter() - inicio
+    resultado["filas_cargadas"] = {tabla: conteo["insertados"] for tabla, conteo in resumen.items()}
+    if fabrica:
+        fabrica.base.cerrar_definitivamente()
+
+    resultado["total_s"] = resultado["busqueda_s"] + resultado["extraccion_s"] + resultado["carga_s"]
+    resultado["rss_python_pico"] = rss_maximo_propio()
+    resultado["operaciones"] = metricas.resumen()
+    return resultado
+
+def imprimir_resultado(resultado, esperados):
+    print(
+        f"{resultado['motor']:>10}: {resultado['extraidos']}/{esperados} expedientes, "
+        f"{resultado['exp_por_s']:.2f} exp/s | inicio del navegador {resultado['inicio_navegador_s']:.2f} s, búsqueda {resultado['busqueda_s']:.2f} s, "
+        f"extracción {resultado['extraccion_s']:.2f} s, carga {resultado['carga_s']:.2f} s | "
+        f"RSS navegador {formatear_bytes(resultado['rss_navegador_pico'])}, "
+        f"Python {formatear_bytes(resultado['rss_python_pico'])} | "
+        f"{resultado['solicitudes_http']} solicitudes"
+    )
+
+def main():
+    """
+    Benchmark de extremo a extremo contra el sitio simulado del PJN.
+
+    Levanta el sitio local, ejecuta búsqueda, paginación, extracción y carga
+    para cada motor, y muestra expedientes por segundo, tiempos por fase y el
+    pico de memoria del navegador y de Python. No requiere CAPTCHA ni acceso
+    a la red; la carga usa SQLite en memoria salvo que se indique --mysql.
+
+    Uso: python benchmark.py [--motor script --motor http] [--expedientes 200] [--json resultados.json]
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo con el sitio simulado")
+    parser.add_argument("--motor", action="append",
+                        choices=[MOTOR_SCRIPT, MOTOR_HTML, MOTOR_ELEMENTOS, MOTOR_HTTP],
+                        help="Motor a medir; puede repetirse (por defecto, todos)")
+    parser.add_argument("--expedientes", type=int, default=100)
+    parser.add_argument("--por-pagina", type=int, default=10)
+    parser.add_argument("--movimientos", type=int, default=30, help="Movimientos promedio por expediente")
+    parser.add_argument("--participantes", type=int, default=4)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Demora del sitio por respuesta en segundos")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--pausa-minima", type=float, default=0.0,
+                        help="Pausa mínima del limitador adaptativo entre solicitudes")
+    parser.add_argument("--modo-db", choices=[MODO_FILA, MODO_LOTES, MODO_UPSERT], default=MODO_LOTES)
+    parser.add_argument("--tamano-lote", type=int, default=1000)
+    parser.add_argument("--mysql", action="store_true", help="Cargar en la base de CONFIG_DB en lugar de SQLite")
+    parser.add_argument("--json", help="Archivo donde guardar los resultados")
+    navegador.agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    config = navegador.configurar(args)
+    # Las mediciones se hacen sin interfaz gráfica, salvo que se use el daemon
+    config.headless = True
+
+    motores = args.motor or [MOTOR_ELEMENTOS, MOTOR_HTML, MOTOR_SCRIPT, MOTOR_HTTP]
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as directorio:
+        for motor in motores:
+            resultado = medir_corrida(args, motor, directorio)
+            imprimir_resultado(resultado, args.expedientes)
+            telemetria.imprimir()
+            metricas.imprimir()
+            resultados.append(resultado)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump({"parametros": vars(args), "resultados": resultados}, archivo, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from extraccion import ErrorDeExtraccion, parsear_detalle, parsear_intervinientes
+from salida import EscritorJSONL, ruta_derivada
+
+# Extensiones de los objetos según la compresión
+EXTENSIONES_OBJETO = {
+    "gzip": ".html.gz",
+    "zstd": ".html.zst",
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS objetos (
+    hash TEXT PRIMARY KEY,
+    ruta TEXT NOT NULL,
+    tamano INTEGER NOT NULL,
+    tamano_comprimido INTEGER NOT NULL,
+    ultimo_acceso REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objetos_acceso ON objetos (ultimo_acceso);
+
+CREATE TABLE IF NOT EXISTS capturas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    expediente TEXT,
+    capturado_en REAL NOT NULL,
+    motor TEXT,
+    hash_detalle TEXT NOT NULL REFERENCES objetos (hash),
+    hash_intervinientes TEXT REFERENCES objetos (hash)
+);
+CREATE INDEX IF NOT EXISTS capturas_expediente ON capturas (expediente, capturado_en);
+CREATE INDEX IF NOT EXISTS capturas_detalle ON capturas (hash_detalle);
+CREATE INDEX IF NOT EXISTS capturas_intervinientes ON capturas (hash_intervinientes);
+"""
+
+# Cache usada por el scraper durante la corrida (ver activar_cache)
+_cache = None
+
+class ErrorDeCache(Exception):
+    """Excepción para objetos de la cache que faltan o no pueden leerse."""
+    pass
+
+def _comprimir(datos, compresion):
+    if compresion == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(datos)
+    return gzip.compress(datos, compresslevel=6)
+
+def leer_objeto(directorio, ruta):
+    """
+    Lee y descomprime un objeto de la cache sin pasar por el índice.
+
+    Args:
+        directorio (str): Directorio de la cache
+        ruta (str): Ruta del objeto, relativa al directorio
+
+    Returns:
+        str: HTML del objeto
+    """
+    try:
+        with open(os.path.join(directorio, ruta), "rb") as archivo:
+            datos = archivo.read()
+    except OSError as e:
+        raise ErrorDeCache(f"No se pudo leer el objeto {ruta}: {e}")
+    if ruta.endswith(".zst"):
+        if zstandard is None:
+            raise ErrorDeCache("Leer objetos zstd requiere el paquete 'zstandard'")
+        datos = zstandard.ZstdDecompressor().decompress(datos)
+    else:
+        datos = gzip.decompress(datos)
+    return datos.decode("utf-8")
+
+class CacheHTML:
+    """
+    Cache de las respuestas HTML de cada expediente, direccionada por contenido.
+
+    Cada página se guarda comprimida una sola vez, con el SHA-256 de su
+    contenido como nombre ('objetos/ab/abcd....html.gz'). Un índice SQLite
+    registra cada visita a un expediente (número, fecha de captura y los
+    objetos de la vista de detalle y de intervinientes) y el último acceso a
+    cada objeto. Si se indica un tamaño máximo, se eliminan los objetos usados
+    hace más tiempo (LRU) junto con las capturas que los referencian.
+    """
+
+    def __init__(self, directorio="src/cache_html", limite_bytes=None, compresion="gzip"):
+        """
+        Args:
+            directorio (str): Directorio de la cache
+            limite_bytes (int): Tamaño máximo de los objetos comprimidos (None: sin límite)
+            compresion (str): 'gzip' o 'zstd' (requiere el paquete 'zstandard')
+        """
+        if compresion not in EXTENSIONES_OBJETO:
+            raise ErrorDeCache(f"Compresión no soportada: {compresion}")
+        if compresion == "zstd" and zstandard is None:
+            raise ErrorDeCache("La compresión zstd requiere el paquete 'zstandard'")
+
+        self.directorio = directorio
+        self.limite_bytes = limite_bytes
+        self.compresion = compresion
+        os.makedirs(os.path.join(directorio, "objetos"), exist_ok=True)
+
+        self._conexion = sqlite3.connect(os.path.join(directorio, "indice.db"), check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+        self._lock = threading.Lock()
+        self.tamano_total = self._conexion.execute(
+            "SELECT COALESCE(SUM(tamano_comprimido), 0) FROM objetos"
+        ).fetchone()[0]
+
+    def _guardar_objeto(self, html, ahora):
+        datos = html.encode("utf-8")
+        clave = hashlib.sha256(datos).hexdigest()
+
+        existente = self._conexion.execute("SELECT 1 FROM objetos WHERE hash = ?", (clave,)).fetchone()
+        if existente:
+            self._conexion.execute("UPDATE objetos SET ultimo_acceso = ? WHERE hash = ?", (ahora, clave))
+            return clave
+
+        ruta = os.path.join("objetos", clave[:2], clave + EXTENSIONES_OBJETO[self.compresion])
+        destino = os.path.join(self.directorio, ruta)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        comprimido = _comprimir(datos, self.compresion)
+
+        # Escritura atómica: un objeto nunca queda a medio escribir
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(comprimido)
+        os.replace(temporal, destino)
+
+        self._conexion.execute(
+            "INSERT INTO objetos (hash, ruta, tamano, tamano_comprimido, ultimo_acceso) VALUES (?, ?, ?, ?, ?)",
+            (clave, ruta, len(datos), len(comprimido), ahora)
+        )
+        self.tamano_total += len(comprimido)
+        return clave
+
+    def guardar_visita(self, html_detalle, html_intervinientes=None, expediente=None, motor=None):
+        """
+        Guarda las páginas de una visita a un expediente.
+
+        Args:
+            html_detalle (str): HTML de la vista de detalle
+            html_intervinientes (str): HTML (o fragmento AJAX) de la pestaña Intervinientes
+            expediente (str): Número de expediente, si pudo extraerse
+            motor (str): Motor de extracción usado en la captura
+
+        Returns:
+            int: Id de la captura
+        """
+        ahora = time.time()
+        with self._lock, self._conexion:
+            hash_detalle = self._guardar_objeto(html_detalle, ahora)
+            hash_intervinientes = (
+                self._guardar_objeto(html_intervinientes, ahora) if html_intervinientes else None
+            )
+            cursor = self._conexion.execute(
+                "INSERT INTO capturas (expediente, capturado_en, motor, hash_detalle, hash_intervinientes) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (expediente, ahora, motor, hash_detalle, hash_intervinientes)
+            )
+            if self.limite_bytes and self.tamano_total > self.limite_bytes:
+                self._desalojar(protegidos={hash_detalle, hash_intervinientes})
+            return cursor.lastrowid
+
+    def _desalojar(self, protegidos=()):
+        """
+        Elimina los objetos usados hace más tiempo hasta bajar al 90 % del límite.
+        """
+        objetivo = int(self.limite_bytes * 0.9)
+        candidatos = self._conexion.execute(
+            "SELECT hash, ruta, tamano_comprimido FROM objetos ORDER BY ultimo_acceso"
+        )
+        eliminados = []
+        for clave, ruta, tamano in candidatos.fetchall():
+            if self.tamano_total <= objetivo:
+                break
+            if clave in protegidos:
+                continue
+            eliminados.append((clave,))
+            self.tamano_total -= tamano
+            try:
+                os.remove(os.path.join(self.directorio, ruta))
+            except FileNotFoundError:
+                pass
+
+        if eliminados:
+            self._conexion.executemany("DELETE FROM capturas WHERE hash_detalle = ?", eliminados)
+            self._conexion.executemany(
+                "UPDATE capturas SET hash_intervinientes = NULL WHERE hash_intervinientes = ?", eliminados
+            )
+            self._conexion.executemany("DELETE FROM objetos WHERE hash = ?", eliminados)
+        return len(eliminados)
+
+    def leer(self, clave):
+        """
+        Devuelve el HTML de un objeto y actualiza su último acceso.
+        """
+        with self._lock, self._conexion:
+            fila = self._conexion.execute("SELECT ruta FROM objetos WHERE hash = ?", (clave,)).fetchone()
+            if fila is None:
+                raise ErrorDeCache(f"Objeto inexistente: {clave}")
+            self._conexion.execute("UPDATE objetos SET ultimo_acceso = ? WHERE hash = ?", (time.time(), clave))
+        return leer_objeto(self.directorio, fila[0])
+
+    def capturas(self, expediente):
+        """
+        Returns:
+            list: (id, capturado_en, hash_detalle, hash_intervinientes) del expediente, de la más reciente a la más antigua
+        """
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT id, capturado_en, hash_detalle, hash_intervinientes FROM capturas "
+                "WHERE expediente = ? ORDER BY capturado_en DESC",
+                (expediente,)
+            ).fetchall()
+
+    def visitas_a_reextraer(self, todas=False):
+        """
+        Lista las visitas a re-extraer con las rutas de sus objetos.
+
+        Args:
+            todas (bool): Incluir todas las capturas; por defecto, solo la más
+                reciente de cada expediente (y las que no tienen número)
+
+        Returns:
+            list: Tuplas (id, ruta_detalle, ruta_intervinientes)
+        """
+        filtro = "" if todas else (
+            "WHERE c.expediente IS NULL OR c.id IN "
+            "(SELECT MAX(id) FROM capturas WHERE expediente IS NOT NULL GROUP BY expediente)"
+        )
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT c.id, d.ruta, i.ruta FROM capturas c "
+                "JOIN objetos d ON d.hash = c.hash_detalle "
+                "LEFT JOIN objetos i ON i.hash = c.hash_intervinientes "
+                f"{filtro} ORDER BY c.id"
+            ).fetchall()
+
+    def estadisticas(self):
+        with self._lock:
+            objetos, tamano, comprimido = self._conexion.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamano), 0), COALESCE(SUM(tamano_comprimido), 0) FROM objetos"
+            ).fetchone()
+            capturas, expedientes = self._conexion.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT expediente) FROM capturas"
+            ).fetchone()
+        return {
+            "objetos": objetos,
+            "bytes": tamano,
+            "bytes_comprimidos": comprimido,
+            "capturas": capturas,
+            "expedientes": expedientes,
+        }
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+def activar_cache(directorio, limite_mb=None, compresion="gzip"):
+    """
+    Activa la captura de páginas de expediente durante la corrida.
+
+    Returns:
+        CacheHTML: La cache activa
+    """
+    global _cache
+    limite = int(limite_mb * 1024 * 1024) if limite_mb else None
+    _cache = CacheHTML(directorio, limite, compresion)
+    return _cache
+
+def cache_activa():
+    """Devuelve la cache activa o None si la captura está desactivada."""
+    return _cache
+
+def cerrar_cache():
+    global _cache
+    if _cache is not None:
+        _cache.cerrar()
+        _cache = None
+
+def _reextraer_visita(parametros):
+    """
+    Re-extrae una visita desde sus objetos (se ejecuta en un proceso del pool).
+
+    Returns:
+        tuple: (id de la captura, datos o None, error o None)
+    """
+    directorio, id_captura, ruta_detalle, ruta_intervinientes = parametros
+    try:
+        datos = parsear_detalle(leer_objeto(directorio, ruta_detalle))
+        if ruta_intervinientes:
+            actores, demandados = parsear_intervinientes(leer_objeto(directorio, ruta_intervinientes))
+        else:
+            actores, demandados = parsear_intervinientes(leer_objeto(directorio, ruta_detalle))
+        datos["actores"] = actores
+        datos["demandados"] = demandados
+        return id_captura, datos, None
+    except (ErrorDeExtraccion, ErrorDeCache, ValueError) as e:
+        return id_captura, None, f"{type(e).__name__}: {e}"
+
+def reextraer(directorio, destino, procesos=None, todas=False, tamano_bloque=64):
+    """
+    Vuelve a extraer los expedientes de la cache, sin acceder al sitio.
+
+    Las visitas se reparten entre procesos; cada uno lee y parsea sus objetos
+    de forma independiente. Los expedientes se escriben en 'destino' (JSONL) y
+    las visitas que no pueden interpretarse, en '<destino>.rechazados.jsonl'.
+
+    Args:
+        directorio (str): Directorio de la cache
+        destino (str): Archivo JSONL de salida
+        procesos (int): Procesos del pool (por defecto, uno por CPU)
+        todas (bool): Re-extraer todas las capturas y no solo la última de cada expediente
+        tamano_bloque (int): Visitas por tarea enviada a cada proceso
+
+    Returns:
+        tuple: (expedientes extraídos, visitas rechazadas)
+    """
+    cache = CacheHTML(directorio)
+    try:
+        visitas = cache.visitas_a_reextraer(todas)
+    finally:
+        cache.cerrar()
+
+    extraidos = rechazados = 0
+    escritor_rechazos = None
+    with EscritorJSONL(destino) as escritor, ProcessPoolExecutor(max_workers=procesos) as pool:
+        parametros = ((directorio,) + tuple(visita) for visita in visitas)
+        for id_captura, datos, error in pool.map(_reextraer_visita, parametros, chunksize=tamano_bloque):
+            if datos is not None:
+                escritor.escribir(datos)
+                extraidos += 1
+                continue
+            if escritor_rechazos is None:
+                escritor_rechazos = EscritorJSONL(ruta_derivada(destino, "rechazados"))
+            escritor_rechazos.escribir({"captura": id_captura, "motivo": error})
+            rechazados += 1
+    if escritor_rechazos:
+        escritor_rechazos.cerrar()
+    return extraidos, rechazados
+
+def main():
+    """
+    Administra la cache de páginas HTML.
+
+    Uso:
+        python cache_html.py reextraer --cache src/cache_html --salida src/expedientes.reextraidos.jsonl
+        python cache_html.py estadisticas --cache src/cache_html
+    """
+    parser = argparse.ArgumentParser(description="Cache de páginas HTML de expedientes")
+    parser.add_argument("accion", choices=["reextraer", "estadisticas"])
+    parser.add_argument("--cache", default=os.path.join("src", "cache_html"), help="Directorio de la cache")
+    parser.add_argument("--salida", default=os.path.join("src", "expedientes.reextraidos.jsonl"))
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos (por defecto, uno por CPU)")
+    parser.add_argument("--todas", action="store_true",
+                        help="Re-extraer todas las capturas, no solo la última de cada expediente")
+    args = parser.parse_args()
+
+    if args.accion == "estadisticas":
+        cache = CacheHTML(args.cache)
+        e = cache.estadisticas()
+        cache.cerrar()
+        print(
+            f"{e['capturas']} capturas de {e['expedientes']} expedientes; {e['objetos']} objetos, "
+            f"{e['bytes'] / 1024 / 1024:.1f} MiB ({e['bytes_comprimidos'] / 1024 / 1024:.1f} MiB comprimidos)"
+        )
+        return
+
+    inicio = time.perf_counter()
+    extraidos, rechazados = reextraer(args.cache, args.salida, args.procesos, args.todas)
+    duracion = time.perf_counter() - inicio
+    print(
+        f"Se re-extrajeron {extraidos} expedientes en {duracion:.1f} s "
+        f"({extraidos / duracion if duracion else 0.0:.1f} exp/s); {rechazados} visitas rechazadas"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import time
+import signal
+import threading
+
+import cache_html
+import instrumentacion
+import navegador
+from esperas import limitador, telemetria
+from estado import (
+    TRABAJO_COMPLETADO,
+    TRABAJO_FALLIDO,
+    TRABAJO_PENDIENTE,
+    Deduplicador,
+    EstadoDeRastreo,
+)
+from scraper import (
+    URL_CONSULTA,
+    SupervisorDelNavegador,
+    buscar_parte,
+    cerrar_salidas,
+    crear_parser,
+    crear_refresco,
+    crear_vigilante,
+    listar_jurisdicciones,
+    navegar_y_extraer,
+    resolver_captcha_manualmente,
+    setup_driver,
+)
+
+# Segundos de espera antes de reintentar un trabajo fallido (se multiplica por el intento)
+ESPERA_REINTENTO = 30
+
+class Trabajo:
+    """
+    Una consulta de la campaña: un término buscado en una jurisdicción.
+    """
+
+    __slots__ = ("id", "termino", "jurisdiccion", "prioridad", "intento")
+
+    def __init__(self, id_trabajo, termino, jurisdiccion, prioridad, intento):
+        self.id = id_trabajo
+        self.termino = termino
+        self.jurisdiccion = jurisdiccion
+        self.prioridad = prioridad
+        self.intento = intento
+
+    def __str__(self):
+        return f"'{self.termino}' en la jurisdicción {self.jurisdiccion}"
+
+def armar_matriz(terminos, jurisdicciones):
+    """
+    Combina términos y jurisdicciones en la lista de trabajos de la campaña.
+
+    Args:
+        terminos (list): Términos, cada uno opcionalmente con prioridad ('residuos:5')
+        jurisdicciones (list): Valores de 'camaraPartes'
+
+    Returns:
+        list: Tuplas (termino, jurisdiccion, prioridad)
+    """
+    matriz = []
+    for termino in terminos:
+        nombre, separador, prioridad = termino.rpartition(":")
+        if not separador or not prioridad.lstrip("-").isdigit():
+            nombre, prioridad = termino, "0"
+        for jurisdiccion in jurisdicciones:
+            matriz.append((nombre.strip(), jurisdiccion, int(prioridad)))
+    return matriz
+
+class ProgramadorDeCampana:
+    """
+    Cola persistente de los trabajos de una campaña (término × jurisdicción).
+
+    Cada trabajo es un fragmento independiente de la campaña que toma el
+    primer trabajador libre, en orden de prioridad. Un trabajo que falla vuelve
+    a la cola con una espera creciente hasta agotar sus intentos. Los
+    expedientes se deduplican entre trabajos: uno que aparece en varias
+    consultas se extrae una sola vez por campaña, aun entre ejecuciones.
+    """
+
+    def __init__(self, estado, nombre, intentos_maximos=3, espera_reintento=ESPERA_REINTENTO):
+        """
+        Args:
+            estado (EstadoDeRastreo): Almacén del avance
+            nombre (str): Nombre de la campaña; repetirlo retoma la misma campaña
+            intentos_maximos (int): Intentos por trabajo antes de marcarlo fallido
+            espera_reintento (float): Segundos de espera base antes de un reintento
+        """
+        self.estado = estado
+        self.campana_id = estado.crear_campana(nombre)
+        self.intentos_maximos = intentos_maximos
+        self.espera_reintento = espera_reintento
+        self.detenido = threading.Event()
+        self.refresco = None
+
+        estado.reiniciar_trabajos_en_curso(self.campana_id)
+        self.deduplicador = Deduplicador(estado.expedientes_de_campana(self.campana_id))
+
+    def agregar(self, matriz):
+        """
+        Agrega los trabajos de la matriz (los existentes conservan su avance).
+
+        Returns:
+            int: Cantidad de trabajos nuevos
+        """
+        return self.estado.agregar_trabajos(self.campana_id, matriz)
+
+    def siguiente(self):
+        """
+        Devuelve el próximo trabajo, esperando si solo quedan reintentos diferidos.
+
+        Returns:
+            Trabajo: Trabajo a ejecutar, o None si la campaña terminó o se detuvo
+        """
+        while not self.detenido.is_set():
+            fila = self.estado.tomar_trabajo(self.campana_id, time.time())
+            if fila:
+                return Trabajo(*fila)
+            proximo = self.estado.proxima_disponibilidad(self.campana_id)
+            if proximo is None:
+                return None
+            self.detenido.wait(max(0.5, min(proximo - time.time(), 5.0)))
+        return None
+
+    def completar(self, trabajo, expedientes):
+        self.estado.finalizar_trabajo(trabajo.id, TRABAJO_COMPLETADO, expedientes)
+
+    def fallar(self, trabajo, expedientes, error):
+        """
+        Registra un intento fallido; el trabajo se reintenta si le quedan intentos.
+        """
+        if trabajo.intento < self.intentos_maximos:
+            disponible = time.time() + self.espera_reintento * trabajo.intento
+            self.estado.finalizar_trabajo(trabajo.id, TRABAJO_PENDIENTE, expedientes, error, disponible)
+            print(f"Trabajo {trabajo} fallido (intento {trabajo.intento}), se reintentará: {error}")
+        else:
+            self.estado.finalizar_trabajo(trabajo.id, TRABAJO_FALLIDO, expedientes, error)
+            print(f"Trabajo {trabajo} fallido definitivamente tras {trabajo.intento} intentos: {error}")
+
+    def imprimir_resumen(self):
+        resumen = self.estado.resumen_campana(self.campana_id)
+        for estado_trabajo in (TRABAJO_COMPLETADO, TRABAJO_PENDIENTE, TRABAJO_FALLIDO):
+            datos = resumen.get(estado_trabajo, {"trabajos": 0, "expedientes": 0})
+            print(f"  {estado_trabajo}: {datos['trabajos']} trabajos, {datos['expedientes']} expedientes")
+        print(
+            f"  {len(self.deduplicador)} expedientes únicos; "
+            f"{self.deduplicador.omitidos} repetidos entre consultas no se volvieron a extraer"
+        )
+
+def captcha_serializado(resolver):
+    """
+    Envuelve el resolvedor de CAPTCHA para que los trabajadores lo pidan de a uno.
+    """
+    lock = threading.Lock()
+
+    def _resolver(driver):
+        with lock:
+            resolver(driver)
+    return _resolver
+
+def ejecutar_trabajo(driver, programador, trabajo, motor, url, resolver_captcha, supervisor=None):
+    """
+    Ejecuta una consulta completa de la campaña con el driver indicado.
+
+    Args:
+        supervisor (SupervisorDelNavegador): Supervisor de 'driver', opcional; si
+            recicla el navegador, el driver nuevo queda en 'supervisor.driver'
+
+    Returns:
+        int: Expedientes extraídos
+    """
+    print(f"Iniciando {trabajo} (prioridad {trabajo.prioridad}, intento {trabajo.intento})")
+    buscar_parte(driver, trabajo.termino, trabajo.jurisdiccion, url=url, resolver_captcha=resolver_captcha)
+    if supervisor:
+        supervisor.iniciar()
+
+    progreso = programador.estado.iniciar_corrida(trabajo.termino, trabajo.jurisdiccion, trabajo.id)
+    progreso.deduplicador = programador.deduplicador
+    progreso.refresco = programador.refresco
+    programador.estado.asignar_corrida(trabajo.id, progreso.corrida_id)
+
+    total = navegar_y_extraer(driver, motor, progreso, supervisor)
+    if progreso.completada:
+        programador.completar(trabajo, total)
+    else:
+        programador.fallar(trabajo, total, "La corrida se interrumpió antes de la última página")
+    return total
+
+def _busqueda_de_trabajo(trabajo, url, resolver_captcha):
+    """Devuelve la función que repite la búsqueda del trabajo en un navegador reciclado."""
+    def _buscar(driver):
+        buscar_parte(driver, trabajo.termino, trabajo.jurisdiccion, url=url, resolver_captcha=resolver_captcha)
+    return _buscar
+
+def _trabajar(indice, programador, motor, url, resolver_captcha, totales, vigilante=None):
+    driver = None
+    try:
+        while True:
+            trabajo = programador.siguiente()
+            if trabajo is None:
+                break
+            supervisor = None
+            try:
+                if driver is None:
+                    driver = setup_driver()
+                if vigilante:
+                    supervisor = SupervisorDelNavegador(
+                        driver, _busqueda_de_trabajo(trabajo, url, resolver_captcha), vigilante
+                    )
+                try:
+                    totales[indice] += ejecutar_trabajo(
+                        driver, programador, trabajo, motor, url, resolver_captcha, supervisor
+                    )
+                finally:
+                    if supervisor:
+                        supervisor.detener()
+                        driver = supervisor.driver
+            except Exception as e:
+                programador.fallar(trabajo, 0, f"{type(e).__name__}: {e}")
+                # Un error del navegador puede dejarlo inutilizable: se crea uno nuevo
+                if driver is not None:
+                    navegador.cerrar_driver(driver)
+                    driver = None
+    finally:
+        if driver is not None:
+            navegador.cerrar_driver(driver)
+
+def _detener_con_interrupcion(signum, frame):
+    raise KeyboardInterrupt
+
+def main():
+    """
+    Ejecuta una campaña de búsquedas: cada término en cada jurisdicción.
+
+    Los trabajos se guardan en la base de estado, por lo que repetir el mismo
+    comando retoma la campaña: se saltean los trabajos completados, las
+    consultas interrumpidas continúan en su última página y los expedientes ya
+    extraídos por cualquier consulta de la campaña no se vuelven a abrir.
+
+    Uso: python campana.py --terminos residuos:10 contaminacion --jurisdicciones 10 7 --trabajadores 2
+    """
+    parser = crear_parser("Campaña de búsquedas por término y jurisdicción")
+    parser.add_argument("--campana", default="campana", help="Nombre de la campaña a crear o retomar")
+    parser.add_argument("--terminos", nargs="+", required=True,
+                        help="Términos a buscar; 'termino:N' le asigna prioridad N (mayor primero)")
+    parser.add_argument("--jurisdicciones", nargs="*",
+                        help="Valores de 'camaraPartes' (por defecto, todas las del sitio)")
+    parser.add_argument("--intentos", type=int, default=3, help="Intentos por trabajo")
+    parser.add_argument("--espera-reintento", type=float, default=ESPERA_REINTENTO,
+                        help="Segundos de espera base antes de reintentar un trabajo")
+    parser.add_argument("--url", default=URL_CONSULTA, help="Página de inicio de la consulta pública")
+    args = parser.parse_args()
+    if args.sin_estado:
+        parser.error("--sin-estado no se admite en una campaña: la cola de trabajos se guarda en la base de estado")
+
+    signal.signal(signal.SIGTERM, _detener_con_interrupcion)
+    limitador.configurar(minimo=args.pausa_minima, maximo=args.pausa_maxima, trabajadores=args.trabajadores)
+    navegador.configurar(args)
+    if args.cache_html:
+        cache_html.activar_cache(args.cache_html, args.cache_limite_mb)
+
+    estado = EstadoDeRastreo(args.estado)
+    programador = ProgramadorDeCampana(estado, args.campana, args.intentos, args.espera_reintento)
+    programador.refresco = crear_refresco(args, estado)
+
+    jurisdicciones = args.jurisdicciones
+    if not jurisdicciones:
+        driver = setup_driver()
+        try:
+            jurisdicciones = [valor for valor, _ in listar_jurisdicciones(driver, args.url)]
+        finally:
+            navegador.cerrar_driver(driver)
+    nuevos = programador.agregar(armar_matriz(args.terminos, jurisdicciones))
+    print(
+        f"Campaña '{args.campana}': {len(args.terminos)} términos × {len(jurisdicciones)} jurisdicciones "
+        f"({nuevos} trabajos nuevos)"
+    )
+
+    resolver = captcha_serializado(resolver_captcha_manualmente)
+    totales = [0] * max(1, args.trabajadores)
+    hilos = [
+        threading.Thread(
+            target=_trabajar,
+            args=(indice, programador, args.motor, args.url, resolver, totales, crear_vigilante(args)),
+            name=f"campana-{indice}",
+            daemon=True
+        )
+        for indice in range(len(totales))
+    ]
+    with instrumentacion.instrumentar(args):
+        try:
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                while hilo.is_alive():
+                    hilo.join(0.5)
+        except KeyboardInterrupt:
+            print("Interrupción recibida: se termina la consulta en curso de cada trabajador...")
+            programador.detenido.set()
+            for hilo in hilos:
+                hilo.join()
+        finally:
+            print(f"Se extrajeron {sum(totales)} expedientes.")
+            programador.imprimir_resumen()
+            telemetria.imprimir()
+            limitador.imprimir()
+            if programador.refresco:
+                programador.refresco.imprimir()
+            cerrar_salidas()
+            cache_html.cerrar_cache()
+            estado.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import re
+import threading
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import cache_html
+from extraccion import Documento, parsear_detalle, parsear_intervinientes
+
+# Clientes reutilizables, uno por sesión de webdriver
+_clientes = {}
+_clientes_lock = threading.Lock()
+
+# Parámetros que Mojarra envía al hacer clic en un h:commandLink: {'id':'id', ...}
+_PARAMETROS_ONCLICK = re.compile(r"'([^']+)'\s*:\s*'([^']*)'")
+_CDATA_UPDATE = re.compile(r"<update[^>]*><!\[CDATA\[(.*?)\]\]></update>", re.S)
+_REDIRECT = re.compile(r"<redirect\s+url=\"([^\"]+)\"")
+
+class ErrorHTTP(Exception):
+    """Excepción para respuestas que no pueden procesarse sin el navegador."""
+    pass
+
+class EnlaceExpediente:
+    """
+    Enlace de una fila de resultados: el formulario y los parámetros que lo envían,
+    junto con el número de expediente, la situación y la fecha de la última
+    actuación que muestra la fila, y su posición.
+    """
+
+    __slots__ = ("id", "id_formulario", "parametros", "expediente", "fila", "situacion", "ultima_actualizacion")
+
+    def __init__(self, id_enlace, id_formulario, parametros, expediente="", fila=0,
+                 situacion="", ultima_actualizacion=""):
+        self.id = id_enlace
+        self.id_formulario = id_formulario
+        self.parametros = parametros
+        self.expediente = expediente
+        self.fila = fila
+        self.situacion = situacion
+        self.ultima_actualizacion = ultima_actualizacion
+
+def _ancestro(nodo, tag):
+    while nodo is not None and nodo.tag != tag:
+        nodo = nodo.padre
+    return nodo
+
+def leer_formulario(formulario):
+    """
+    Obtiene la acción y los campos que enviaría el navegador al postear un formulario.
+
+    Args:
+        formulario (Nodo): Elemento 'form'
+
+    Returns:
+        tuple: (acción, diccionario de campos)
+    """
+    campos = {}
+    for nodo in formulario.iterar():
+        nombre = nodo.attrs.get("name")
+        if not nombre:
+            continue
+        if nodo.tag == "input":
+            tipo = nodo.attrs.get("type", "text").lower()
+            if tipo in ("submit", "button", "image", "reset", "file"):
+                continue
+            if tipo in ("checkbox", "radio") and "checked" not in nodo.attrs:
+                continue
+            campos[nombre] = nodo.attrs.get("value", "")
+        elif nodo.tag == "select":
+            opciones = nodo.buscar(tag="option")
+            elegidas = [op for op in opciones if "selected" in op.attrs] or opciones[:1]
+            if elegidas:
+                campos[nombre] = elegidas[0].attrs.get("value", elegidas[0].texto())
+        elif nodo.tag == "textarea":
+            campos[nombre] = nodo.texto()
+    return formulario.attrs.get("action", ""), campos
+
+def enlaces_de_resultados(documento):
+    """
+    Obtiene los enlaces (ícono 'fa-eye') de cada fila de la tabla de resultados.
+
+    Args:
+        documento (Documento): Página de resultados
+
+    Returns:
+        list: EnlaceExpediente de cada fila con enlace, en orden
+    """
+    tablas = documento.buscar(tag="table", clase="table-striped")
+    if not tablas:
+        raise ErrorHTTP("La página no contiene la tabla de resultados")
+
+    enlaces = []
+    for indice, fila in enumerate(tablas[0].buscar(tag="tr")[1:]):
+        iconos = fila.buscar(clase="fa-eye")
+        enlace = _ancestro(iconos[0], "a") if iconos else None
+        formulario = _ancestro(enlace, "form")
+        if enlace is None or not enlace.id or formulario is None:
+            continue
+        parametros = dict(_PARAMETROS_ONCLICK.findall(enlace.attrs.get("onclick", "")))
+        celdas = fila.celdas()
+        enlaces.append(EnlaceExpediente(
+            enlace.id, formulario.id, parametros or {enlace.id: enlace.id},
+            expediente=celdas[0].texto() if celdas else "",
+            fila=indice,
+            situacion=celdas[3].texto() if len(celdas) > 3 else "",
+            ultima_actualizacion=celdas[4].texto() if len(celdas) > 4 else ""
+        ))
+    return enlaces
+
+class ClienteJSF:
+    """
+    Cliente HTTP que replica los postbacks JSF/RichFaces de la consulta pública.
+
+    Reutiliza las cookies de una sesión del navegador (con el CAPTCHA ya resuelto)
+    y el 'javax.faces.ViewState' de la página de resultados para pedir cada vista
+    de detalle directamente, sobre conexiones keep-alive de un pool.
+    """
+
+    def __init__(self, tamano_pool=10, timeout=15):
+        """
+        Args:
+            tamano_pool (int): Conexiones keep-alive a mantener por host
+            timeout (float): Segundos máximos de espera por respuesta
+        """
+        self.timeout = timeout
+        self.sesion = requests.Session()
+        adaptador = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=tamano_pool,
+            max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.3),
+        )
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+
+        self.url_resultados = None
+        self._formularios = {}
+        self.enlaces = []
+
+    @classmethod
+    def para_driver(cls, driver, **opciones):
+        """
+        Devuelve el cliente asociado a la sesión del driver, creándolo si no existe.
+
+        Args:
+            driver: Instancia del webdriver
+            **opciones: Parámetros de ClienteJSF
+
+        Returns:
+            ClienteJSF: Cliente con las cookies del driver sincronizadas
+        """
+        with _clientes_lock:
+            cliente = _clientes.get(driver.session_id)
+            if cliente is None:
+                cliente = cls(**opciones)
+                cliente.sesion.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+                _clientes[driver.session_id] = cliente
+        cliente.copiar_cookies(driver)
+        return cliente
+
+    def copiar_cookies(self, driver):
+        """Copia las cookies actuales del navegador a la sesión HTTP."""
+        for cookie in driver.get_cookies():
+            self.sesion.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain"), path=cookie.get("path", "/")
+            )
+
+    def cargar_resultados(self, html, url):
+        """
+        Registra la página de resultados desde la que se piden los expedientes.
+
+        Args:
+            html (str): Código fuente de la página de resultados
+            url (str): URL de la página de resultados
+
+        Returns:
+            list: EnlaceExpediente de cada fila
+        """
+        documento = Documento(html)
+        self.url_resultados = url
+        self._formularios = {}
+        for formulario in documento.buscar(tag="form"):
+            if formulario.id:
+                accion, campos = leer_formulario(formulario)
+                self._formularios[formulario.id] = (urljoin(url, accion or url), campos)
+        self.enlaces = enlaces_de_resultados(documento)
+        return self.enlaces
+
+    def _postear(self, url, datos, ajax=False):
+        cabeceras = {"Referer": self.url_resultados}
+        if ajax:
+            cabeceras["Faces-Request"] = "partial/ajax"
+        respuesta = self.sesion.post(url, data=datos, headers=cabeceras, timeout=self.timeout)
+        respuesta.raise_for_status()
+        texto = respuesta.text
+
+        if "<partial-response" in texto[:500]:
+            redireccion = _REDIRECT.search(texto)
+            if redireccion:
+                respuesta = self.sesion.get(urljoin(url, redireccion.group(1)), timeout=self.timeout)
+                respuesta.raise_for_status()
+                return respuesta.text
+            if not ajax:
+                raise ErrorHTTP("Respuesta parcial inesperada al abrir el expediente")
+        return texto
+
+    def _pedir_intervinientes(self, documento, url):
+        """
+        Cambia a la pestaña "Intervinientes" con el postback AJAX de RichFaces.
+        """
+        pestana = next(
+            (nodo for nodo in documento.buscar(tag="span") if nodo.texto() == "Intervinientes"),
+            None
+        )
+        encabezado = pestana
+        while encabezado is not None and not (encabezado.id or "").endswith(":header:inactive"):
+            encabezado = encabezado.padre
+        formulario = _ancestro(pestana, "form")
+        if encabezado is None or formulario is None:
+            raise ErrorHTTP("No se encontró la pestaña 'Intervinientes'")
+
+        id_pestana = encabezado.id[:-len(":header:inactive")]
+        panel = encabezado.padre
+        while panel is not None and "rf-tbp" not in panel.clases:
+            panel = panel.padre
+        if panel is None or not panel.id:
+            raise ErrorHTTP("No se encontró el panel de pestañas del expediente")
+
+        accion, campos = leer_formulario(formulario)
+        campos.update({
+            panel.id: id_pestana.rsplit(":", 1)[-1],
+            "javax.faces.source": panel.id,
+            "javax.faces.partial.event": "change",
+            "javax.faces.partial.execute": f"{panel.id} @component",
+            "javax.faces.partial.render": "@component",
+            "javax.faces.behavior.event": "change",
+            "javax.faces.partial.ajax": "true",
+            "rfExt": "null",
+            "AJAX:EVENTS_COUNT": "1",
+        })
+        respuesta = self._postear(urljoin(url, accion or url), campos, ajax=True)
+        return "".join(_CDATA_UPDATE.findall(respuesta)) or respuesta
+
+    def obtener_expediente(self, enlace):
+        """
+        Pide la vista de detalle y la de intervinientes de un expediente.
+
+        Args:
+            enlace (EnlaceExpediente): Enlace de la fila de resultados
+
+        Returns:
+            dict: Datos del expediente, con el mismo formato que extraer_expediente
+
+        Raises:
+            ErrorHTTP: Si la respuesta no puede interpretarse sin el navegador
+        """
+        if enlace.id_formulario not in self._formularios:
+            raise ErrorHTTP(f"Formulario desconocido: {enlace.id_formulario}")
+
+        url, campos = self._formularios[enlace.id_formulario]
+        datos_post = dict(campos)
+        datos_post.update(enlace.parametros)
+        html_detalle = self._postear(url, datos_post)
+        html_intervinientes = None
+
+        cache = cache_html.cache_activa()
+        datos = {}
+        try:
+            documento = Documento(html_detalle)
+            datos = parsear_detalle(documento)
+
+            if documento.por_id("expediente:participantsTable") is None:
+                html_intervinientes = self._pedir_intervinientes(documento, url)
+                documento = Documento(html_intervinientes)
+                if documento.por_id("expediente:participantsTable") is None:
+                    raise ErrorHTTP("La respuesta no contiene la tabla de intervinientes")
+
+            datos["actores"], datos["demandados"] = parsear_intervinientes(documento)
+        finally:
+            if cache is not None:
+                cache.guardar_visita(
+                    html_detalle, html_intervinientes, datos.get("expediente") or enlace.expediente or None, "http"
+                )
+        return datos
+
+def liberar_cliente(driver):
+    """
+    Descarta el cliente asociado a la sesión del driver y cierra sus conexiones.
+
+    Debe llamarse antes de cerrar el driver: un driver cerrado ya no tiene sesión.
+
+    Args:
+        driver: Instancia del webdriver
+    """
+    with _clientes_lock:
+        cliente = _clientes.pop(getattr(driver, "session_id", None), None)
+    if cliente is not None:
+        cliente.sesion.close()
@@ -0,0 +1,393 @@
+import os
+import time
+import argparse
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+from guardarDb import CONFIG_DB, SubidorDeBaseDeDatos
+from salida import leer_expedientes
+
+# Extensión de los archivos de cada formato
+FORMATOS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+# Filas por grupo de filas (Parquet) o por lote (Arrow IPC)
+FILAS_POR_GRUPO = 64 * 1024
+
+# Columnas de cada tabla exportada. 'diccionario' es texto con codificación por
+# diccionario: los pocos cientos de valores distintos se guardan una sola vez
+COLUMNAS = {
+    "expedientes": (
+        ("expediente_id", "entero"),
+        ("expediente", "texto"),
+        ("jurisdiccion", "diccionario"),
+        ("dependencia", "diccionario"),
+        ("situacion_actual", "diccionario"),
+        ("caratula", "texto"),
+    ),
+    "movimientos": (
+        ("expediente_id", "entero"),
+        ("fecha", "fecha"),
+        ("tipo", "diccionario"),
+        ("detalle", "texto"),
+    ),
+    "participantes": (
+        ("expediente_id", "entero"),
+        ("tipo", "diccionario"),
+        ("nombre", "texto"),
+    ),
+}
+
+# Lectura de las tablas de la base, con los valores de las tablas de dimensión
+CONSULTAS_MYSQL = {
+    "expedientes": (
+        "SELECT id, expediente, jurisdiccion, dependencia, situacion_actual, caratula "
+        "FROM vista_expedientes ORDER BY id"
+    ),
+    "movimientos": "SELECT expediente_id, fecha, tipo, detalle FROM vista_movimientos ORDER BY expediente_id, id",
+    "participantes": "SELECT expediente_id, tipo, nombre FROM vista_participantes ORDER BY expediente_id, id",
+}
+
+class ErrorColumnar(Exception):
+    """Error al exportar o leer las tablas columnares."""
+
+def _requerir_pyarrow():
+    if pa is None:
+        raise ErrorColumnar("La exportación columnar requiere el paquete 'pyarrow'")
+
+def _tipo_arrow(tipo):
+    if tipo == "entero":
+        return pa.int64()
+    if tipo == "fecha":
+        return pa.date32()
+    if tipo == "diccionario":
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+def esquema(tabla):
+    """
+    Devuelve el esquema de Arrow de una de las tablas exportadas.
+    """
+    _requerir_pyarrow()
+    return pa.schema([(nombre, _tipo_arrow(tipo)) for nombre, tipo in COLUMNAS[tabla]])
+
+def ruta_tabla(directorio, tabla, formato="parquet"):
+    return os.path.join(directorio, tabla + FORMATOS[formato])
+
+class TablaColumnar:
+    """
+    Escritor de una tabla columnar que acumula filas y las vuelca por grupos.
+
+    Cada grupo de 'filas_por_grupo' filas se escribe como un grupo de filas de
+    Parquet o un lote de Arrow IPC, por lo que la memoria no depende del total
+    de filas. Los diccionarios de las columnas de texto repetido son globales a
+    la tabla y solo crecen, lo que en Arrow IPC se escribe como deltas.
+    """
+
+    def __init__(self, ruta, tabla, formato="parquet", filas_por_grupo=FILAS_POR_GRUPO, compresion=None):
+        """
+        Args:
+            ruta (str): Archivo a crear
+            tabla (str): Nombre de la tabla ('expedientes', 'movimientos' o 'participantes')
+            formato (str): 'parquet' o 'arrow'
+            filas_por_grupo (int): Filas por grupo de filas o lote
+            compresion (str): Códec ('zstd', 'lz4', ...); None usa zstd en Parquet y
+                ninguno en Arrow IPC, para poder leerlo mapeado en memoria sin copias
+        """
+        _requerir_pyarrow()
+        if formato not in FORMATOS:
+            raise ErrorColumnar(f"Formato no soportado: {formato}")
+        self.ruta = ruta
+        self.formato = formato
+        self.filas_por_grupo = filas_por_grupo
+        self.columnas = COLUMNAS[tabla]
+        self.esquema = esquema(tabla)
+        self.filas = 0
+        self.grupos = 0
+
+        self._valores = [[] for _ in self.columnas]
+        self._diccionarios = {
+            indice: ({}, []) for indice, (_, tipo) in enumerate(self.columnas) if tipo == "diccionario"
+        }
+
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        if formato == "parquet":
+            self._sumidero = None
+            self._escritor = pq.ParquetWriter(
+                ruta, self.esquema,
+                compression=compresion or "zstd",
+                use_dictionary=[nombre for nombre, tipo in self.columnas if tipo == "diccionario"]
+            )
+        else:
+            self._sumidero = pa.OSFile(ruta, "wb")
+            opciones = pa.ipc.IpcWriteOptions(compression=compresion, emit_dictionary_deltas=True)
+            self._escritor = pa.ipc.new_file(self._sumidero, self.esquema, options=opciones)
+
+    def agregar(self, fila):
+        """
+        Agrega una fila, con los valores en el orden de COLUMNAS.
+        """
+        for indice, valor in enumerate(fila):
+            diccionario = self._diccionarios.get(indice)
+            if diccionario is not None and valor is not None:
+                posiciones, valores = diccionario
+                posicion = posiciones.get(valor)
+                if posicion is None:
+                    posicion = posiciones[valor] = len(valores)
+                    valores.append(valor)
+                valor = posicion
+            self._valores[indice].append(valor)
+        if len(self._valores[0]) >= self.filas_por_grupo:
+            self.vaciar()
+
+    def vaciar(self):
+        """Escribe las filas acumuladas como un grupo de filas."""
+        if not self._valores[0]:
+            return
+        arreglos = []
+        for indice, (_, tipo) in enumerate(self.columnas):
+            if tipo == "diccionario":
+                arreglos.append(pa.DictionaryArray.from_arrays(
+                    pa.array(self._valores[indice], type=pa.int32()),
+                    pa.array(self._diccionarios[indice][1], type=pa.string())
+                ))
+            else:
+                arreglos.append(pa.array(self._valores[indice], type=_tipo_arrow(tipo)))
+        lote = pa.RecordBatch.from_arrays(arreglos, schema=self.esquema)
+
+        if self.formato == "parquet":
+            self._escritor.write_table(pa.Table.from_batches([lote]), row_group_size=lote.num_rows)
+        else:
+            self._escritor.write_batch(lote)
+        self.filas += lote.num_rows
+        self.grupos += 1
+        self._valores = [[] for _ in self.columnas]
+
+    def cerrar(self):
+        self.vaciar()
+        self._escritor.close()
+        if self._sumidero is not None:
+            self._sumidero.close()
+
+class EscritorColumnar:
+    """
+    Escribe las tablas expedientes, movimientos y participantes en un directorio.
+    """
+
+    def __init__(self, directorio, formato="parquet", filas_por_grupo=FILAS_POR_GRUPO, compresion=None):
+        """
+        Args:
+            directorio (str): Directorio de salida (un archivo por tabla)
+            formato (str): 'parquet' o 'arrow'
+            filas_por_grupo (int): Filas por grupo de filas o lote
+            compresion (str): Códec de compresión (ver TablaColumnar)
+        """
+        self.directorio = directorio
+        self.tablas = {
+            tabla: TablaColumnar(ruta_tabla(directorio, tabla, formato), tabla, formato, filas_por_grupo, compresion)
+            for tabla in COLUMNAS
+        }
+
+    def agregar(self, tabla, fila):
+        self.tablas[tabla].agregar(fila)
+
+    def agregar_expediente(self, expediente_id, caso, limpiar_fecha):
+        """
+        Agrega un expediente de la salida del scraper, repartido en las tres tablas.
+
+        Args:
+            expediente_id (int): Id con el que se relacionan las tablas
+            caso (dict): Expediente tal como lo escribe el scraper
+            limpiar_fecha (callable): Conversión del texto de fecha a date
+        """
+        self.tablas["expedientes"].agregar((
+            expediente_id,
+            caso.get("expediente"),
+            caso.get("jurisdiccion"),
+            caso.get("dependencia"),
+            caso.get("situacion_actual"),
+            caso.get("caratula"),
+        ))
+        movimientos = self.tablas["movimientos"]
+        for registro in caso.get("registros_tabla") or []:
+            movimientos.agregar((
+                expediente_id, limpiar_fecha(registro.get("fecha")), registro.get("tipo"), registro.get("detalle")
+            ))
+        participantes = self.tablas["participantes"]
+        for actor in caso.get("actores") or []:
+            participantes.agregar((expediente_id, "ACTOR", actor))
+        for demandado in caso.get("demandados") or []:
+            participantes.agregar((expediente_id, "DEMANDADO", demandado))
+
+    def cerrar(self):
+        """
+        Returns:
+            dict: Filas escritas por tabla
+        """
+        for tabla in self.tablas.values():
+            tabla.cerrar()
+        return {nombre: tabla.filas for nombre, tabla in self.tablas.items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+def exportar_desde_archivo(origen, directorio, formato="parquet", filas_por_grupo=FILAS_POR_GRUPO, compresion=None):
+    """
+    Exporta la salida del scraper (JSONL o el arreglo JSON legado) a tablas columnares.
+
+    Los expedientes se leen de a uno y reciben ids consecutivos desde 1, que
+    relacionan las tres tablas. Las fechas se convierten con la misma limpieza
+    que la carga en MySQL.
+
+    Args:
+        origen (str): Archivo de expedientes
+        directorio (str): Directorio de salida
+
+    Returns:
+        dict: Filas escritas por tabla
+    """
+    limpiar_fecha = SubidorDeBaseDeDatos(CONFIG_DB).limpiar_fecha
+    escritor = EscritorColumnar(directorio, formato, filas_por_grupo, compresion)
+    try:
+        for expediente_id, caso in enumerate(leer_expedientes(origen), start=1):
+            escritor.agregar_expediente(expediente_id, caso, limpiar_fecha)
+    finally:
+        filas = escritor.cerrar()
+    return filas
+
+def exportar_desde_mysql(config, directorio, formato="parquet", filas_por_grupo=FILAS_POR_GRUPO, compresion=None,
+                         fabrica_conexion=None, filas_por_lectura=10000):
+    """
+    Exporta las tablas que llena SubidorDeBaseDeDatos a tablas columnares.
+
+    Cada tabla se lee con un cursor sin buffer, de a 'filas_por_lectura'
+    filas, a través de las vistas que resuelven las tablas de dimensión.
+
+    Args:
+        config (dict): Configuración de conexión (como CONFIG_DB)
+        directorio (str): Directorio de salida
+        fabrica_conexion (callable): Función que crea la conexión, opcional
+
+    Returns:
+        dict: Filas escritas por tabla
+    """
+    subidor = SubidorDeBaseDeDatos(config, fabrica_conexion=fabrica_conexion)
+    subidor._conectar()
+    escritor = EscritorColumnar(directorio, formato, filas_por_grupo, compresion)
+    try:
+        for tabla, consulta in CONSULTAS_MYSQL.items():
+            cursor = subidor.conexion.cursor()
+            try:
+                cursor.execute(consulta)
+                while True:
+                    filas = cursor.fetchmany(filas_por_lectura)
+                    if not filas:
+                        break
+                    for fila in filas:
+                        escritor.agregar(tabla, fila)
+            finally:
+                cursor.close()
+    finally:
+        filas = escritor.cerrar()
+        subidor.cerrar()
+    return filas
+
+def leer_tabla(directorio, tabla, columnas=None):
+    """
+    Lee una tabla exportada mapeando el archivo en memoria.
+
+    Un archivo Arrow IPC sin compresión se lee sin copias: las columnas
+    apuntan directamente al archivo mapeado y solo se cargan las páginas que
+    se consultan. En Parquet se leen únicamente las columnas pedidas.
+
+    Args:
+        directorio (str): Directorio de la exportación
+        tabla (str): 'expedientes', 'movimientos' o 'participantes'
+        columnas (list): Columnas a leer (por defecto, todas)
+
+    Returns:
+        pyarrow.Table: La tabla
+
+    Raises:
+        ErrorColumnar: Si la tabla no existe en el directorio
+    """
+    _requerir_pyarrow()
+    ruta = ruta_tabla(directorio, tabla, "arrow")
+    if os.path.exists(ruta):
+        lector = pa.ipc.open_file(pa.memory_map(ruta, "r"))
+        resultado = lector.read_all()
+        return resultado.select(columnas) if columnas else resultado
+
+    ruta = ruta_tabla(directorio, tabla, "parquet")
+    if os.path.exists(ruta):
+        return pq.read_table(ruta, columns=columnas, memory_map=True)
+    raise ErrorColumnar(f"No se encontró la tabla '{tabla}' en {directorio}")
+
+def contar_por(directorio, tabla, columna, limite=20):
+    """
+    Cuenta las filas de una tabla por cada valor de una columna.
+
+    Returns:
+        list: Pares (valor, cantidad), de mayor a menor cantidad
+    """
+    valores = leer_tabla(directorio, tabla, [columna])[columna]
+    if pa.types.is_dictionary(valores.type):
+        valores = valores.cast(pa.string())
+    conteo = pc.value_counts(valores).to_pylist()
+    pares = sorted(((fila["values"], fila["counts"]) for fila in conteo), key=lambda par: -par[1])
+    return pares[:limite]
+
+def main():
+    """
+    Exporta los expedientes a tablas columnares (Parquet o Arrow IPC) y las consulta.
+
+    Uso:
+        python columnar.py exportar --origen src/expedientes.jsonl --destino src/columnar
+        python columnar.py exportar --mysql --destino src/columnar --formato arrow
+        python columnar.py contar --destino src/columnar --tabla movimientos --columna tipo
+    """
+    parser = argparse.ArgumentParser(description="Exportación columnar de los expedientes")
+    parser.add_argument("accion", choices=["exportar", "contar"])
+    parser.add_argument("--origen", default=os.path.join("src", "expedientes.jsonl"),
+                        help="Archivo JSONL o JSON del scraper")
+    parser.add_argument("--mysql", action="store_true", help="Exportar desde la base de CONFIG_DB en lugar del archivo")
+    parser.add_argument("--destino", default=os.path.join("src", "columnar"), help="Directorio de las tablas")
+    parser.add_argument("--formato", choices=sorted(FORMATOS), default="parquet")
+    parser.add_argument("--filas-por-grupo", type=int, default=FILAS_POR_GRUPO)
+    parser.add_argument("--compresion", help="Códec de compresión (zstd, lz4, snappy, ...)")
+    parser.add_argument("--tabla", choices=sorted(COLUMNAS), default="movimientos")
+    parser.add_argument("--columna", default="tipo")
+    args = parser.parse_args()
+
+    if args.accion == "contar":
+        inicio = time.perf_counter()
+        pares = contar_por(args.destino, args.tabla, args.columna)
+        for valor, cantidad in pares:
+            print(f"{cantidad:>10}  {valor}")
+        print(f"({time.perf_counter() - inicio:.3f} s)")
+        return
+
+    inicio = time.perf_counter()
+    if args.mysql:
+        filas = exportar_desde_mysql(CONFIG_DB, args.destino, args.formato, args.filas_por_grupo, args.compresion)
+    else:
+        filas = exportar_desde_archivo(args.origen, args.destino, args.formato, args.filas_por_grupo, args.compresion)
+    print(
+        f"Se exportaron {filas['expedientes']} expedientes, {filas['movimientos']} movimientos y "
+        f"{filas['participantes']} participantes a {args.destino} en {time.perf_counter() - inicio:.1f} s"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import re
+import sqlite3
+from datetime import date
+
+# Esquema de la base de MySQL (ver esquema.py) traducido a SQLite, sin el particionado
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS jurisdicciones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(255) NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS dependencias (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(255) NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tipos_movimiento (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(255) NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tipos_participante (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(255) NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS expedientes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    expediente VARCHAR(255),
+    jurisdiccion_id INT REFERENCES jurisdicciones (id),
+    dependencia_id INT REFERENCES dependencias (id),
+    situacion_actual VARCHAR(255),
+    caratula VARCHAR(255)
+);
+CREATE TABLE IF NOT EXISTS movimientos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    expediente_id INT REFERENCES expedientes (id),
+    fecha DATE,
+    tipo_id INT REFERENCES tipos_movimiento (id),
+    detalle TEXT
+);
+CREATE TABLE IF NOT EXISTS participantes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    expediente_id INT REFERENCES expedientes (id),
+    tipo_id INT REFERENCES tipos_participante (id),
+    nombre VARCHAR(255)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS expedientes_numero ON expedientes (expediente);
+CREATE INDEX IF NOT EXISTS participantes_tipo ON participantes (tipo_id);
+CREATE INDEX IF NOT EXISTS movimientos_expediente_fecha ON movimientos (expediente_id, fecha);
+CREATE INDEX IF NOT EXISTS participantes_tipo_nombre ON participantes (tipo_id, nombre);
+CREATE VIEW IF NOT EXISTS vista_expedientes AS
+    SELECT e.id, e.expediente, j.nombre AS jurisdiccion, d.nombre AS dependencia,
+           e.situacion_actual, e.caratula
+    FROM expedientes e
+    JOIN jurisdicciones j ON j.id = e.jurisdiccion_id
+    JOIN dependencias d ON d.id = e.dependencia_id;
+CREATE VIEW IF NOT EXISTS vista_movimientos AS
+    SELECT m.id, m.expediente_id, m.fecha, t.nombre AS tipo, m.detalle
+    FROM movimientos m JOIN tipos_movimiento t ON t.id = m.tipo_id;
+CREATE VIEW IF NOT EXISTS vista_participantes AS
+    SELECT p.id, p.expediente_id, t.nombre AS tipo, p.nombre
+    FROM participantes p JOIN tipos_participante t ON t.id = p.tipo_id;
+"""
+
+_BLOQUEO = re.compile(r"\s+(FOR\s+UPDATE|LOCK\s+IN\s+SHARE\s+MODE)\b", re.I)
+_INSERT_IGNORE = re.compile(r"^\s*INSERT\s+IGNORE\b", re.I)
+_QUITAR_INDICE = re.compile(r"^\s*ALTER\s+TABLE\s+\w+\s+DROP\s+INDEX\s+(\w+)\s*$", re.I)
+_AGREGAR_INDICE = re.compile(r"^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+INDEX\s+(\w+)\s*(\(.*\))\s*$", re.I)
+
+sqlite3.register_adapter(date, date.isoformat)
+
+class CursorSimulado:
+    """Cursor con la interfaz de mysql.connector usada por SubidorDeBaseDeDatos."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @property
+    def lastrowid(self):
+        # Como en MySQL: tras un INSERT de varias filas, el id de la primera
+        ultimo = self._cursor.lastrowid
+        if ultimo and self._cursor.rowcount > 1:
+            return ultimo - self._cursor.rowcount + 1
+        return ultimo
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @staticmethod
+    def _traducir(consulta):
+        # Los índices diferidos de la carga masiva (ver esquema.py)
+        consulta = _QUITAR_INDICE.sub(r"DROP INDEX IF EXISTS \1", consulta)
+        consulta = _AGREGAR_INDICE.sub(r"CREATE INDEX IF NOT EXISTS \2 ON \1 \3", consulta)
+        consulta = _INSERT_IGNORE.sub("INSERT OR IGNORE", consulta)
+        return _BLOQUEO.sub("", consulta).replace("%s", "?")
+
+    def execute(self, consulta, parametros=()):
+        self._cursor.execute(self._traducir(consulta), tuple(parametros or ()))
+
+    def executemany(self, consulta, filas):
+        self._cursor.executemany(self._traducir(consulta), [tuple(fila) for fila in filas])
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+class ConexionSimulada:
+    """
+    Conexión SQLite que imita la de mysql.connector para medir la carga sin un servidor.
+
+    Traduce los marcadores '%s' a '?', 'INSERT IGNORE' a 'INSERT OR IGNORE' y el
+    alta y la baja de índices con ALTER TABLE, y descarta 'FOR UPDATE' y
+    'LOCK IN SHARE MODE'. No admite
+    LOAD DATA LOCAL INFILE, por lo que los benchmarks usan INSERT de varias filas.
+    """
+
+    def __init__(self, ruta=":memory:"):
+        """
+        Args:
+            ruta (str): Archivo SQLite (por defecto, en memoria)
+        """
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.executescript(ESQUEMA_SQLITE)
+        self._abierta = True
+
+    def cursor(self):
+        return CursorSimulado(self._conexion.cursor())
+
+    def commit(self):
+        self._conexion.commit()
+
+    def rollback(self):
+        self._conexion.rollback()
+
+    def is_connected(self):
+        return self._abierta
+
+    def close(self):
+        # La base en memoria se conserva para poder contar las filas al final
+        self._abierta = False
+
+    def reabrir(self):
+        self._abierta = True
+
+    def cerrar_definitivamente(self):
+        self._abierta = False
+        self._conexion.close()
+
+    def contar(self, tabla):
+        """Devuelve la cantidad de filas de una tabla."""
+        return self._conexion.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+
+class FabricaSimulada:
+    """
+    Fábrica para SubidorDeBaseDeDatos(fabrica_conexion=...) que comparte una
+    misma base SQLite entre conexiones sucesivas.
+    """
+
+    def __init__(self, ruta=":memory:"):
+        self.base = ConexionSimulada(ruta)
+
+    def __call__(self):
+        self.base.reabrir()
+        return self.base
@@ -0,0 +1,345 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+# Indica si no quedan solicitudes AJAX pendientes (JSF, RichFaces o jQuery)
+# y el documento terminó de cargarse. Si la página no usa alguna de las
+# bibliotecas, se la ignora.
+SCRIPT_AJAX_INACTIVO = """
+if (document.readyState !== 'complete') { return false; }
+if (window.jsf && jsf.ajax && !window.__esperasJsf) {
+    window.__esperasJsf = true;
+    window.__esperasPendientes = 0;
+    jsf.ajax.addOnEvent(function (datos) {
+        if (datos.status === 'begin') { window.__esperasPendientes++; }
+        if (datos.status === 'success') { window.__esperasPendientes = Math.max(0, window.__esperasPendientes - 1); }
+    });
+    jsf.ajax.addOnError(function () {
+        window.__esperasPendientes = Math.max(0, window.__esperasPendientes - 1);
+    });
+}
+if (window.__esperasPendientes > 0) { return false; }
+if (window.RichFaces && RichFaces.queue && typeof RichFaces.queue.isEmpty === 'function'
+        && !RichFaces.queue.isEmpty()) { return false; }
+if (window.jQuery && jQuery.active > 0) { return false; }
+return true;
+"""
+
+# Esperas recientes conservadas por nombre para calcular los percentiles
+MUESTRAS_POR_ESPERA = 2048
+
+def percentil(valores_ordenados, porcentaje):
+    """
+    Calcula un percentil (interpolación por rango más cercano) de una lista ordenada.
+
+    Args:
+        valores_ordenados (list): Valores en orden ascendente
+        porcentaje (float): Percentil entre 0 y 100
+
+    Returns:
+        float: Valor del percentil, o 0.0 si la lista está vacía
+    """
+    if not valores_ordenados:
+        return 0.0
+    indice = round(porcentaje / 100 * (len(valores_ordenados) - 1))
+    return valores_ordenados[indice]
+
+class _Espera:
+    __slots__ = ("cantidad", "total", "maximo", "agotadas", "muestras")
+
+    def __init__(self, muestras):
+        self.cantidad = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.agotadas = 0
+        self.muestras = deque(maxlen=muestras)
+
+class TelemetriaDeEsperas:
+    """
+    Registro de la duración real de cada espera, agrupada por nombre.
+
+    Permite ver cuánto tiempo de la corrida se pasa esperando al sitio y
+    cuántas esperas terminaron por agotar su tiempo máximo. Cantidad, total,
+    máximo y agotadas son exactos; los percentiles se calculan sobre las
+    últimas MUESTRAS_POR_ESPERA esperas de cada nombre, para que la memoria no
+    crezca en corridas de varias horas.
+    """
+
+    def __init__(self, muestras=MUESTRAS_POR_ESPERA):
+        self.muestras = muestras
+        self._esperas = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre, segundos, agotada=False):
+        with self._lock:
+            espera = self._esperas.get(nombre)
+            if espera is None:
+                espera = self._esperas[nombre] = _Espera(self.muestras)
+            espera.cantidad += 1
+            espera.total += segundos
+            if segundos > espera.maximo:
+                espera.maximo = segundos
+            if agotada:
+                espera.agotadas += 1
+            espera.muestras.append(segundos)
+
+    def reiniciar(self):
+        with self._lock:
+            self._esperas.clear()
+
+    def resumen(self):
+        """
+        Returns:
+            dict: Por nombre de espera, cantidad, total, percentiles y agotadas (segundos)
+        """
+        with self._lock:
+            resumen = {}
+            for nombre, espera in self._esperas.items():
+                ordenados = sorted(espera.muestras)
+                resumen[nombre] = {
+                    "cantidad": espera.cantidad,
+                    "total_s": round(espera.total, 3),
+                    "p50_s": round(percentil(ordenados, 50), 3),
+                    "p95_s": round(percentil(ordenados, 95), 3),
+                    "max_s": round(espera.maximo, 3),
+                    "agotadas": espera.agotadas,
+                }
+            return resumen
+
+    def imprimir(self):
+        resumen = self.resumen()
+        if not resumen:
+            return
+        print("Esperas:")
+        for nombre, r in sorted(resumen.items(), key=lambda item: -item[1]["total_s"]):
+            print(
+                f"  {nombre}: {r['cantidad']} esperas, {r['total_s']:.1f} s en total "
+                f"(p50 {r['p50_s']:.2f} s, p95 {r['p95_s']:.2f} s, máx {r['max_s']:.2f} s), "
+                f"{r['agotadas']} agotadas"
+            )
+
+# Telemetría compartida por todos los drivers del proceso
+telemetria = TelemetriaDeEsperas()
+
+def esperar(driver, condicion, timeout=10, nombre="espera"):
+    """
+    Espera una condición de Selenium y registra cuánto tardó.
+
+    Args:
+        driver: Instancia del webdriver
+        condicion (callable): Condición de expected_conditions o función(driver)
+        timeout (float): Segundos máximos de espera
+        nombre (str): Nombre de la espera en la telemetría
+
+    Returns:
+        El valor devuelto por la condición
+
+    Raises:
+        TimeoutException: Si la condición no se cumple a tiempo
+    """
+    inicio = time.perf_counter()
+    try:
+        resultado = WebDriverWait(driver, timeout, poll_frequency=0.05).until(condicion)
+    except TimeoutException:
+        telemetria.registrar(nombre, time.perf_counter() - inicio, agotada=True)
+        raise
+    telemetria.registrar(nombre, time.perf_counter() - inicio)
+    return resultado
+
+def ajax_inactivo(driver):
+    """Condición: el documento cargó y no hay solicitudes AJAX pendientes."""
+    try:
+        return bool(driver.execute_script(SCRIPT_AJAX_INACTIVO))
+    except Exception:
+        # Durante una navegación completa el script puede fallar; se reintenta
+        return False
+
+def esperar_ajax(driver, timeout=10, nombre="ajax"):
+    """
+    Espera a que terminen las solicitudes AJAX de RichFaces/JSF en curso.
+    """
+    return esperar(driver, ajax_inactivo, timeout, nombre)
+
+def elemento_presente(by, valor):
+    """
+    Condición: devuelve el primer elemento que coincide o False, sin esperar.
+    """
+    def _condicion(driver):
+        elementos = driver.find_elements(by, valor)
+        return elementos[0] if elementos else False
+    return _condicion
+
+def buscar_sin_esperar(driver, by, valor):
+    """
+    Devuelve el elemento si ya está en la página o None, sin consumir un timeout.
+
+    Se usa cuando la página terminó de cargarse y el elemento puede no existir
+    (por ejemplo, la tabla de movimientos de un expediente sin actuaciones).
+    """
+    elementos = driver.find_elements(by, valor)
+    return elementos[0] if elementos else None
+
+def esperar_reemplazo(driver, accion, by=By.CLASS_NAME, valor="table-striped", timeout=10, nombre="cambio de vista"):
+    """
+    Ejecuta una acción que reemplaza la vista y espera a que el contenido nuevo esté listo.
+
+    Toma una referencia al elemento actual, ejecuta la acción, espera a que esa
+    referencia quede obsoleta (la vista fue reemplazada, por navegación o por un
+    render AJAX) y luego a que el nuevo elemento esté presente y no haya AJAX
+    pendiente. Así no hace falta una pausa fija luego de cada clic.
+
+    Args:
+        driver: Instancia del webdriver
+        accion (callable): Función sin argumentos que dispara el cambio; si
+            devuelve False se considera que no hubo cambio
+        by: Método de localización del elemento que identifica la vista nueva
+        valor: Valor para localizar el elemento
+        timeout (float): Segundos máximos de cada espera
+        nombre (str): Nombre de la espera en la telemetría
+
+    Returns:
+        bool: True si la vista se reemplazó, False si la acción no se ejecutó
+    """
+    anterior = buscar_sin_esperar(driver, by, valor)
+    if accion() is False:
+        return False
+
+    inicio = time.perf_counter()
+    try:
+        if anterior is not None:
+            WebDriverWait(driver, timeout, poll_frequency=0.05).until(EC.staleness_of(anterior))
+        WebDriverWait(driver, timeout, poll_frequency=0.05).until(elemento_presente(by, valor))
+        WebDriverWait(driver, timeout, poll_frequency=0.05).until(ajax_inactivo)
+    except TimeoutException:
+        telemetria.registrar(nombre, time.perf_counter() - inicio, agotada=True)
+        raise
+    telemetria.registrar(nombre, time.perf_counter() - inicio)
+    return True
+
+class LimitadorAdaptativo:
+    """
+    Espaciado entre solicitudes al sitio que se ajusta a su latencia y a sus errores.
+
+    La pausa entre el inicio de dos solicitudes es una fracción ('factor') de la
+    latencia promedio observada (media móvil exponencial), acotada entre
+    'minimo' y 'maximo'. Cada error consecutivo duplica la pausa; los éxitos la
+    devuelven al valor derivado de la latencia. Si el sitio se vuelve lento o
+    empieza a fallar, el scraper se frena solo; si responde rápido, no espera
+    de más.
+
+    Es seguro entre hilos. La pausa se aplica a cada trabajador: con
+    'trabajadores' navegadores en paralelo, el turno compartido se otorga cada
+    'pausa / trabajadores' segundos, de modo que sumar navegadores aumenta el
+    ritmo total y cada uno sigue espaciando sus solicitudes en 'pausa'. La
+    latencia y los errores se comparten, así que un sitio lento frena a todos.
+    """
+
+    def __init__(self, minimo=0.2, maximo=10.0, factor=0.5, suavizado=0.2, trabajadores=1):
+        """
+        Args:
+            minimo (float): Pausa mínima entre solicitudes, en segundos
+            maximo (float): Pausa máxima entre solicitudes, en segundos
+            factor (float): Fracción de la latencia promedio usada como pausa
+            suavizado (float): Peso de cada nueva muestra en la media móvil
+            trabajadores (int): Navegadores o clientes que comparten el limitador
+        """
+        self.trabajadores = 1
+        self.configurar(minimo, maximo, factor, suavizado, trabajadores)
+        self.latencia_promedio = None
+        self.errores_consecutivos = 0
+        self.solicitudes = 0
+        self.errores = 0
+        self._proximo_turno = 0.0
+        self._lock = threading.Lock()
+
+    def configurar(self, minimo=None, maximo=None, factor=None, suavizado=None, trabajadores=None):
+        if minimo is not None:
+            self.minimo = minimo
+        if maximo is not None:
+            self.maximo = maximo
+        if factor is not None:
+            self.factor = factor
+        if suavizado is not None:
+            self.suavizado = suavizado
+        if trabajadores is not None:
+            self.trabajadores = max(1, trabajadores)
+
+    @property
+    def pausa(self):
+        """Pausa actual entre solicitudes, en segundos."""
+        base = self.factor * (self.latencia_promedio or 0.0)
+        base *= 2 ** min(self.errores_consecutivos, 6)
+        if self.errores_consecutivos:
+            base = max(base, self.minimo * 2 ** min(self.errores_consecutivos, 6))
+        return min(self.maximo, max(self.minimo, base))
+
+    def esperar_turno(self):
+        """
+        Bloquea hasta que corresponda enviar la próxima solicitud.
+
+        Returns:
+            float: Segundos esperados
+        """
+        with self._lock:
+            ahora = time.monotonic()
+            turno = max(ahora, self._proximo_turno)
+            self._proximo_turno = turno + self.pausa / self.trabajadores
+        espera = turno - ahora
+        if espera > 0:
+            time.sleep(espera)
+        telemetria.registrar("limitador", espera)
+        return espera
+
+    def registrar(self, latencia, exito=True):
+        """
+        Registra el resultado de una solicitud.
+
+        Args:
+            latencia (float): Segundos que tardó la respuesta
+            exito (bool): False si la solicitud falló o el sitio respondió con error
+        """
+        with self._lock:
+            self.solicitudes += 1
+            if self.latencia_promedio is None:
+                self.latencia_promedio = latencia
+            else:
+                self.latencia_promedio += self.suavizado * (latencia - self.latencia_promedio)
+            if exito:
+                self.errores_consecutivos = 0
+            else:
+                self.errores += 1
+                self.errores_consecutivos += 1
+
+    @contextmanager
+    def turno(self):
+        """
+        Espera el turno y mide la solicitud del bloque; una excepción cuenta como error.
+
+        Uso:
+            with limitador.turno():
+                boton.click()
+        """
+        self.esperar_turno()
+        inicio = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.registrar(time.perf_counter() - inicio, exito=False)
+            raise
+        self.registrar(time.perf_counter() - inicio)
+
+    def imprimir(self):
+        print(
+            f"Limitador: {self.solicitudes} solicitudes, {self.errores} con error, "
+            f"latencia promedio {self.latencia_promedio or 0.0:.2f} s, pausa actual {self.pausa:.2f} s"
+            f" por trabajador ({self.trabajadores})"
+        )
+
+# Limitador compartido por todos los drivers y clientes HTTP del proceso
+limitador = LimitadorAdaptativo()
@@ -0,0 +1,449 @@
+import time
+import logging
+import argparse
+from typing import Callable, List, Optional, Tuple
+
+from mysql.connector import Error, errorcode
+
+# Tabla donde se registran las migraciones aplicadas
+TABLA_VERSIONES = 'esquema_versiones'
+
+# Bloqueo con nombre para que dos procesos no migren la misma base a la vez
+BLOQUEO_MIGRACION = 'scraper_qanlex_esquema'
+ESPERA_BLOQUEO = 60
+
+# Particiones anuales de 'movimientos': una para lo anterior al primer año
+# (y las fechas nulas, que RANGE ubica en la menor), una por año y una final
+ANIO_PRIMERA_PARTICION = 2000
+ANIO_ULTIMA_PARTICION = 2035
+
+# Índices secundarios que la carga masiva puede construir al final: (tabla, nombre, columnas)
+INDICES_DIFERIBLES = (
+    ('movimientos', 'movimientos_expediente_fecha', ('expediente_id', 'fecha')),
+    ('participantes', 'participantes_tipo_nombre', ('tipo_id', 'nombre')),
+)
+
+# Índices propios de claves foráneas cubiertas por un índice diferible. Sin
+# ellos MySQL usa el compuesto para la clave foránea y no permite quitarlo
+# (ER_DROP_INDEX_FK)
+INDICES_DE_CLAVES_FORANEAS = (
+    ('participantes', 'participantes_tipo', ('tipo_id',)),
+)
+
+# Columnas de texto de la estructura original y su reemplazo por ids:
+# (tabla, columna, tabla de dimensión, columna de id, definición de la columna de id)
+COLUMNAS_DE_TEXTO = (
+    ('expedientes', 'jurisdiccion', 'jurisdicciones', 'jurisdiccion_id', 'SMALLINT UNSIGNED AFTER expediente'),
+    ('expedientes', 'dependencia', 'dependencias', 'dependencia_id', 'SMALLINT UNSIGNED AFTER jurisdiccion_id'),
+    ('movimientos', 'tipo', 'tipos_movimiento', 'tipo_id', 'SMALLINT UNSIGNED AFTER fecha'),
+    ('participantes', 'tipo', 'tipos_participante', 'tipo_id', 'TINYINT UNSIGNED AFTER expediente_id'),
+)
+
+ESQUEMA_INICIAL = (
+    """
+    CREATE TABLE IF NOT EXISTS jurisdicciones (
+        id SMALLINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+        nombre VARCHAR(255) COLLATE utf8mb4_bin NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dependencias (
+        id SMALLINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+        nombre VARCHAR(255) COLLATE utf8mb4_bin NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tipos_movimiento (
+        id SMALLINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+        nombre VARCHAR(255) COLLATE utf8mb4_bin NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tipos_participante (
+        id TINYINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+        nombre VARCHAR(255) COLLATE utf8mb4_bin NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS expedientes (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        expediente VARCHAR(255),
+        jurisdiccion_id SMALLINT UNSIGNED,
+        dependencia_id SMALLINT UNSIGNED,
+        situacion_actual VARCHAR(255),
+        caratula VARCHAR(255),
+        FOREIGN KEY (jurisdiccion_id) REFERENCES jurisdicciones(id),
+        FOREIGN KEY (dependencia_id) REFERENCES dependencias(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS movimientos (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        expediente_id INT,
+        fecha DATE,
+        tipo_id SMALLINT UNSIGNED,
+        detalle TEXT,
+        FOREIGN KEY (expediente_id) REFERENCES expedientes(id),
+        FOREIGN KEY (tipo_id) REFERENCES tipos_movimiento(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS participantes (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        expediente_id INT,
+        tipo_id TINYINT UNSIGNED,
+        nombre VARCHAR(255),
+        FOREIGN KEY (expediente_id) REFERENCES expedientes(id),
+        FOREIGN KEY (tipo_id) REFERENCES tipos_participante(id)
+    )
+    """,
+)
+
+VISTAS = (
+    """
+    CREATE OR REPLACE VIEW vista_expedientes AS
+        SELECT e.id, e.expediente, j.nombre AS jurisdiccion, d.nombre AS dependencia,
+               e.situacion_actual, e.caratula
+        FROM expedientes e
+        JOIN jurisdicciones j ON j.id = e.jurisdiccion_id
+        JOIN dependencias d ON d.id = e.dependencia_id
+    """,
+    """
+    CREATE OR REPLACE VIEW vista_movimientos AS
+        SELECT m.id, m.expediente_id, m.fecha, t.nombre AS tipo, m.detalle
+        FROM movimientos m JOIN tipos_movimiento t ON t.id = m.tipo_id
+    """,
+    """
+    CREATE OR REPLACE VIEW vista_participantes AS
+        SELECT p.id, p.expediente_id, t.nombre AS tipo, p.nombre
+        FROM participantes p JOIN tipos_participante t ON t.id = p.tipo_id
+    """,
+)
+
+logger = logging.getLogger(__name__)
+
+class ErrorDeEsquema(Exception):
+    """Error al consultar o migrar el esquema de la base."""
+    pass
+
+def _existe_tabla(cursor, tabla: str) -> bool:
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (tabla,)
+    )
+    return cursor.fetchone()[0] > 0
+
+def _existe_columna(cursor, tabla: str, columna: str) -> bool:
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (tabla, columna)
+    )
+    return cursor.fetchone()[0] > 0
+
+def _existe_indice(cursor, tabla: str, indice: str) -> bool:
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+        (tabla, indice)
+    )
+    return cursor.fetchone()[0] > 0
+
+def _claves_foraneas(cursor, tabla: str) -> List[str]:
+    cursor.execute(
+        "SELECT CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_TYPE = 'FOREIGN KEY'",
+        (tabla,)
+    )
+    return [nombre for (nombre,) in cursor.fetchall()]
+
+def _esta_particionada(cursor, tabla: str) -> bool:
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL",
+        (tabla,)
+    )
+    return cursor.fetchone()[0] > 0
+
+def _crear_esquema_inicial(cursor) -> None:
+    """
+    Crea las tablas de dimensión y de hechos que falten.
+
+    Las bases creadas a mano con la estructura del readme se adoptan tal cual.
+    """
+    for sentencia in ESQUEMA_INICIAL:
+        cursor.execute(sentencia)
+
+def _normalizar_columnas_de_texto(cursor) -> None:
+    """
+    Pasa las columnas de texto de la estructura original a ids de las tablas de dimensión.
+
+    Cada paso consulta information_schema antes de modificar, de modo que una
+    migración interrumpida (MySQL confirma cada ALTER por separado) se puede
+    repetir. La columna de texto se quita en el mismo ALTER que agrega la
+    clave foránea: mientras exista, la conversión de esa columna no terminó.
+    """
+    for tabla, columna, dimension, columna_id, definicion in COLUMNAS_DE_TEXTO:
+        if not _existe_columna(cursor, tabla, columna):
+            continue
+        cursor.execute(
+            f"INSERT IGNORE INTO {dimension} (nombre) "
+            f"SELECT DISTINCT TRIM(COALESCE({columna}, '')) COLLATE utf8mb4_bin FROM {tabla}"
+        )
+        if not _existe_columna(cursor, tabla, columna_id):
+            cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna_id} {definicion}")
+        cursor.execute(
+            f"UPDATE {tabla} x JOIN {dimension} d "
+            f"ON d.nombre = TRIM(COALESCE(x.{columna}, '')) COLLATE utf8mb4_bin "
+            f"SET x.{columna_id} = d.id"
+        )
+        cursor.execute(
+            f"ALTER TABLE {tabla} DROP COLUMN {columna}, "
+            f"ADD FOREIGN KEY ({columna_id}) REFERENCES {dimension}(id)"
+        )
+
+def _crear_vistas(cursor) -> None:
+    """Crea (o reemplaza) las vistas con los valores en texto."""
+    for sentencia in VISTAS:
+        cursor.execute(sentencia)
+
+def _clave_unica_de_expediente(cursor) -> None:
+    """
+    Agrega la clave única sobre el número de expediente.
+
+    Si la base ya tiene números repetidos (cargas 'fila' o 'lotes' repetidas
+    antes de esta versión) no se puede crear: hay que fusionarlos primero.
+    """
+    if _existe_indice(cursor, 'expedientes', 'expedientes_numero'):
+        return
+    cursor.execute(
+        "SELECT expediente, COUNT(*) FROM expedientes WHERE expediente IS NOT NULL "
+        "GROUP BY expediente HAVING COUNT(*) > 1 ORDER BY COUNT(*) DESC"
+    )
+    repetidos = cursor.fetchall()
+    if repetidos:
+        ejemplos = ", ".join(f"{numero} ({cantidad})" for numero, cantidad in repetidos[:5])
+        raise ErrorDeEsquema(
+            f"{len(repetidos)} números de expediente repetidos impiden crear la clave única "
+            f"(por ejemplo: {ejemplos}); hay que fusionarlos antes de migrar"
+        )
+    cursor.execute("ALTER TABLE expedientes ADD UNIQUE KEY expedientes_numero (expediente)")
+
+def _indices_compuestos(cursor) -> None:
+    """
+    Agrega los índices de movimientos por (expediente_id, fecha) y de participantes por (tipo_id, nombre).
+
+    Antes se crea 'participantes_tipo' sobre tipo_id: al existir el compuesto,
+    MySQL descarta el índice implícito de la clave foránea y el compuesto
+    quedaría imposible de quitar en las cargas con índices diferidos.
+    """
+    _crear_indices(cursor, INDICES_DE_CLAVES_FORANEAS)
+    crear_indices_diferidos(cursor)
+
+def _particionar_movimientos(cursor) -> None:
+    """
+    Particiona 'movimientos' por año de la fecha.
+
+    MySQL exige que toda clave única de una tabla particionada incluya la
+    columna de partición y no admite claves foráneas en ellas, por lo que la
+    clave primaria pasa a ser un índice común sobre 'id' (sigue siendo
+    AUTO_INCREMENT) y se quitan las claves foráneas de la tabla.
+    """
+    if _esta_particionada(cursor, 'movimientos'):
+        return
+    for clave in _claves_foraneas(cursor, 'movimientos'):
+        cursor.execute(f"ALTER TABLE movimientos DROP FOREIGN KEY `{clave}`")
+    if _existe_indice(cursor, 'movimientos', 'PRIMARY'):
+        cursor.execute("ALTER TABLE movimientos DROP PRIMARY KEY, ADD KEY movimientos_id (id)")
+    cursor.execute(f"ALTER TABLE movimientos PARTITION BY RANGE (YEAR(fecha)) ({definir_particiones()})")
+
+# Migraciones en orden: (versión, descripción, función que recibe el cursor)
+MIGRACIONES: List[Tuple[int, str, Callable]] = [
+    (1, "Tablas de dimensión y de hechos", _crear_esquema_inicial),
+    (2, "Columnas de texto a ids de las tablas de dimensión", _normalizar_columnas_de_texto),
+    (3, "Vistas con los valores en texto", _crear_vistas),
+    (4, "Clave única sobre el número de expediente", _clave_unica_de_expediente),
+    (5, "Índices compuestos de movimientos y participantes", _indices_compuestos),
+    (6, "Particionado anual de movimientos", _particionar_movimientos),
+]
+
+def definir_particiones(desde: int = ANIO_PRIMERA_PARTICION, hasta: int = ANIO_ULTIMA_PARTICION) -> str:
+    """
+    Arma la lista de particiones anuales de 'movimientos'.
+
+    Args:
+        desde (int): Primer año con partición propia
+        hasta (int): Último año con partición propia
+
+    Returns:
+        str: Definición de las particiones para PARTITION BY RANGE
+    """
+    particiones = [f"PARTITION p_anterior VALUES LESS THAN ({desde})"]
+    particiones.extend(f"PARTITION p{anio} VALUES LESS THAN ({anio + 1})" for anio in range(desde, hasta + 1))
+    particiones.append("PARTITION p_futuro VALUES LESS THAN MAXVALUE")
+    return ", ".join(particiones)
+
+def version_actual(cursor) -> int:
+    """
+    Devuelve la última versión aplicada del esquema (0 si nunca se migró).
+    """
+    if not _existe_tabla(cursor, TABLA_VERSIONES):
+        return 0
+    cursor.execute(f"SELECT COALESCE(MAX(version), 0) FROM {TABLA_VERSIONES}")
+    return cursor.fetchone()[0]
+
+def pendientes(cursor) -> List[Tuple[int, str, Callable]]:
+    """
+    Devuelve las migraciones todavía no aplicadas, en orden.
+    """
+    actual = version_actual(cursor)
+    return [migracion for migracion in MIGRACIONES if migracion[0] > actual]
+
+def migrar(conexion, hasta: Optional[int] = None) -> List[int]:
+    """
+    Aplica las migraciones pendientes y las registra en 'esquema_versiones'.
+
+    Cada migración es idempotente (consulta information_schema antes de
+    modificar), de modo que una interrumpida a mitad se puede repetir. Las
+    sentencias DDL de MySQL confirman de forma implícita, así que cada versión
+    se registra recién al terminar la suya. Al final se restauran los índices
+    diferidos que una carga masiva interrumpida haya dejado sin construir.
+
+    Args:
+        conexion: Conexión de mysql.connector a la base
+        hasta (int): Última versión a aplicar (por defecto, todas)
+
+    Returns:
+        list: Versiones aplicadas
+
+    Raises:
+        ErrorDeEsquema: Si otra migración está en curso o una migración falla
+    """
+    cursor = conexion.cursor()
+    aplicadas = []
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (BLOQUEO_MIGRACION, ESPERA_BLOQUEO))
+        if cursor.fetchone()[0] != 1:
+            raise ErrorDeEsquema(f"Otro proceso está migrando la base (esperé {ESPERA_BLOQUEO} s)")
+        try:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABLA_VERSIONES} ("
+                "version INT PRIMARY KEY, descripcion VARCHAR(255) NOT NULL, aplicada_en DATETIME NOT NULL)"
+            )
+            for version, descripcion, aplicar in pendientes(cursor):
+                if hasta is not None and version > hasta:
+                    break
+                logger.info(f"Aplicando la migración {version}: {descripcion}")
+                inicio = time.perf_counter()
+                aplicar(cursor)
+                cursor.execute(
+                    f"INSERT INTO {TABLA_VERSIONES} (version, descripcion, aplicada_en) VALUES (%s, %s, NOW())",
+                    (version, descripcion)
+                )
+                conexion.commit()
+                aplicadas.append(version)
+                logger.info(f"Migración {version} aplicada en {time.perf_counter() - inicio:.1f} s")
+
+            if version_actual(cursor) >= 5:
+                _crear_indices(cursor, INDICES_DE_CLAVES_FORANEAS)
+                crear_indices_diferidos(cursor)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (BLOQUEO_MIGRACION,))
+            cursor.fetchone()
+    except Error as e:
+        raise ErrorDeEsquema(f"Error al migrar el esquema: {e}")
+    finally:
+        cursor.close()
+    return aplicadas
+
+def _crear_indices(cursor, indices) -> List[str]:
+    creados = []
+    for tabla, nombre, columnas in indices:
+        try:
+            cursor.execute(f"ALTER TABLE {tabla} ADD INDEX {nombre} ({', '.join(columnas)})")
+            creados.append(nombre)
+        except Error as e:
+            if e.errno != errorcode.ER_DUP_KEYNAME:
+                raise
+    return creados
+
+def quitar_indices_diferidos(cursor) -> List[str]:
+    """
+    Quita los índices secundarios de movimientos y participantes antes de una carga masiva.
+
+    La clave única de expedientes y los índices de las claves foráneas se
+    conservan: la carga los necesita para validar y buscar ids. Las bases
+    migradas antes de que la versión 5 creara 'participantes_tipo' lo reciben
+    aquí. Si un índice no puede quitarse, se reconstruyen los ya quitados
+    antes de propagar el error.
+
+    Args:
+        cursor: Cursor de una conexión sin transacción abierta
+
+    Returns:
+        list: Nombres de los índices quitados
+    """
+    _crear_indices(cursor, INDICES_DE_CLAVES_FORANEAS)
+    quitados = []
+    try:
+        for tabla, nombre, _ in INDICES_DIFERIBLES:
+            try:
+                cursor.execute(f"ALTER TABLE {tabla} DROP INDEX {nombre}")
+                quitados.append(nombre)
+            except Error as e:
+                if e.errno != errorcode.ER_CANT_DROP_FIELD_OR_KEY:
+                    raise
+    except Error:
+        _crear_indices(cursor, [indice for indice in INDICES_DIFERIBLES if indice[1] in quitados])
+        raise
+    return quitados
+
+def crear_indices_diferidos(cursor) -> List[str]:
+    """
+    Construye los índices secundarios de movimientos y participantes que falten.
+
+    Args:
+        cursor: Cursor de una conexión sin transacción abierta
+
+    Returns:
+        list: Nombres de los índices creados
+    """
+    return _crear_indices(cursor, INDICES_DIFERIBLES)
+
+def main():
+    """
+    Migra la base de CONFIG_DB o muestra su versión.
+
+    Uso: python esquema.py [migrar|estado] [--hasta N]
+    """
+    parser = argparse.ArgumentParser(description="Esquema versionado de la base de expedientes")
+    parser.add_argument('accion', nargs='?', choices=['migrar', 'estado'], default='migrar')
+    parser.add_argument('--hasta', type=int, help="Última versión a aplicar")
+    args = parser.parse_args()
+
+    # Importado aquí: guardarDb usa este módulo para migrar antes de cargar
+    from guardarDb import CONFIG_DB, SubidorDeBaseDeDatos
+
+    subidor = SubidorDeBaseDeDatos(CONFIG_DB)
+    subidor._conectar()
+    try:
+        if args.accion == 'migrar':
+            aplicadas = migrar(subidor.conexion, args.hasta)
+            print(f"Migraciones aplicadas: {', '.join(map(str, aplicadas)) or 'ninguna'}")
+
+        cursor = subidor.conexion.cursor()
+        try:
+            print(f"Versión del esquema: {version_actual(cursor)} de {MIGRACIONES[-1][0]}")
+            for version, descripcion, _ in pendientes(cursor):
+                print(f"  pendiente {version}: {descripcion}")
+        finally:
+            cursor.close()
+    except (Error, ErrorDeEsquema) as e:
+        logger.error(str(e))
+        raise SystemExit(1)
+    finally:
+        subidor.cerrar()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
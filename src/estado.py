@@ -0,0 +1,597 @@
+import time
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS corridas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    termino TEXT NOT NULL,
+    jurisdiccion TEXT NOT NULL,
+    trabajo_id INTEGER,
+    pagina INTEGER NOT NULL DEFAULT 0,
+    fila INTEGER NOT NULL DEFAULT 0,
+    completada INTEGER NOT NULL DEFAULT 0,
+    iniciada_en TEXT NOT NULL,
+    actualizada_en TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS extraidos (
+    corrida_id INTEGER NOT NULL REFERENCES corridas (id),
+    expediente TEXT NOT NULL,
+    pagina INTEGER NOT NULL,
+    fila INTEGER NOT NULL,
+    extraido_en TEXT NOT NULL,
+    PRIMARY KEY (corrida_id, expediente)
+);
+
+CREATE TABLE IF NOT EXISTS fallos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    corrida_id INTEGER NOT NULL REFERENCES corridas (id),
+    pagina INTEGER NOT NULL,
+    fila INTEGER,
+    expediente TEXT,
+    motivo TEXT NOT NULL,
+    registrado_en TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fallos_corrida ON fallos (corrida_id);
+
+CREATE TABLE IF NOT EXISTS campanas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL UNIQUE,
+    creada_en TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS trabajos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campana_id INTEGER NOT NULL REFERENCES campanas (id),
+    termino TEXT NOT NULL,
+    jurisdiccion TEXT NOT NULL,
+    prioridad INTEGER NOT NULL DEFAULT 0,
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    disponible_desde REAL NOT NULL DEFAULT 0,
+    corrida_id INTEGER REFERENCES corridas (id),
+    expedientes INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    actualizado_en TEXT NOT NULL,
+    UNIQUE (campana_id, termino, jurisdiccion)
+);
+CREATE INDEX IF NOT EXISTS trabajos_pendientes ON trabajos (campana_id, estado, prioridad);
+
+CREATE TABLE IF NOT EXISTS expedientes_conocidos (
+    expediente TEXT PRIMARY KEY,
+    situacion TEXT,
+    ultima_fecha TEXT,
+    movimientos INTEGER NOT NULL DEFAULT 0,
+    verificado REAL NOT NULL
+);
+"""
+
+# Estados de un trabajo de campaña
+TRABAJO_PENDIENTE = "pendiente"
+TRABAJO_EN_CURSO = "en_curso"
+TRABAJO_COMPLETADO = "completado"
+TRABAJO_FALLIDO = "fallido"
+
+def _ahora():
+    return datetime.now().isoformat(timespec="seconds")
+
+def normalizar_expediente(texto):
+    """
+    Normaliza el número de expediente para usarlo como identificador.
+
+    Args:
+        texto (str): Número de expediente tal como aparece en la página
+
+    Returns:
+        str: Número sin espacios repetidos
+    """
+    return " ".join((texto or "").split())
+
+def fecha_iso(texto):
+    """
+    Convierte una fecha del sitio ('Fecha: dd/mm/aaaa' o 'dd/mm/aaaa') a ISO.
+
+    Returns:
+        str: Fecha 'aaaa-mm-dd', o None si el texto no es una fecha
+    """
+    texto = (texto or "").replace("Fecha:", "").strip()
+    try:
+        return datetime.strptime(texto, "%d/%m/%Y").date().isoformat()
+    except ValueError:
+        return None
+
+class EstadoDeRastreo:
+    """
+    Almacén persistente (SQLite) del avance de cada consulta.
+
+    Registra por corrida la página y fila alcanzadas y los expedientes ya
+    extraídos, de modo que una ejecución interrumpida pueda retomarse en la
+    última página sin volver a extraer lo que ya está en la salida.
+    """
+
+    def __init__(self, ruta="src/rastreo.db"):
+        """
+        Args:
+            ruta (str): Ruta de la base SQLite
+        """
+        self.ruta = ruta
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+        self._migrar()
+        self._lock = threading.Lock()
+
+    def _migrar(self):
+        """
+        Agrega 'corridas.trabajo_id' a las bases creadas antes de que existiera.
+
+        Las corridas de campaña existentes se asocian a su trabajo mediante
+        'trabajos.corrida_id'.
+        """
+        columnas = {fila[1] for fila in self._conexion.execute("PRAGMA table_info(corridas)")}
+        with self._conexion:
+            if "trabajo_id" not in columnas:
+                self._conexion.execute("ALTER TABLE corridas ADD COLUMN trabajo_id INTEGER")
+                self._conexion.execute(
+                    "UPDATE corridas SET trabajo_id = "
+                    "(SELECT t.id FROM trabajos t WHERE t.corrida_id = corridas.id)"
+                )
+            self._conexion.execute("DROP INDEX IF EXISTS corridas_consulta")
+            self._conexion.execute(
+                "CREATE INDEX IF NOT EXISTS corridas_por_consulta "
+                "ON corridas (termino, jurisdiccion, trabajo_id, completada)"
+            )
+
+    def _ejecutar(self, consulta, parametros=()):
+        with self._lock, self._conexion:
+            return self._conexion.execute(consulta, parametros).fetchall()
+
+    def iniciar_corrida(self, termino, jurisdiccion, trabajo_id=None):
+        """
+        Retoma la última corrida incompleta de la consulta o crea una nueva.
+
+        Las corridas de un trabajo de campaña solo se retoman desde ese mismo
+        trabajo, y las corridas sueltas solo desde otra corrida suelta, aunque
+        busquen lo mismo.
+
+        Args:
+            termino (str): Término buscado
+            jurisdiccion (str): Valor de 'camaraPartes'
+            trabajo_id (int): Trabajo de campaña de la corrida, o None para una corrida suelta
+
+        Returns:
+            ProgresoDeCorrida: Avance de la corrida
+        """
+        with self._lock, self._conexion:
+            fila = self._conexion.execute(
+                "SELECT id, pagina, fila FROM corridas "
+                "WHERE termino = ? AND jurisdiccion = ? AND trabajo_id IS ? AND completada = 0 "
+                "ORDER BY id DESC LIMIT 1",
+                (termino, jurisdiccion, trabajo_id)
+            ).fetchone()
+            if fila is None:
+                cursor = self._conexion.execute(
+                    "INSERT INTO corridas (termino, jurisdiccion, trabajo_id, iniciada_en, actualizada_en) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (termino, jurisdiccion, trabajo_id, _ahora(), _ahora())
+                )
+                fila = (cursor.lastrowid, 0, 0)
+        return ProgresoDeCorrida(self, *fila)
+
+    def expedientes_extraidos(self, corrida_id):
+        filas = self._ejecutar("SELECT expediente FROM extraidos WHERE corrida_id = ?", (corrida_id,))
+        return {expediente for expediente, in filas}
+
+    def registrar_expediente(self, corrida_id, expediente, pagina, fila, posicion=True):
+        with self._lock, self._conexion:
+            self._conexion.execute(
+                "INSERT OR IGNORE INTO extraidos (corrida_id, expediente, pagina, fila, extraido_en) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (corrida_id, expediente, pagina, fila, _ahora())
+            )
+            if posicion:
+                self._conexion.execute(
+                    "UPDATE corridas SET pagina = ?, fila = ?, actualizada_en = ? WHERE id = ?",
+                    (pagina, fila, _ahora(), corrida_id)
+                )
+
+    def registrar_pagina(self, corrida_id, pagina):
+        self._ejecutar(
+            "UPDATE corridas SET pagina = ?, fila = 0, actualizada_en = ? WHERE id = ?",
+            (pagina, _ahora(), corrida_id)
+        )
+
+    def registrar_fallo(self, corrida_id, pagina, motivo, fila=None, expediente=None):
+        """
+        Guarda una página, o una fila, que la corrida no pudo procesar.
+
+        Args:
+            corrida_id (int): Id de la corrida
+            pagina (int): Página afectada (desde 0)
+            motivo (str): Descripción del error
+            fila (int): Fila afectada, o None si falló la página entera
+            expediente (str): Número de expediente de la fila, si se conoce
+        """
+        self._ejecutar(
+            "INSERT INTO fallos (corrida_id, pagina, fila, expediente, motivo, registrado_en) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (corrida_id, pagina, fila, expediente, motivo, _ahora())
+        )
+
+    def fallos_de_corrida(self, corrida_id):
+        """
+        Returns:
+            list: Tuplas (pagina, fila, expediente, motivo) en el orden en que se registraron
+        """
+        return self._ejecutar(
+            "SELECT pagina, fila, expediente, motivo FROM fallos WHERE corrida_id = ? ORDER BY id",
+            (corrida_id,)
+        )
+
+    def completar_corrida(self, corrida_id):
+        self._ejecutar(
+            "UPDATE corridas SET completada = 1, actualizada_en = ? WHERE id = ?",
+            (_ahora(), corrida_id)
+        )
+
+    def crear_campana(self, nombre):
+        """
+        Devuelve el id de la campaña con ese nombre, creándola si no existe.
+        """
+        with self._lock, self._conexion:
+            self._conexion.execute(
+                "INSERT OR IGNORE INTO campanas (nombre, creada_en) VALUES (?, ?)", (nombre, _ahora())
+            )
+            return self._conexion.execute("SELECT id FROM campanas WHERE nombre = ?", (nombre,)).fetchone()[0]
+
+    def agregar_trabajos(self, campana_id, trabajos):
+        """
+        Agrega trabajos (termino, jurisdiccion, prioridad) a la campaña.
+
+        Los que ya existen conservan su estado, de modo que repetir el mismo
+        comando retoma la campaña. Su prioridad se actualiza.
+
+        Returns:
+            int: Cantidad de trabajos nuevos
+        """
+        nuevos = 0
+        with self._lock, self._conexion:
+            for termino, jurisdiccion, prioridad in trabajos:
+                cursor = self._conexion.execute(
+                    "INSERT OR IGNORE INTO trabajos (campana_id, termino, jurisdiccion, prioridad, actualizado_en) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (campana_id, termino, jurisdiccion, prioridad, _ahora())
+                )
+                if cursor.rowcount:
+                    nuevos += 1
+                else:
+                    self._conexion.execute(
+                        "UPDATE trabajos SET prioridad = ? WHERE campana_id = ? AND termino = ? AND jurisdiccion = ?",
+                        (prioridad, campana_id, termino, jurisdiccion)
+                    )
+        return nuevos
+
+    def reiniciar_trabajos_en_curso(self, campana_id):
+        """Devuelve a pendientes los trabajos que quedaron en curso por una interrupción."""
+        self._ejecutar(
+            "UPDATE trabajos SET estado = ?, actualizado_en = ? WHERE campana_id = ? AND estado = ?",
+            (TRABAJO_PENDIENTE, _ahora(), campana_id, TRABAJO_EN_CURSO)
+        )
+
+    def tomar_trabajo(self, campana_id, ahora):
+        """
+        Marca como en curso el trabajo pendiente de mayor prioridad disponible.
+
+        Args:
+            campana_id (int): Id de la campaña
+            ahora (float): Marca de tiempo actual (time.time())
+
+        Returns:
+            tuple: (id, termino, jurisdiccion, prioridad, intentos) o None si no hay
+        """
+        with self._lock, self._conexion:
+            fila = self._conexion.execute(
+                "SELECT id, termino, jurisdiccion, prioridad, intentos FROM trabajos "
+                "WHERE campana_id = ? AND estado = ? AND disponible_desde <= ? "
+                "ORDER BY prioridad DESC, intentos, id LIMIT 1",
+                (campana_id, TRABAJO_PENDIENTE, ahora)
+            ).fetchone()
+            if fila is None:
+                return None
+            self._conexion.execute(
+                "UPDATE trabajos SET estado = ?, intentos = intentos + 1, actualizado_en = ? WHERE id = ?",
+                (TRABAJO_EN_CURSO, _ahora(), fila[0])
+            )
+            return fila[:4] + (fila[4] + 1,)
+
+    def proxima_disponibilidad(self, campana_id):
+        """
+        Returns:
+            float: Menor 'disponible_desde' de los trabajos pendientes, o None si no quedan
+        """
+        fila = self._ejecutar(
+            "SELECT MIN(disponible_desde) FROM trabajos WHERE campana_id = ? AND estado = ?",
+            (campana_id, TRABAJO_PENDIENTE)
+        )
+        return fila[0][0]
+
+    def asignar_corrida(self, trabajo_id, corrida_id):
+        self._ejecutar(
+            "UPDATE trabajos SET corrida_id = ?, actualizado_en = ? WHERE id = ?",
+            (corrida_id, _ahora(), trabajo_id)
+        )
+
+    def finalizar_trabajo(self, trabajo_id, estado, expedientes=0, error=None, disponible_desde=0):
+        self._ejecutar(
+            "UPDATE trabajos SET estado = ?, expedientes = expedientes + ?, error = ?, "
+            "disponible_desde = ?, actualizado_en = ? WHERE id = ?",
+            (estado, expedientes, error, disponible_desde, _ahora(), trabajo_id)
+        )
+
+    def expedientes_de_campana(self, campana_id):
+        """
+        Returns:
+            set: Expedientes ya extraídos por cualquier trabajo de la campaña
+        """
+        filas = self._ejecutar(
+            "SELECT DISTINCT e.expediente FROM extraidos e "
+            "JOIN trabajos t ON t.corrida_id = e.corrida_id WHERE t.campana_id = ?",
+            (campana_id,)
+        )
+        return {expediente for expediente, in filas}
+
+    def resumen_campana(self, campana_id):
+        """
+        Returns:
+            dict: Cantidad de trabajos y de expedientes por estado
+        """
+        filas = self._ejecutar(
+            "SELECT estado, COUNT(*), SUM(expedientes) FROM trabajos WHERE campana_id = ? GROUP BY estado",
+            (campana_id,)
+        )
+        return {estado: {"trabajos": cantidad, "expedientes": total or 0} for estado, cantidad, total in filas}
+
+    def registrar_verificacion(self, expediente, situacion, ultima_fecha, movimientos, verificado):
+        """
+        Guarda el estado del expediente observado en su vista de detalle.
+
+        Args:
+            expediente (str): Número de expediente normalizado
+            situacion (str): Situación actual
+            ultima_fecha (str): Fecha ISO del último movimiento, o None
+            movimientos (int): Cantidad de movimientos
+            verificado (float): Marca de tiempo de la extracción (time.time())
+        """
+        self._ejecutar(
+            "INSERT INTO expedientes_conocidos (expediente, situacion, ultima_fecha, movimientos, verificado) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (expediente) DO UPDATE SET "
+            "situacion = excluded.situacion, ultima_fecha = excluded.ultima_fecha, "
+            "movimientos = excluded.movimientos, verificado = excluded.verificado",
+            (expediente, situacion, ultima_fecha, movimientos, verificado)
+        )
+
+    def expediente_conocido(self, expediente):
+        """
+        Returns:
+            tuple: (situacion, ultima_fecha, movimientos, verificado), o None si
+            el expediente nunca se extrajo
+        """
+        filas = self._ejecutar(
+            "SELECT situacion, ultima_fecha, movimientos, verificado FROM expedientes_conocidos "
+            "WHERE expediente = ?",
+            (expediente,)
+        )
+        return filas[0] if filas else None
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+class Deduplicador:
+    """
+    Conjunto de expedientes reclamados por los trabajos de una campaña.
+
+    Un expediente se reclama antes de abrirlo: si otro trabajo ya lo extrajo o
+    lo está extrayendo, se omite. Si la extracción falla, se libera para que
+    otro trabajo pueda intentarlo.
+    """
+
+    def __init__(self, expedientes=()):
+        self._reclamados = set(expedientes)
+        self._lock = threading.Lock()
+        self.omitidos = 0
+
+    def __len__(self):
+        return len(self._reclamados)
+
+    def reclamar(self, expediente):
+        """
+        Returns:
+            bool: True si el expediente no estaba reclamado y ahora lo está
+        """
+        with self._lock:
+            if expediente in self._reclamados:
+                self.omitidos += 1
+                return False
+            self._reclamados.add(expediente)
+            return True
+
+    def liberar(self, expediente):
+        with self._lock:
+            self._reclamados.discard(expediente)
+
+class PoliticaDeRefresco:
+    """
+    Decide qué expedientes de la tabla de resultados vale la pena volver a abrir.
+
+    Compara el resumen de la fila (situación y fecha de la última actuación)
+    con lo observado en la última extracción del expediente. Se vuelven a
+    abrir los expedientes nuevos, los que cambiaron y los que no se
+    verifican desde hace más de 'ttl' segundos; el resto se omite.
+    """
+
+    def __init__(self, estado, ttl):
+        """
+        Args:
+            estado (EstadoDeRastreo): Almacén con los expedientes conocidos
+            ttl (float): Segundos tras los que un expediente se vuelve a abrir aunque no cambie
+        """
+        self.estado = estado
+        self.ttl = ttl
+        self.motivos = Counter()
+        self._lock = threading.Lock()
+
+    def motivo_de_visita(self, expediente, situacion="", ultima_actualizacion="", ahora=None):
+        """
+        Args:
+            expediente (str): Número de expediente de la fila
+            situacion (str): Situación que muestra la fila
+            ultima_actualizacion (str): Fecha de la última actuación que muestra la fila
+            ahora (float): Marca de tiempo actual (por defecto, time.time())
+
+        Returns:
+            str: Motivo para abrir el expediente, o None si no cambió
+        """
+        conocido = self.estado.expediente_conocido(normalizar_expediente(expediente))
+        ahora = time.time() if ahora is None else ahora
+        if conocido is None:
+            motivo = "nuevo"
+        else:
+            situacion_conocida, ultima_fecha, _, verificado = conocido
+            fecha = fecha_iso(ultima_actualizacion)
+            situacion = normalizar_expediente(situacion)
+            if ahora - verificado >= self.ttl:
+                motivo = "verificación vencida"
+            elif fecha and (ultima_fecha is None or fecha > ultima_fecha):
+                motivo = "nueva actuación"
+            elif situacion and situacion != situacion_conocida:
+                motivo = "cambió la situación"
+            else:
+                motivo = None
+        with self._lock:
+            self.motivos[motivo or "sin cambios"] += 1
+        return motivo
+
+    def imprimir(self):
+        if self.motivos:
+            print("Refresco: " + ", ".join(f"{motivo}: {cantidad}" for motivo, cantidad in self.motivos.most_common()))
+
+class ProgresoDeCorrida:
+    """
+    Avance de una corrida: página actual y expedientes ya extraídos.
+
+    Las páginas se cuentan desde 0 (la primera página de resultados). Con
+    varios trabajadores las páginas terminan en cualquier orden; la página
+    registrada es la primera sin terminar, de modo que una reanudación no
+    saltea páginas pendientes.
+    """
+
+    def __init__(self, estado, corrida_id, pagina=0, fila=0, deduplicador=None):
+        self.estado = estado
+        self.corrida_id = corrida_id
+        self.pagina = pagina
+        self.fila = fila
+        self.deduplicador = deduplicador
+        self.refresco = None
+        self.completada = False
+        self._extraidos = estado.expedientes_extraidos(corrida_id)
+        self._completas = set()
+        self._lock = threading.Lock()
+
+    @property
+    def total_extraidos(self):
+        return len(self._extraidos)
+
+    def ya_extraido(self, expediente):
+        """Indica si el expediente ya fue extraído en esta corrida."""
+        return normalizar_expediente(expediente) in self._extraidos
+
+    def reclamar(self, expediente):
+        """
+        Reserva el expediente para extraerlo.
+
+        Returns:
+            bool: False si ya fue extraído en esta corrida o, dentro de una
+            campaña, si otro trabajo ya lo extrajo o lo está extrayendo
+        """
+        expediente = normalizar_expediente(expediente)
+        if expediente in self._extraidos:
+            return False
+        return self.deduplicador.reclamar(expediente) if self.deduplicador is not None else True
+
+    def sin_cambios(self, expediente, situacion="", ultima_actualizacion=""):
+        """
+        Indica si, en modo de refresco, el expediente puede omitirse por no haber cambiado.
+
+        Returns:
+            bool: False si no hay política de refresco o si el expediente debe abrirse
+        """
+        if self.refresco is None or not expediente:
+            return False
+        return self.refresco.motivo_de_visita(expediente, situacion, ultima_actualizacion) is None
+
+    def liberar(self, expediente):
+        """Devuelve un expediente reclamado cuya extracción falló."""
+        if self.deduplicador is not None:
+            self.deduplicador.liberar(normalizar_expediente(expediente))
+
+    def registrar_expediente(self, expediente, fila, pagina=None, datos=None):
+        """
+        Registra un expediente extraído en la fila indicada.
+
+        Args:
+            expediente (str): Número de expediente de la fila de resultados
+            fila (int): Índice de la fila dentro de la página
+            pagina (int): Página del expediente (por defecto, la actual)
+            datos (dict): Datos extraídos; si se indican, se guardan su situación
+                y su último movimiento para los refrescos posteriores
+        """
+        expediente = normalizar_expediente(expediente)
+        pagina = self.pagina if pagina is None else pagina
+        with self._lock:
+            self._extraidos.add(expediente)
+            # Solo la fila de la primera página sin terminar sirve como posición de reanudación
+            en_curso = pagina == self.pagina
+            if en_curso:
+                self.fila = fila
+        self.estado.registrar_expediente(self.corrida_id, expediente, pagina, fila, posicion=en_curso)
+        if datos:
+            registros = datos.get("registros_tabla") or []
+            fechas = [fecha_iso(r.get("fecha")) for r in registros if isinstance(r, dict)]
+            fechas = [fecha for fecha in fechas if fecha]
+            self.estado.registrar_verificacion(
+                expediente, normalizar_expediente(datos.get("situacion_actual")),
+                max(fechas, default=None), len(registros), time.time()
+            )
+
+    def registrar_fallo(self, motivo, pagina=None, fila=None, expediente=None):
+        """
+        Registra una página o fila que no se pudo procesar (por defecto, en la página actual).
+        """
+        pagina = self.pagina if pagina is None else pagina
+        expediente = normalizar_expediente(expediente) if expediente else None
+        self.estado.registrar_fallo(self.corrida_id, pagina, motivo, fila, expediente)
+
+    def registrar_pagina_completa(self, pagina):
+        """
+        Marca la página como procesada. Una reanudación comienza en la primera
+        página sin terminar: la siguiente, si las anteriores ya terminaron.
+        """
+        with self._lock:
+            self._completas.add(pagina)
+            anterior = self.pagina
+            while self.pagina in self._completas:
+                self._completas.discard(self.pagina)
+                self.pagina += 1
+            if self.pagina != anterior:
+                self.fila = 0
+                self.estado.registrar_pagina(self.corrida_id, self.pagina)
+
+    def completar(self):
+        """Marca la corrida como terminada; la próxima ejecución comenzará una nueva."""
+        self.estado.completar_corrida(self.corrida_id)
+        self.completada = True
@@ -0,0 +1,387 @@
+from html.parser import HTMLParser
+
+# Script que obtiene en una sola llamada los datos generales y los movimientos
+# del expediente abierto. Replica los selectores usados por la extracción
+# elemento por elemento.
+SCRIPT_DETALLE = """
+const texto = (el) => el ? (el.innerText || el.textContent || '').trim() : null;
+const porId = (id) => texto(document.getElementById(id));
+const contenedor = document.getElementsByClassName('col-xs-10')[0];
+const span = contenedor ? contenedor.getElementsByTagName('span')[0] : null;
+const registros = [];
+const tabla = document.getElementById('expediente:action-table');
+if (tabla) {
+    const filas = Array.from(tabla.querySelectorAll('tr')).slice(1);
+    for (const fila of filas) {
+        const celdas = fila.getElementsByTagName('td');
+        if (celdas.length >= 5) {
+            registros.push({
+                fecha: texto(celdas[2]),
+                tipo: texto(celdas[3]),
+                detalle: texto(celdas[4])
+            });
+        }
+    }
+}
+return {
+    expediente: texto(span),
+    jurisdiccion: porId('expediente:j_idt90:detailCamera'),
+    dependencia: porId('expediente:j_idt90:detailDependencia'),
+    situacion_actual: porId('expediente:j_idt90:detailSituation'),
+    caratula: porId('expediente:j_idt90:detailCover'),
+    registros_tabla: registros
+};
+"""
+
+# Script que obtiene actores y demandados de la pestaña "Intervinientes"
+SCRIPT_INTERVINIENTES = """
+const tabla = document.getElementById('expediente:participantsTable');
+const filas = tabla ? tabla.getElementsByClassName('rf-dt-r') : [];
+const participantes = [];
+for (const fila of filas) {
+    const tipo = fila.querySelector('td:nth-child(1)');
+    const nombre = fila.querySelector('td:nth-child(2)');
+    if (tipo && nombre) {
+        participantes.push([
+            (tipo.innerText || tipo.textContent || '').trim(),
+            (nombre.innerText || nombre.textContent || '').trim()
+        ]);
+    }
+}
+return participantes;
+"""
+
+# Script que toma, en una sola llamada, una instantánea de las filas de la tabla
+# de resultados: número de expediente (primera celda), situación y fecha de la
+# última actuación (cuarta y quinta) e id del enlace del ícono 'fa-eye' de cada fila.
+SCRIPT_FILAS_RESULTADOS = """
+const tabla = document.querySelector('table.table-striped');
+if (!tabla) { return null; }
+const filas = Array.from(tabla.querySelectorAll('tr')).slice(1);
+const texto = (celda) => celda ? (celda.innerText || celda.textContent || '').trim() : '';
+return filas.map((fila, indice) => {
+    const celdas = fila.querySelectorAll('td');
+    const icono = fila.querySelector('.fa-eye');
+    const enlace = icono ? icono.closest('a') : null;
+    return {
+        fila: indice,
+        expediente: texto(celdas[0]),
+        situacion: texto(celdas[3]),
+        ultima_actualizacion: texto(celdas[4]),
+        id_enlace: enlace && enlace.id ? enlace.id : null,
+        tiene_enlace: icono !== null
+    };
+});
+"""
+
+# Script que vuelve a ubicar el ícono de una fila de la instantánea: por el id
+# de su enlace o, si no tiene, por su posición. Verifica que la fila siga
+# mostrando el mismo expediente; si no, devuelve null.
+SCRIPT_ICONO_FILA = """
+const [indice, idEnlace, expediente] = arguments;
+let fila = null;
+if (idEnlace) {
+    const enlace = document.getElementById(idEnlace);
+    fila = enlace ? enlace.closest('tr') : null;
+} else {
+    const tabla = document.querySelector('table.table-striped');
+    fila = tabla ? tabla.querySelectorAll('tr')[indice + 1] || null : null;
+}
+if (!fila) { return null; }
+const celda = fila.querySelector('td');
+const texto = celda ? (celda.innerText || celda.textContent || '').trim() : '';
+if (expediente && texto !== expediente) { return null; }
+return fila.querySelector('.fa-eye');
+"""
+
+# Campos del encabezado que deben estar presentes para considerar válida la extracción
+CAMPOS_ENCABEZADO = ["expediente", "jurisdiccion", "dependencia", "situacion_actual", "caratula"]
+
+# Identificadores de los contenedores del encabezado del expediente
+IDS_ENCABEZADO = {
+    "jurisdiccion": "expediente:j_idt90:detailCamera",
+    "dependencia": "expediente:j_idt90:detailDependencia",
+    "situacion_actual": "expediente:j_idt90:detailSituation",
+    "caratula": "expediente:j_idt90:detailCover",
+}
+
+_ELEMENTOS_VACIOS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+_ELEMENTOS_BLOQUE = {
+    "div", "p", "tr", "table", "tbody", "thead", "li", "ul", "h1", "h2",
+    "h3", "h4", "h5", "h6", "section", "form", "dl", "dt", "dd",
+}
+_ELEMENTOS_OCULTOS = {"script", "style", "head", "title"}
+
+class ErrorDeExtraccion(Exception):
+    """Excepción para páginas de expediente que no tienen la estructura esperada."""
+    pass
+
+class Nodo:
+    """Elemento mínimo del árbol HTML construido por el parser local."""
+
+    __slots__ = ("tag", "attrs", "hijos", "padre")
+
+    def __init__(self, tag, attrs, padre=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.hijos = []
+        self.padre = padre
+
+    @property
+    def id(self):
+        return self.attrs.get("id")
+
+    @property
+    def clases(self):
+        return (self.attrs.get("class") or "").split()
+
+    def iterar(self):
+        """Recorre en profundidad los elementos descendientes (sin incluir textos)."""
+        pendientes = [hijo for hijo in reversed(self.hijos) if isinstance(hijo, Nodo)]
+        while pendientes:
+            nodo = pendientes.pop()
+            yield nodo
+            pendientes.extend(hijo for hijo in reversed(nodo.hijos) if isinstance(hijo, Nodo))
+
+    def buscar(self, tag=None, clase=None):
+        """Devuelve los descendientes que coinciden con el tag y/o la clase."""
+        return [
+            nodo for nodo in self.iterar()
+            if (tag is None or nodo.tag == tag) and (clase is None or clase in nodo.clases)
+        ]
+
+    def celdas(self):
+        """Devuelve las celdas 'td' propias de una fila (sin tablas anidadas)."""
+        return [hijo for hijo in self.hijos if isinstance(hijo, Nodo) and hijo.tag == "td"]
+
+    def texto(self):
+        """
+        Aproxima el texto visible del elemento (equivalente a '.text' de Selenium):
+        saltos de línea entre bloques y espacios colapsados dentro de cada línea.
+        """
+        partes = []
+        self._acumular_texto(partes)
+        lineas = (" ".join(linea.split()) for linea in "".join(partes).split("\n"))
+        return "\n".join(linea for linea in lineas if linea)
+
+    def _acumular_texto(self, partes):
+        if self.tag in _ELEMENTOS_OCULTOS:
+            return
+        if self.tag == "br":
+            partes.append("\n")
+            return
+        if self.tag in _ELEMENTOS_BLOQUE:
+            partes.append("\n")
+        for hijo in self.hijos:
+            if isinstance(hijo, Nodo):
+                hijo._acumular_texto(partes)
+            else:
+                partes.append(hijo)
+        if self.tag in _ELEMENTOS_BLOQUE:
+            partes.append("\n")
+        elif self.tag in ("td", "th"):
+            partes.append(" ")
+
+class _ConstructorDeArbol(HTMLParser):
+    """Construye un árbol de Nodo tolerante a etiquetas sin cerrar."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.raiz = Nodo("#documento", {})
+        self.por_id = {}
+        self._pila = [self.raiz]
+
+    def _cerrar_hasta(self, tags, limites):
+        for posicion in range(len(self._pila) - 1, 0, -1):
+            tag = self._pila[posicion].tag
+            if tag in limites:
+                return
+            if tag in tags:
+                del self._pila[posicion:]
+                return
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("td", "th"):
+            self._cerrar_hasta({"td", "th"}, {"tr", "table"})
+        elif tag == "tr":
+            self._cerrar_hasta({"tr"}, {"table", "tbody", "thead", "tfoot"})
+
+        actual = self._pila[-1]
+        nodo = Nodo(tag, {nombre: valor or "" for nombre, valor in attrs}, actual)
+        actual.hijos.append(nodo)
+        if nodo.id and nodo.id not in self.por_id:
+            self.por_id[nodo.id] = nodo
+        if tag not in _ELEMENTOS_VACIOS:
+            self._pila.append(nodo)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _ELEMENTOS_VACIOS:
+            self._pila.pop()
+
+    def handle_endtag(self, tag):
+        for posicion in range(len(self._pila) - 1, 0, -1):
+            if self._pila[posicion].tag == tag:
+                del self._pila[posicion:]
+                return
+
+    def handle_data(self, data):
+        self._pila[-1].hijos.append(data)
+
+class Documento:
+    """Árbol HTML de una página con búsqueda por id."""
+
+    def __init__(self, html):
+        constructor = _ConstructorDeArbol()
+        constructor.feed(html)
+        constructor.close()
+        self.raiz = constructor.raiz
+        self._por_id = constructor.por_id
+
+    def por_id(self, id_elemento):
+        return self._por_id.get(id_elemento)
+
+    def buscar(self, tag=None, clase=None):
+        return self.raiz.buscar(tag, clase)
+
+def _validar_encabezado(datos):
+    faltantes = [campo for campo in CAMPOS_ENCABEZADO if datos.get(campo) is None]
+    if faltantes:
+        raise ErrorDeExtraccion(f"No se encontraron los campos: {', '.join(faltantes)}")
+
+def parsear_detalle(html):
+    """
+    Extrae los datos generales y los movimientos desde el HTML de la vista de detalle.
+
+    Args:
+        html (str): Código fuente de la página del expediente
+
+    Returns:
+        dict: Datos con las claves del encabezado y 'registros_tabla'
+    """
+    documento = html if isinstance(html, Documento) else Documento(html)
+    datos = {}
+
+    contenedores = documento.buscar(clase="col-xs-10")
+    spans = contenedores[0].buscar(tag="span") if contenedores else []
+    datos["expediente"] = spans[0].texto() if spans else None
+
+    for campo, id_elemento in IDS_ENCABEZADO.items():
+        nodo = documento.por_id(id_elemento)
+        datos[campo] = nodo.texto() if nodo else None
+
+    registros_tabla = []
+    tabla = documento.por_id("expediente:action-table")
+    if tabla:
+        for fila in tabla.buscar(tag="tr")[1:]:
+            celdas = fila.celdas()
+            if len(celdas) >= 5:
+                registros_tabla.append({
+                    "fecha": celdas[2].texto(),
+                    "tipo": celdas[3].texto(),
+                    "detalle": celdas[4].texto()
+                })
+    datos["registros_tabla"] = registros_tabla
+
+    _validar_encabezado(datos)
+    return datos
+
+def parsear_intervinientes(html):
+    """
+    Extrae actores y demandados desde el HTML de la pestaña "Intervinientes".
+
+    Args:
+        html (str): Código fuente de la página del expediente
+
+    Returns:
+        tuple: (actores, demandados)
+    """
+    documento = html if isinstance(html, Documento) else Documento(html)
+    participantes = []
+    tabla = documento.por_id("expediente:participantsTable")
+    if tabla:
+        for fila in tabla.buscar(clase="rf-dt-r"):
+            celdas = fila.celdas()
+            if len(celdas) >= 2:
+                participantes.append((celdas[0].texto(), celdas[1].texto()))
+    return clasificar_participantes(participantes)
+
+def clasificar_participantes(participantes):
+    """
+    Separa los participantes en actores y demandados según su tipo.
+
+    Args:
+        participantes (list): Pares (tipo, nombre)
+
+    Returns:
+        tuple: (actores, demandados)
+    """
+    actores, demandados = [], []
+    for tipo, nombre in participantes:
+        tipo = tipo.upper()
+        if "ACTOR" in tipo:
+            actores.append(nombre)
+        elif "DEMANDADO" in tipo:
+            demandados.append(nombre)
+    return actores, demandados
+
+def extraer_detalle_por_script(driver):
+    """
+    Obtiene los datos generales y los movimientos con un único 'execute_script'.
+
+    Args:
+        driver: Instancia del webdriver
+
+    Returns:
+        dict: Datos con las claves del encabezado y 'registros_tabla'
+    """
+    datos = driver.execute_script(SCRIPT_DETALLE)
+    _validar_encabezado(datos)
+    return datos
+
+def extraer_intervinientes_por_script(driver):
+    """
+    Obtiene actores y demandados con un único 'execute_script'.
+
+    Args:
+        driver: Instancia del webdriver
+
+    Returns:
+        tuple: (actores, demandados)
+    """
+    return clasificar_participantes(driver.execute_script(SCRIPT_INTERVINIENTES))
+
+def leer_filas_resultados(driver):
+    """
+    Toma una instantánea de las filas de la página de resultados con un único 'execute_script'.
+
+    Args:
+        driver: Instancia del webdriver
+
+    Returns:
+        list: Por fila, un diccionario con 'fila', 'expediente', 'situacion',
+            'ultima_actualizacion', 'id_enlace' y 'tiene_enlace'
+
+    Raises:
+        ErrorDeExtraccion: Si la página no contiene la tabla de resultados
+    """
+    filas = driver.execute_script(SCRIPT_FILAS_RESULTADOS)
+    if filas is None:
+        raise ErrorDeExtraccion("La página no contiene la tabla de resultados")
+    return filas
+
+def ubicar_icono_de_fila(driver, fila):
+    """
+    Vuelve a ubicar el ícono 'fa-eye' de una fila de la instantánea.
+
+    Args:
+        driver: Instancia del webdriver
+        fila (dict): Fila devuelta por leer_filas_resultados
+
+    Returns:
+        WebElement: Ícono de la fila, o None si la fila ya no muestra ese expediente
+    """
+    return driver.execute_script(SCRIPT_ICONO_FILA, fila["fila"], fila["id_enlace"], fila["expediente"])
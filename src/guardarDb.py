@@ -1,11 +1,26 @@
 import os
-import json
+import zlib
+import time
+import queue
+import hashlib
 import logging
-from typing import List, Dict, Optional
+import argparse
+import tempfile
+import threading
+from typing import Callable, List, Dict, Iterable, Iterator, Optional
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode, pooling
+
+import esquema
+import instrumentacion
+from esquema import ErrorDeEsquema
+from indice import ErrorDeIndice, IndiceInvertido
+from instrumentacion import metricas
+from salida import EscritorJSONL, ErrorDeSalida, es_jsonl, leer_expedientes, ruta_derivada, segmentos
 
 # Configuración de logging para tener un seguimiento detallado de las operaciones
 logging.basicConfig(
@@ -13,10 +28,196 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# Configuración de conexión: variables de entorno de docker-compose o, si no
+# están definidas, la base de la red de docker-compose
+CONFIG_DB = {
+    'host': os.environ.get('DB_HOST', '172.30.0.2'),
+    'puerto': int(os.environ.get('DB_PORT', '3306')),
+    'usuario': os.environ.get('DB_USER', 'scraperuser'),
+    'contrasena': os.environ.get('DB_PASSWORD', 'scraperpass'),
+    'base_de_datos': os.environ.get('DB_NAME', 'scraper_data')
+}
+
+# Modos de subida de expedientes
+MODO_FILA = 'fila'
+MODO_LOTES = 'lotes'
+MODO_UPSERT = 'upsert'
+
+# Errores de MySQL tras los que se reintenta un lote en la carga en paralelo
+ERRORES_DE_CONEXION = {
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_SERVER_LOST_EXTENDED,
+    errorcode.CR_CONN_HOST_ERROR,
+}
+ERRORES_REINTENTABLES = {errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT} | ERRORES_DE_CONEXION
+
+# Marca de fin de fragmento en la cola de cada hilo de carga
+FIN = object()
+
+# Tablas de dimensión con los valores repetidos de las tablas de hechos
+DIMENSIONES = ('jurisdicciones', 'dependencias', 'tipos_movimiento', 'tipos_participante')
+
+# Columnas de las tablas de hechos
+COLUMNAS_EXPEDIENTES = ('id', 'expediente', 'jurisdiccion_id', 'dependencia_id', 'situacion_actual', 'caratula')
+COLUMNAS_MOVIMIENTOS = ('expediente_id', 'fecha', 'tipo_id', 'detalle')
+COLUMNAS_PARTICIPANTES = ('expediente_id', 'tipo_id', 'nombre')
+
+def huella(*valores) -> str:
+    """
+    Calcula el hash de contenido de una fila (movimiento o participante).
+    
+    :param valores: Valores de la fila; las fechas se normalizan a ISO y None a ''
+    :return: Hash SHA-1 en hexadecimal
+    """
+    partes = [
+        valor.isoformat() if hasattr(valor, 'isoformat') else ('' if valor is None else str(valor))
+        for valor in valores
+    ]
+    return hashlib.sha1('\x1f'.join(partes).encode('utf-8')).hexdigest()
+
+def _nuevo_resumen() -> Dict[str, Dict[str, int]]:
+    return {
+        tabla: {'insertados': 0, 'actualizados': 0, 'sin_cambios': 0}
+        for tabla in ('expedientes', 'movimientos', 'participantes')
+    }
+
+def _sumar_resumen(destino: Dict[str, Dict[str, int]], origen: Dict[str, Dict[str, int]]) -> None:
+    for tabla, contadores in origen.items():
+        for clave, valor in contadores.items():
+            destino[tabla][clave] += valor
+
+def agrupar_en_lotes(elementos: Iterable, tamano: int) -> Iterator[List]:
+    """
+    Agrupa un iterable en listas de a lo sumo 'tamano' elementos, sin materializarlo.
+    
+    :param elementos: Iterable a agrupar
+    :param tamano: Cantidad máxima de elementos por lote
+    :return: Iterador de lotes
+    """
+    lote = []
+    for elemento in elementos:
+        lote.append(elemento)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def _valor_tsv(valor) -> str:
+    """Convierte un valor al formato de texto que espera LOAD DATA (NULL como \\N)."""
+    if valor is None:
+        return '\\N'
+    texto = valor.isoformat() if hasattr(valor, 'isoformat') else str(valor)
+    return (
+        texto.replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
 class ScraperDatabaseError(Exception):
     """Excepción personalizada para manejar errores específicos de la base de datos."""
     pass
 
+class InternadorDeValores:
+    """
+    Cache en proceso de los ids de las tablas de dimensión.
+
+    Jurisdicciones, dependencias y tipos de movimiento y de participante son
+    unos pocos cientos de valores repetidos en millones de filas: cada valor se
+    guarda una sola vez en su tabla de dimensión y las tablas de hechos
+    referencian su id. Los valores que no están en la cache se resuelven por
+    lote (un SELECT y, si faltan, un INSERT IGNORE); los ids insertados en una
+    transacción que se revierte se descartan de la cache.
+    """
+
+    def __init__(self):
+        self.ids = {tabla: {} for tabla in DIMENSIONES}
+        self._pendientes = {tabla: set() for tabla in DIMENSIONES}
+        self.aciertos = 0
+        self.consultas = 0
+
+    @staticmethod
+    def normalizar(valor) -> str:
+        """
+        Texto con el que se guarda un valor (None como '' y sin espacios en los extremos).
+
+        :param valor: Valor scrapeado
+        :return: Texto normalizado
+        """
+        return '' if valor is None else str(valor).strip()
+
+    def resolver(self, cursor, tabla: str, valores: Iterable, filas_por_sentencia: int = 500) -> None:
+        """
+        Asegura que todos los valores tengan id en la cache, insertando los nuevos.
+
+        :param cursor: Cursor de la conexión activa
+        :param tabla: Tabla de dimensión
+        :param valores: Valores ya normalizados
+        :param filas_por_sentencia: Máximo de valores por sentencia
+        :raises ScraperDatabaseError: Si un valor no pudo obtener su id
+        """
+        cache = self.ids[tabla]
+        faltantes = []
+        for valor in set(valores):
+            if valor in cache:
+                self.aciertos += 1
+            else:
+                faltantes.append(valor)
+        # Un orden fijo evita interbloqueos entre cargas que insertan los mismos valores
+        faltantes.sort()
+
+        for inicio in range(0, len(faltantes), filas_por_sentencia):
+            bloque = faltantes[inicio:inicio + filas_por_sentencia]
+            encontrados = self._buscar(cursor, tabla, bloque)
+            nuevos = [valor for valor in bloque if valor not in encontrados]
+            if nuevos:
+                cursor.execute(
+                    f"INSERT IGNORE INTO {tabla} (nombre) VALUES " + ", ".join(["(%s)"] * len(nuevos)),
+                    nuevos
+                )
+                # Lectura con bloqueo: ve también los valores que otra carga confirmó recién
+                insertados = self._buscar(cursor, tabla, nuevos, " LOCK IN SHARE MODE")
+                if len(insertados) != len(nuevos):
+                    perdidos = [valor for valor in nuevos if valor not in insertados]
+                    raise ScraperDatabaseError(f"No se pudo internar en {tabla}: {perdidos[:5]}")
+                encontrados.update(insertados)
+                self._pendientes[tabla].update(insertados)
+            cache.update(encontrados)
+
+    def _buscar(self, cursor, tabla: str, valores: List[str], bloqueo: str = '') -> Dict[str, int]:
+        self.consultas += 1
+        marcadores = ", ".join(["%s"] * len(valores))
+        cursor.execute(f"SELECT id, nombre FROM {tabla} WHERE nombre IN ({marcadores}){bloqueo}", valores)
+        return {nombre: id_valor for id_valor, nombre in cursor.fetchall()}
+
+    def id(self, tabla: str, valor) -> int:
+        """
+        Devuelve el id de un valor ya resuelto.
+
+        :param tabla: Tabla de dimensión
+        :param valor: Valor scrapeado (se normaliza)
+        :return: Id del valor en la tabla de dimensión
+        """
+        return self.ids[tabla][self.normalizar(valor)]
+
+    def confirmar(self) -> None:
+        """Da por persistidos los valores insertados en la transacción confirmada."""
+        for pendientes in self._pendientes.values():
+            pendientes.clear()
+
+    def descartar(self) -> None:
+        """Olvida los valores insertados en la transacción revertida."""
+        for tabla, pendientes in self._pendientes.items():
+            for valor in pendientes:
+                self.ids[tabla].pop(valor, None)
+            pendientes.clear()
+
+    def resumen(self) -> str:
+        cantidades = ", ".join(f"{tabla} {len(ids)}" for tabla, ids in self.ids.items())
+        return f"Valores internados: {cantidades} ({self.aciertos} aciertos de cache, {self.consultas} consultas)"
+
 class SubidorDeBaseDeDatos:
     """
     Clase para subir datos scrapeados a una base de datos MySQL.
@@ -25,29 +226,43 @@ class SubidorDeBaseDeDatos:
     el proceso de transferencia de información desde archivos JSON a MySQL.
     """
 
-    def __init__(self, config: Dict[str, str]):
+    def __init__(self, config: Dict[str, str], fabrica_conexion: Optional[Callable] = None):
         """
         Inicializa la configuración de conexión a la base de datos.
         
         :param config: Diccionario con configuraciones de conexión
         :type config: Dict[str, str]
+        :param fabrica_conexion: Función que crea la conexión en lugar de
+            mysql.connector (por ejemplo, la base simulada de los benchmarks)
         """
         self.config = config
+        self.fabrica_conexion = fabrica_conexion
         self.logger = logging.getLogger(self.__class__.__name__)
         self.conexion = None
+        self.internador = InternadorDeValores()
+        self.ids_autoincrementales = False
+        # Índice invertido a actualizar con los expedientes confirmados (opcional)
+        self.indice = None
 
-    def _conectar(self) -> None:
+    def _conectar(self, permitir_infile: bool = False) -> None:
         """
         Establece una conexión segura con la base de datos MySQL.
         
+        :param permitir_infile: Habilitar LOAD DATA LOCAL INFILE en la conexión
         :raises ScraperDatabaseError: Si no se puede establecer la conexión
         """
         try:
+            if self.fabrica_conexion:
+                self.conexion = self.fabrica_conexion()
+                return
+
             self.conexion = mysql.connector.connect(
                 host=self.config['host'],
+                port=self.config.get('puerto', 3306),
                 user=self.config['usuario'],
                 password=self.config['contrasena'],
-                database=self.config['base_de_datos']
+                database=self.config['base_de_datos'],
+                allow_local_infile=permitir_infile
             )
             if self.conexion.is_connected():
                 self.logger.info("Conexión exitosa a la base de datos")
@@ -56,30 +271,91 @@ class SubidorDeBaseDeDatos:
             self.logger.error(error_msg)
             raise ScraperDatabaseError(error_msg)
 
+    def _confirmar(self) -> None:
+        """Confirma la transacción en curso y los valores internados en ella."""
+        with metricas.medir('db_commit'):
+            self.conexion.commit()
+        self.internador.confirmar()
+
+    def _revertir(self) -> None:
+        """Revierte la transacción en curso y descarta los valores internados en ella."""
+        try:
+            self.conexion.rollback()
+        except Error as e:
+            # Si se perdió la conexión, el servidor ya revirtió la transacción
+            self.logger.warning(f"No se pudo revertir la transacción: {e}")
+        finally:
+            self.internador.descartar()
+
+    def _soltar_conexion(self) -> None:
+        """Libera la conexión actual aunque se haya perdido (una conexión de pool vuelve al pool)."""
+        if self.conexion is None:
+            return
+        try:
+            self.conexion.close()
+        except Error:
+            pass
+        self.conexion = None
+
     def _cerrar_conexion(self) -> None:
         """Cierra de manera segura la conexión a la base de datos."""
         if self.conexion and self.conexion.is_connected():
             self.conexion.close()
+            self.conexion = None
             self.logger.info("Conexión a la base de datos cerrada")
+        else:
+            self._soltar_conexion()
 
-    def _validar_datos(self, datos: List[Dict]) -> bool:
+    def _validar_caso(self, caso) -> Optional[str]:
         """
-        Valida la estructura básica de los datos scrapeados.
+        Valida la estructura básica de un expediente scrapeado.
         
-        :param datos: Lista de diccionarios con datos scrapeados
-        :return: True si los datos son válidos, False en caso contrario
+        :param caso: Diccionario con los datos de un expediente
+        :return: Motivo del rechazo, o None si el expediente es válido
         """
-        if not datos:
-            self.logger.warning("No hay datos para procesar")
-            return False
-        
+        if not isinstance(caso, dict):
+            return "El registro no es un objeto"
+
         campos_requeridos = ['expediente', 'jurisdiccion', 'dependencia']
-        for caso in datos:
-            if not all(campo in caso for campo in campos_requeridos):
-                self.logger.error(f"Datos incompletos: {caso}")
-                return False
+        faltantes = [campo for campo in campos_requeridos if campo not in caso]
+        if faltantes:
+            return f"Faltan campos requeridos: {', '.join(faltantes)}"
+
+        registros = caso.get('registros_tabla') or []
+        if not isinstance(registros, list) or not all(
+            isinstance(registro, dict) and all(clave in registro for clave in ('fecha', 'tipo', 'detalle'))
+            for registro in registros
+        ):
+            return "Movimientos con formato inválido"
+
+        for campo in ('actores', 'demandados'):
+            if not isinstance(caso.get(campo) or [], list):
+                return f"El campo '{campo}' no es una lista"
+
+        return None
+
+    def _leer_casos_validos(self, ruta_archivo: str, rechazos: Dict) -> Iterator[Dict]:
+        """
+        Lee los expedientes de a uno y descarta los inválidos.
+        
+        Los expedientes inválidos se escriben, junto con el motivo, en
+        '<archivo>.rechazados.jsonl' en lugar de interrumpir la subida.
         
-        return True
+        :param ruta_archivo: Ruta al archivo JSON o JSONL con datos
+        :param rechazos: Diccionario donde se acumulan 'cantidad' y 'escritor'
+        :return: Iterador de expedientes válidos
+        """
+        for numero, caso in enumerate(leer_expedientes(ruta_archivo), start=1):
+            motivo = self._validar_caso(caso)
+            if motivo is None:
+                yield caso
+                continue
+
+            self.logger.error(f"Expediente {numero} rechazado: {motivo}")
+            if rechazos.get('escritor') is None:
+                rechazos['escritor'] = EscritorJSONL(ruta_derivada(ruta_archivo, 'rechazados'), fsync_segundos=None)
+            rechazos['escritor'].escribir({'numero': numero, 'motivo': motivo, 'registro': caso})
+            rechazos['cantidad'] = rechazos.get('cantidad', 0) + 1
 
     def limpiar_fecha(self, fecha: Optional[str]) -> Optional[datetime]:
         """
@@ -99,85 +375,78 @@ class SubidorDeBaseDeDatos:
             self.logger.warning(f"No se pudo convertir la fecha: {fecha}")
             return None
 
-    def subir_expedientes(self, archivo_datos_scrapeados: str) -> None:
+    def subir_expedientes(self, archivo_datos_scrapeados: str, modo: str = MODO_FILA,
+                          tamano_lote: int = 1000, atomico: bool = True,
+                          usar_infile: bool = False) -> Dict[str, Dict[str, int]]:
         """
         Sube los datos de expedientes desde un archivo JSON a la base de datos.
         
-        :param archivo_datos_scrapeados: Ruta al archivo JSON con datos
+        Acepta tanto el arreglo JSON legado como la salida JSON Lines del
+        scraper (con sus segmentos rotados y compresión gzip/zstd). Los
+        expedientes se leen y validan de a uno y se envían directamente a los
+        lotes de inserción, por lo que la memoria no depende del tamaño del
+        archivo. Los inválidos se descartan hacia '<archivo>.rechazados.jsonl'.
+        
+        :param archivo_datos_scrapeados: Ruta al archivo JSON o JSONL con datos
+        :param modo: 'fila' (un INSERT por expediente), 'lotes' (INSERT de varias filas)
+            o 'upsert' (actualiza los expedientes existentes e inserta solo lo nuevo)
+        :param tamano_lote: Expedientes por lote en los modos 'lotes' y 'upsert'
+        :param atomico: En los modos 'lotes' y 'upsert', confirmar todo en una única
+            transacción; si es False se confirma cada lote por separado
+        :param usar_infile: En el modo 'lotes', cargar movimientos y participantes
+            con LOAD DATA LOCAL INFILE
+        :return: Cantidad de filas insertadas, actualizadas y sin cambios por tabla
         :raises ScraperDatabaseError: Si ocurre un error durante la subida de datos
         """
+        resumen = _nuevo_resumen()
+        rechazos = {}
         try:
-            # Leer y validar datos
-            with open(archivo_datos_scrapeados, 'r', encoding='utf-8') as archivo:
-                datos_scrapeados = json.load(archivo)
-            
-            if not self._validar_datos(datos_scrapeados):
-                raise ScraperDatabaseError("Datos inválidos para subir")
+            if modo not in (MODO_FILA, MODO_LOTES, MODO_UPSERT):
+                raise ScraperDatabaseError(f"Modo de subida desconocido: {modo}")
+
+            # Leer y validar datos a medida que se insertan
+            casos = self._leer_casos_validos(archivo_datos_scrapeados, rechazos)
 
             # Establecer conexión
-            self._conectar()
+            self._conectar(permitir_infile=usar_infile)
             cursor = self.conexion.cursor()
 
-            # Procesar cada caso
-            for caso in datos_scrapeados:
-                # Inserción de expediente principal
-                consulta_expediente = """
-                INSERT INTO expedientes 
-                (expediente, jurisdiccion, dependencia, situacion_actual, caratula) 
-                VALUES (%s, %s, %s, %s, %s)
-                """
-                valores_expediente = (
-                    caso.get('expediente', ''),
-                    caso.get('jurisdiccion', ''),
-                    caso.get('dependencia', ''),
-                    caso.get('situacion_actual', ''),
-                    caso.get('caratula', '')
-                )
-                
-                cursor.execute(consulta_expediente, valores_expediente)
-                expediente_id = cursor.lastrowid
-
-                # Inserción de movimientos
-                if caso.get('registros_tabla'):
-                    consulta_movimientos = """
-                    INSERT INTO movimientos 
-                    (expediente_id, fecha, tipo, detalle) 
-                    VALUES (%s, %s, %s, %s)
-                    """
-                    valores_movimientos = [
-                        (expediente_id, 
-                         self.limpiar_fecha(registro['fecha']), 
-                         registro['tipo'], 
-                         registro['detalle']) 
-                        for registro in caso.get('registros_tabla', [])
-                    ]
-                    cursor.executemany(consulta_movimientos, valores_movimientos)
-
-                # Inserción de participantes
-                consulta_participantes = """
-                INSERT INTO participantes 
-                (expediente_id, tipo, nombre) 
-                VALUES (%s, %s, %s)
-                """
-                valores_participantes = (
-                    [(expediente_id, 'ACTOR', actor) for actor in caso.get('actores', [])] +
-                    [(expediente_id, 'DEMANDADO', demandado) for demandado in caso.get('demandados', [])]
+            if modo == MODO_UPSERT:
+                self._actualizar_por_lotes(cursor, agrupar_en_lotes(casos, tamano_lote), atomico, resumen)
+            elif modo == MODO_LOTES:
+                self._insertar_por_lotes(cursor, agrupar_en_lotes(casos, tamano_lote), atomico, usar_infile, resumen)
+            else:
+                self._insertar_por_fila(cursor, casos, resumen)
+
+            if rechazos.get('cantidad'):
+                self.logger.warning(
+                    f"{rechazos['cantidad']} expedientes rechazados en {rechazos['escritor'].ruta}"
                 )
-                
-                if valores_participantes:
-                    cursor.executemany(consulta_participantes, valores_participantes)
+
+            procesados = sum(resumen['expedientes'].values())
+            if not procesados:
+                self.logger.warning("No hay datos para procesar")
+                raise ScraperDatabaseError("Datos inválidos para subir")
 
             # Confirmar transacción
-            self.conexion.commit()
+            self._confirmar()
             self.logger.info("¡Datos subidos exitosamente!")
+            for tabla, contadores in resumen.items():
+                self.logger.info(
+                    f"{tabla}: {contadores['insertados']} insertados, "
+                    f"{contadores['actualizados']} actualizados, {contadores['sin_cambios']} sin cambios"
+                )
+            self.logger.info(self.internador.resumen())
+            self._indexar(caso for caso in leer_expedientes(archivo_datos_scrapeados) if not self._validar_caso(caso))
 
             # Eliminar archivo después de subida exitosa
             self._eliminar_archivo(archivo_datos_scrapeados)
+            return resumen
 
-        except (Error, ScraperDatabaseError) as e:
+        except (Error, ScraperDatabaseError, ErrorDeSalida, OSError) as e:
             self.logger.error(f"Error al subir los datos: {e}")
             if self.conexion:
-                self.conexion.rollback()
+                self._revertir()
             raise
         
         finally:
@@ -185,45 +454,840 @@ class SubidorDeBaseDeDatos:
             if 'cursor' in locals():
                 cursor.close()
             self._cerrar_conexion()
+            if rechazos.get('escritor'):
+                rechazos['escritor'].cerrar()
+
+    def subir_lote(self, lote: List[Dict], modo: str = MODO_UPSERT,
+                   usar_infile: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        Sube y confirma un lote de expedientes sobre una conexión persistente.
+        
+        Pensado para cargas incrementales (por ejemplo, desde el pipeline): la
+        conexión se abre en la primera llamada y se reutiliza en las siguientes
+        hasta llamar a 'cerrar'. Los expedientes inválidos se omiten.
+        
+        :param lote: Expedientes a subir
+        :param modo: 'fila', 'lotes' o 'upsert'
+        :param usar_infile: En el modo 'lotes', cargar movimientos y participantes
+            con LOAD DATA LOCAL INFILE
+        :return: Cantidad de filas insertadas, actualizadas y sin cambios por tabla
+        :raises Error: Si falla la subida (el lote se revierte completo)
+        """
+        resumen = _nuevo_resumen()
+        validos = []
+        for caso in lote:
+            motivo = self._validar_caso(caso)
+            if motivo:
+                self.logger.error(f"Expediente rechazado: {motivo}")
+            else:
+                validos.append(caso)
+        if not validos:
+            return resumen
+
+        if self.conexion is not None and not self.conexion.is_connected():
+            self._soltar_conexion()
+        if self.conexion is None:
+            self._conectar(permitir_infile=usar_infile)
+
+        cursor = self.conexion.cursor()
+        try:
+            if modo == MODO_UPSERT:
+                self._actualizar_lote(cursor, validos, resumen)
+            elif modo == MODO_LOTES:
+                self._insertar_lote(cursor, validos, usar_infile, resumen)
+            else:
+                self._insertar_por_fila(cursor, validos, resumen)
+            self._confirmar()
+        except (Error, ScraperDatabaseError):
+            self._revertir()
+            raise
+        finally:
+            cursor.close()
+        self._indexar(validos)
+        return resumen
+
+    def cerrar(self) -> None:
+        """Cierra la conexión persistente abierta por 'subir_lote'."""
+        self._cerrar_conexion()
+
+    def migrar_esquema(self) -> List[int]:
+        """
+        Aplica las migraciones pendientes del esquema de la base (ver esquema.py).
+        
+        :return: Versiones aplicadas
+        :raises ScraperDatabaseError: Si la base no se puede migrar
+        """
+        self._conectar()
+        try:
+            aplicadas = esquema.migrar(self.conexion)
+        except ErrorDeEsquema as e:
+            raise ScraperDatabaseError(str(e))
+        finally:
+            self._cerrar_conexion()
+        if aplicadas:
+            self.logger.info(f"Esquema migrado a la versión {aplicadas[-1]}")
+        return aplicadas
+
+    def _ejecutar_ddl(self, operacion: Callable) -> List[str]:
+        """
+        Ejecuta una operación de esquema sobre una conexión propia, sin transacción abierta.
+        
+        :param operacion: Función de esquema.py que recibe el cursor
+        :return: Lo que devuelva la operación
+        :raises ScraperDatabaseError: Si la operación falla
+        """
+        self._conectar()
+        cursor = self.conexion.cursor()
+        try:
+            return operacion(cursor)
+        except Error as e:
+            raise ScraperDatabaseError(f"Error al modificar los índices: {e}")
+        finally:
+            cursor.close()
+            self._cerrar_conexion()
+
+    @contextmanager
+    def indices_diferidos(self) -> Iterator[List[str]]:
+        """
+        Quita los índices secundarios diferibles durante una carga masiva y los construye al final.
+        
+        Construir cada índice una vez, ordenando todas las filas, es más rápido
+        que mantenerlo fila por fila durante la carga. Las sentencias se
+        ejecutan en una conexión propia y fuera de la transacción de la carga:
+        el DDL confirma de forma implícita y esperaría a sus bloqueos. Los
+        índices se reconstruyen aunque la carga falle; si el proceso se
+        interrumpe, 'esquema.py migrar' los restaura.
+        
+        :return: Nombres de los índices quitados
+        :raises ScraperDatabaseError: Si no se pueden quitar o reconstruir los índices
+        """
+        quitados = self._ejecutar_ddl(esquema.quitar_indices_diferidos)
+        self.logger.info(f"Índices diferidos hasta el final de la carga: {', '.join(quitados) or 'ninguno'}")
+        try:
+            yield quitados
+        finally:
+            inicio = time.perf_counter()
+            with metricas.medir('db_indices'):
+                creados = self._ejecutar_ddl(esquema.crear_indices_diferidos)
+            self.logger.info(
+                f"Índices construidos en {time.perf_counter() - inicio:.1f} s: {', '.join(creados) or 'ninguno'}"
+            )
+
+    def _indexar(self, casos: Iterable[Dict]) -> None:
+        """
+        Agrega al índice invertido, si hay uno, los expedientes ya confirmados.
+        
+        Un fallo del índice no revierte la carga: se informa y el índice puede
+        reconstruirse después con 'indice.py indexar --mysql'.
+        
+        :param casos: Expedientes confirmados en la base
+        """
+        if self.indice is None:
+            return
+        try:
+            resumen = self.indice.indexar(casos)
+            self.logger.info(
+                f"Índice: {resumen['nuevos']} expedientes nuevos, {resumen['actualizados']} actualizados, "
+                f"{resumen['sin_cambios']} sin cambios"
+            )
+        except ErrorDeIndice as e:
+            self.logger.error(f"No se pudo actualizar el índice: {e}")
+
+    def _internar(self, cursor, casos: Iterable[Dict]) -> None:
+        """
+        Resuelve los ids de los valores repetidos de los expedientes indicados.
+        
+        Debe llamarse antes de armar sus filas con '_valores_*'.
+        
+        :param cursor: Cursor de la conexión activa
+        :param casos: Expedientes a subir
+        """
+        normalizar = self.internador.normalizar
+        valores = {tabla: set() for tabla in DIMENSIONES}
+        for caso in casos:
+            valores['jurisdicciones'].add(normalizar(caso.get('jurisdiccion', '')))
+            valores['dependencias'].add(normalizar(caso.get('dependencia', '')))
+            valores['tipos_movimiento'].update(
+                normalizar(registro['tipo']) for registro in caso.get('registros_tabla') or []
+            )
+            if caso.get('actores'):
+                valores['tipos_participante'].add('ACTOR')
+            if caso.get('demandados'):
+                valores['tipos_participante'].add('DEMANDADO')
+        for tabla, pendientes in valores.items():
+            self.internador.resolver(cursor, tabla, pendientes)
+
+    def _valores_expediente(self, caso: Dict) -> tuple:
+        return (
+            caso.get('expediente', ''),
+            self.internador.id('jurisdicciones', caso.get('jurisdiccion', '')),
+            self.internador.id('dependencias', caso.get('dependencia', '')),
+            caso.get('situacion_actual', ''),
+            caso.get('caratula', '')
+        )
+
+    def _valores_movimientos(self, expediente_id: int, caso: Dict) -> List[tuple]:
+        return [
+            (expediente_id, 
+             self.limpiar_fecha(registro['fecha']), 
+             self.internador.id('tipos_movimiento', registro['tipo']), 
+             registro['detalle']) 
+            for registro in caso.get('registros_tabla') or []
+        ]
+
+    def _valores_participantes(self, expediente_id: int, caso: Dict) -> List[tuple]:
+        actor = demandado = None
+        if caso.get('actores'):
+            actor = self.internador.id('tipos_participante', 'ACTOR')
+        if caso.get('demandados'):
+            demandado = self.internador.id('tipos_participante', 'DEMANDADO')
+        return (
+            [(expediente_id, actor, nombre) for nombre in caso.get('actores') or []] +
+            [(expediente_id, demandado, nombre) for nombre in caso.get('demandados') or []]
+        )
+
+    def _insertar_por_fila(self, cursor, datos_scrapeados: Iterable[Dict], resumen: Dict) -> None:
+        """
+        Inserta cada expediente por separado para obtener su id con 'lastrowid'.
+        
+        :param cursor: Cursor de la conexión activa
+        :param datos_scrapeados: Expedientes a insertar
+        :param resumen: Contadores de filas a actualizar
+        """
+        for caso in datos_scrapeados:
+            with metricas.medir('db_fila'):
+                self._insertar_caso(cursor, caso, resumen)
+
+    def _insertar_caso(self, cursor, caso: Dict, resumen: Dict) -> None:
+        """
+        Inserta un expediente con sus movimientos y participantes.
+        
+        :param cursor: Cursor de la conexión activa
+        :param caso: Expediente a insertar
+        :param resumen: Contadores de filas a actualizar
+        """
+        self._internar(cursor, [caso])
+
+        # Inserción de expediente principal
+        consulta_expediente = """
+        INSERT INTO expedientes 
+        (expediente, jurisdiccion_id, dependencia_id, situacion_actual, caratula) 
+        VALUES (%s, %s, %s, %s, %s)
+        """
+        cursor.execute(consulta_expediente, self._valores_expediente(caso))
+        expediente_id = cursor.lastrowid
+
+        # Inserción de movimientos
+        valores_movimientos = self._valores_movimientos(expediente_id, caso)
+        if valores_movimientos:
+            consulta_movimientos = """
+            INSERT INTO movimientos 
+            (expediente_id, fecha, tipo_id, detalle) 
+            VALUES (%s, %s, %s, %s)
+            """
+            cursor.executemany(consulta_movimientos, valores_movimientos)
+
+        # Inserción de participantes
+        valores_participantes = self._valores_participantes(expediente_id, caso)
+        if valores_participantes:
+            consulta_participantes = """
+            INSERT INTO participantes 
+            (expediente_id, tipo_id, nombre) 
+            VALUES (%s, %s, %s)
+            """
+            cursor.executemany(consulta_participantes, valores_participantes)
+
+        resumen['expedientes']['insertados'] += 1
+        resumen['movimientos']['insertados'] += len(valores_movimientos)
+        resumen['participantes']['insertados'] += len(valores_participantes)
+
+    def _insertar_por_lotes(self, cursor, lotes: Iterable[List[Dict]], atomico: bool,
+                            usar_infile: bool, resumen: Dict) -> None:
+        """
+        Inserta los expedientes en lotes con sentencias INSERT de varias filas.
+        
+        Los ids de los expedientes se asignan del lado del cliente a partir del
+        máximo existente (bloqueado con SELECT ... FOR UPDATE), por lo que no hace
+        falta un INSERT por expediente para conocer su id.
+        
+        :param cursor: Cursor de la conexión activa
+        :param lotes: Lotes de expedientes a insertar
+        :param atomico: Si es False, se confirma cada lote al terminarlo
+        :param usar_infile: Cargar movimientos y participantes con LOAD DATA LOCAL INFILE
+        :param resumen: Contadores de filas a actualizar
+        """
+        total = 0
+        for lote in lotes:
+            self._insertar_lote(cursor, lote, usar_infile, resumen)
+            total += len(lote)
+
+            if not atomico:
+                self._confirmar()
+            self.logger.info(f"Lote de {len(lote)} expedientes insertado ({total} en total)")
+
+    def _reservar_ids(self, cursor, cantidad: int) -> int:
+        """
+        Reserva un rango de ids consecutivos en la tabla de expedientes.
+        
+        :param cursor: Cursor de la conexión activa
+        :param cantidad: Cantidad de ids a reservar
+        :return: Primer id del rango
+        """
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM expedientes FOR UPDATE")
+        (maximo,) = cursor.fetchone()
+        return maximo + 1
+
+    def _insertar_expedientes(self, cursor, casos: List[Dict]) -> List[int]:
+        """
+        Inserta las filas de los expedientes y devuelve sus ids, en el mismo orden.
+        
+        Por defecto los ids se reservan con '_reservar_ids'. Con
+        'ids_autoincrementales' (cargas en paralelo, donde ese bloqueo
+        serializaría las transacciones) los asigna AUTO_INCREMENT y se leen por
+        número de expediente a partir del primer id insertado: es seguro porque
+        cada número pertenece a un único fragmento de la carga.
+        
+        :param cursor: Cursor de la conexión activa
+        :param casos: Expedientes a insertar
+        :return: Id de cada expediente
+        """
+        if not self.ids_autoincrementales:
+            primer_id = self._reservar_ids(cursor, len(casos))
+            ids = list(range(primer_id, primer_id + len(casos)))
+            self._insertar_multiples(
+                cursor, 'expedientes', COLUMNAS_EXPEDIENTES,
+                [(expediente_id,) + self._valores_expediente(caso) for expediente_id, caso in zip(ids, casos)]
+            )
+            return ids
+
+        primer_id = self._insertar_multiples(
+            cursor, 'expedientes', COLUMNAS_EXPEDIENTES[1:], [self._valores_expediente(caso) for caso in casos]
+        )
+        numeros = [caso.get('expediente', '') for caso in casos]
+        unicos = list(set(numeros))
+        marcadores = ", ".join(["%s"] * len(unicos))
+        cursor.execute(
+            f"SELECT id, expediente FROM expedientes WHERE id >= %s AND expediente IN ({marcadores}) ORDER BY id",
+            [primer_id] + unicos
+        )
+        # Las filas de una misma sentencia reciben ids crecientes en el orden de VALUES
+        insertados = {}
+        for expediente_id, numero in cursor.fetchall():
+            insertados.setdefault(numero, deque()).append(expediente_id)
+        try:
+            return [insertados[numero].popleft() for numero in numeros]
+        except (KeyError, IndexError):
+            raise ScraperDatabaseError("No se pudieron leer los ids de los expedientes insertados")
+
+    @metricas.medido('db_lote')
+    def _insertar_lote(self, cursor, lote: List[Dict], usar_infile: bool = False,
+                       resumen: Optional[Dict] = None) -> None:
+        """
+        Inserta un lote de expedientes con sus movimientos y participantes.
+        
+        :param cursor: Cursor de la conexión activa
+        :param lote: Expedientes del lote
+        :param usar_infile: Cargar movimientos y participantes con LOAD DATA LOCAL INFILE
+        :param resumen: Contadores de filas a actualizar, opcional
+        """
+        self._internar(cursor, lote)
+        ids = self._insertar_expedientes(cursor, lote)
+
+        valores_movimientos, valores_participantes = [], []
+        for expediente_id, caso in zip(ids, lote):
+            valores_movimientos.extend(self._valores_movimientos(expediente_id, caso))
+            valores_participantes.extend(self._valores_participantes(expediente_id, caso))
+
+        if usar_infile:
+            self._cargar_infile(cursor, 'movimientos', COLUMNAS_MOVIMIENTOS, valores_movimientos)
+            self._cargar_infile(cursor, 'participantes', COLUMNAS_PARTICIPANTES, valores_participantes)
+        else:
+            self._insertar_multiples(cursor, 'movimientos', COLUMNAS_MOVIMIENTOS, valores_movimientos)
+            self._insertar_multiples(cursor, 'participantes', COLUMNAS_PARTICIPANTES, valores_participantes)
+
+        if resumen is not None:
+            resumen['expedientes']['insertados'] += len(ids)
+            resumen['movimientos']['insertados'] += len(valores_movimientos)
+            resumen['participantes']['insertados'] += len(valores_participantes)
+
+    def _actualizar_por_lotes(self, cursor, lotes: Iterable[List[Dict]], atomico: bool,
+                              resumen: Dict) -> None:
+        """
+        Inserta o actualiza los expedientes en lotes, identificándolos por su número.
+        
+        :param cursor: Cursor de la conexión activa
+        :param lotes: Lotes de expedientes a subir
+        :param atomico: Si es False, se confirma cada lote al terminarlo
+        :param resumen: Contadores de filas a actualizar
+        """
+        total = 0
+        for lote in lotes:
+            self._actualizar_lote(cursor, lote, resumen)
+            total += len(lote)
+
+            if not atomico:
+                self._confirmar()
+            self.logger.info(f"Lote de {len(lote)} expedientes procesado ({total} en total)")
+
+    @metricas.medido('db_upsert')
+    def _actualizar_lote(self, cursor, lote: List[Dict], resumen: Dict) -> None:
+        """
+        Sube un lote en modo idempotente.
+        
+        Los expedientes nuevos se insertan; en los existentes solo se actualizan
+        'situacion_actual' y 'caratula' si cambiaron, y de sus movimientos y
+        participantes se insertan únicamente los que no estén ya cargados (según
+        su hash de contenido). Si un expediente aparece repetido en la base, se
+        usa el de menor id.
+        
+        :param cursor: Cursor de la conexión activa
+        :param lote: Expedientes del lote
+        :param resumen: Contadores de filas a actualizar
+        """
+        # Si un expediente aparece varias veces en el lote, prevalece la última versión
+        casos = {caso.get('expediente', ''): caso for caso in lote}
+        numeros = list(casos)
+        self._internar(cursor, casos.values())
+
+        marcadores = ", ".join(["%s"] * len(numeros))
+        cursor.execute(
+            f"SELECT id, expediente, situacion_actual, caratula FROM expedientes "
+            f"WHERE expediente IN ({marcadores}) ORDER BY id",
+            numeros
+        )
+        existentes = {}
+        for expediente_id, numero, situacion, caratula in cursor.fetchall():
+            existentes.setdefault(numero, (expediente_id, situacion, caratula))
+
+        # Expedientes nuevos
+        nuevos = [numero for numero in numeros if numero not in existentes]
+        ids = {}
+        if nuevos:
+            ids.update(zip(nuevos, self._insertar_expedientes(cursor, [casos[numero] for numero in nuevos])))
+            resumen['expedientes']['insertados'] += len(nuevos)
+
+        # Expedientes existentes: actualizar solo si cambiaron
+        cambios = []
+        for numero, (expediente_id, situacion, caratula) in existentes.items():
+            ids[numero] = expediente_id
+            caso = casos[numero]
+            nueva_situacion = caso.get('situacion_actual', '')
+            nueva_caratula = caso.get('caratula', '')
+            if (nueva_situacion, nueva_caratula) != (situacion, caratula):
+                cambios.append((nueva_situacion, nueva_caratula, expediente_id))
+        if cambios:
+            cursor.executemany(
+                "UPDATE expedientes SET situacion_actual = %s, caratula = %s WHERE id = %s",
+                cambios
+            )
+        resumen['expedientes']['actualizados'] += len(cambios)
+        resumen['expedientes']['sin_cambios'] += len(existentes) - len(cambios)
+
+        ids_existentes = [expediente_id for expediente_id, _, _ in existentes.values()]
+        self._insertar_faltantes(
+            cursor, 'movimientos', COLUMNAS_MOVIMIENTOS,
+            [fila for numero, caso in casos.items() for fila in self._valores_movimientos(ids[numero], caso)],
+            ids_existentes, resumen
+        )
+        self._insertar_faltantes(
+            cursor, 'participantes', COLUMNAS_PARTICIPANTES,
+            [fila for numero, caso in casos.items() for fila in self._valores_participantes(ids[numero], caso)],
+            ids_existentes, resumen
+        )
+
+    def _insertar_faltantes(self, cursor, tabla: str, columnas: tuple, filas: List[tuple],
+                            ids_existentes: List[int], resumen: Dict) -> None:
+        """
+        Inserta solo las filas cuyo hash de contenido no está ya en la tabla.
+        
+        Se comparan multiconjuntos: si un movimiento idéntico aparece dos veces en
+        el expediente y una sola en la base, se inserta la copia faltante.
+        
+        :param cursor: Cursor de la conexión activa
+        :param tabla: 'movimientos' o 'participantes'
+        :param columnas: Columnas de la tabla, empezando por 'expediente_id'
+        :param filas: Filas scrapeadas de los expedientes del lote
+        :param ids_existentes: Ids de los expedientes que ya estaban en la base
+        :param resumen: Contadores de filas a actualizar
+        """
+        cargadas = Counter()
+        if ids_existentes:
+            marcadores = ", ".join(["%s"] * len(ids_existentes))
+            cursor.execute(
+                f"SELECT {', '.join(columnas)} FROM {tabla} WHERE expediente_id IN ({marcadores})",
+                ids_existentes
+            )
+            cargadas.update(huella(*fila) for fila in cursor.fetchall())
+
+        faltantes = []
+        for fila in filas:
+            clave = huella(*fila)
+            if cargadas[clave]:
+                cargadas[clave] -= 1
+            else:
+                faltantes.append(fila)
+
+        self._insertar_multiples(cursor, tabla, columnas, faltantes)
+        resumen[tabla]['insertados'] += len(faltantes)
+        resumen[tabla]['sin_cambios'] += len(filas) - len(faltantes)
+
+    def _insertar_multiples(self, cursor, tabla: str, columnas: tuple, filas: List[tuple],
+                            filas_por_sentencia: int = 500) -> Optional[int]:
+        """
+        Inserta las filas con sentencias INSERT de varias filas cada una.
+        
+        :param cursor: Cursor de la conexión activa
+        :param tabla: Nombre de la tabla
+        :param columnas: Columnas a insertar
+        :param filas: Valores de cada fila
+        :param filas_por_sentencia: Máximo de filas por sentencia
+        :return: Id AUTO_INCREMENT de la primera fila insertada, o None si no hubo filas
+        """
+        primer_id = None
+        marcadores = "(" + ", ".join(["%s"] * len(columnas)) + ")"
+        for inicio in range(0, len(filas), filas_por_sentencia):
+            bloque = filas[inicio:inicio + filas_por_sentencia]
+            consulta = (
+                f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES "
+                + ", ".join([marcadores] * len(bloque))
+            )
+            cursor.execute(consulta, [valor for fila in bloque for valor in fila])
+            if primer_id is None:
+                primer_id = cursor.lastrowid
+        return primer_id
+
+    def _cargar_infile(self, cursor, tabla: str, columnas: tuple, filas: List[tuple]) -> None:
+        """
+        Carga las filas con LOAD DATA LOCAL INFILE a partir de un archivo temporal.
+        
+        :param cursor: Cursor de la conexión activa
+        :param tabla: Nombre de la tabla
+        :param columnas: Columnas a cargar
+        :param filas: Valores de cada fila
+        """
+        if not filas:
+            return
+
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.tsv', delete=False) as archivo:
+            for fila in filas:
+                archivo.write("\t".join(_valor_tsv(valor) for valor in fila) + "\n")
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {tabla} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                f"({', '.join(columnas)})",
+                (archivo.name,)
+            )
+        finally:
+            os.remove(archivo.name)
 
     def _eliminar_archivo(self, ruta_archivo: str) -> None:
         """
         Elimina el archivo de forma segura.
         
+        En el caso de una salida JSONL se eliminan también sus segmentos rotados.
+        
         :param ruta_archivo: Ruta completa del archivo a eliminar
         """
+        rutas = segmentos(ruta_archivo) if es_jsonl(ruta_archivo) else [ruta_archivo]
+        for ruta in rutas:
+            try:
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+                    self.logger.info(f"Archivo {ruta} eliminado exitosamente")
+            except OSError as e:
+                self.logger.error(f"Error al eliminar el archivo: {e}")
+
+class CargadorEnParalelo:
+    """
+    Sube un archivo de expedientes repartido en fragmentos que se cargan en paralelo.
+    
+    Cada expediente va al fragmento que indica el hash de su número, por lo que
+    un mismo expediente siempre lo carga el mismo hilo. Cada hilo usa una
+    conexión de un pool de mysql.connector y confirma cada lote en su propia
+    transacción. Ante un interbloqueo, una espera de bloqueo agotada o una
+    conexión perdida, el lote se revierte y se reintenta con espera
+    exponencial. Los lotes que agotan sus reintentos se guardan en
+    '<archivo>.fallidos.jsonl' y la carga continúa.
+    """
+
+    def __init__(self, config: Dict[str, str], trabajadores: int = 4,
+                 fabrica_conexion: Optional[Callable] = None, reintentos: int = 3,
+                 espera_reintento: float = 0.5, indice: Optional[IndiceInvertido] = None):
+        """
+        :param config: Diccionario con configuraciones de conexión
+        :param trabajadores: Hilos de carga (y conexiones del pool), hasta 32
+        :param fabrica_conexion: Función que crea las conexiones en lugar del pool
+        :param reintentos: Reintentos por lote ante errores transitorios
+        :param espera_reintento: Segundos de espera antes del primer reintento
+        :param indice: Índice invertido a actualizar con cada lote confirmado
+        """
+        if not 1 <= trabajadores <= pooling.CNX_POOL_MAXSIZE:
+            raise ScraperDatabaseError(f"La cantidad de trabajadores debe estar entre 1 y {pooling.CNX_POOL_MAXSIZE}")
+        self.config = config
+        self.trabajadores = trabajadores
+        self.fabrica_conexion = fabrica_conexion
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self.indice = indice
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.informes = []
+        self._fallidos = None
+        self._lock_fallidos = threading.Lock()
+
+    def _crear_fabrica(self, permitir_infile: bool) -> Callable:
+        """
+        Crea el pool de conexiones y devuelve la función que toma una conexión de él.
+        
+        :param permitir_infile: Habilitar LOAD DATA LOCAL INFILE en las conexiones
+        :raises ScraperDatabaseError: Si no se puede crear el pool
+        """
+        if self.fabrica_conexion:
+            return self.fabrica_conexion
+        try:
+            pool = pooling.MySQLConnectionPool(
+                pool_name=f"cargador-{os.getpid()}-{id(self)}",
+                pool_size=self.trabajadores,
+                host=self.config['host'],
+                port=self.config.get('puerto', 3306),
+                user=self.config['usuario'],
+                password=self.config['contrasena'],
+                database=self.config['base_de_datos'],
+                allow_local_infile=permitir_infile
+            )
+        except Error as e:
+            raise ScraperDatabaseError(f"Error al crear el pool de conexiones: {e}")
+        self.logger.info(f"Pool de {self.trabajadores} conexiones creado")
+        return pool.get_connection
+
+    def subir(self, archivo_datos_scrapeados: str, modo: str = MODO_LOTES, tamano_lote: int = 1000,
+              usar_infile: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        Sube los expedientes del archivo en paralelo.
+        
+        A diferencia de 'subir_expedientes', cada lote se confirma por separado:
+        si la carga se interrumpe, los lotes ya confirmados quedan en la base
+        y el archivo se conserva para repetirla con el modo 'upsert'.
+        
+        :param archivo_datos_scrapeados: Ruta al archivo JSON o JSONL con datos
+        :param modo: 'fila', 'lotes' o 'upsert'
+        :param tamano_lote: Expedientes por lote (y por transacción)
+        :param usar_infile: En el modo 'lotes', cargar movimientos y participantes
+            con LOAD DATA LOCAL INFILE
+        :return: Cantidad de filas insertadas, actualizadas y sin cambios por tabla,
+            sumadas entre todos los fragmentos
+        :raises ScraperDatabaseError: Si no se pudo subir ningún expediente
+        """
+        if modo not in (MODO_FILA, MODO_LOTES, MODO_UPSERT):
+            raise ScraperDatabaseError(f"Modo de subida desconocido: {modo}")
+
+        fabrica = self._crear_fabrica(usar_infile)
+        ruta_fallidos = ruta_derivada(archivo_datos_scrapeados, 'fallidos')
+        lector = SubidorDeBaseDeDatos(self.config)
+        rechazos = {}
+        self.informes = [
+            {'fragmento': indice, 'lotes': 0, 'expedientes': 0, 'reintentos': 0,
+             'fallidos': 0, 'segundos': 0.0, 'resumen': _nuevo_resumen()}
+            for indice in range(self.trabajadores)
+        ]
+        # Colas cortas: la lectura no se adelanta más de dos lotes por fragmento
+        colas = [queue.Queue(maxsize=2) for _ in range(self.trabajadores)]
+        hilos = [
+            threading.Thread(
+                target=self._cargar_fragmento,
+                args=(colas[indice], fabrica, modo, usar_infile, self.informes[indice], ruta_fallidos),
+                name=f"cargador-{indice}",
+                daemon=True
+            )
+            for indice in range(self.trabajadores)
+        ]
+        for hilo in hilos:
+            hilo.start()
+
+        inicio = time.perf_counter()
+        pendientes = [[] for _ in range(self.trabajadores)]
         try:
-            if os.path.exists(ruta_archivo):
-                os.remove(ruta_archivo)
-                self.logger.info(f"Archivo {ruta_archivo} eliminado exitosamente")
-        except OSError as e:
-            self.logger.error(f"Error al eliminar el archivo: {e}")
+            for caso in lector._leer_casos_validos(archivo_datos_scrapeados, rechazos):
+                numero = str(caso.get('expediente', ''))
+                indice = zlib.crc32(numero.encode('utf-8')) % self.trabajadores
+                pendientes[indice].append(caso)
+                if len(pendientes[indice]) >= tamano_lote:
+                    colas[indice].put(pendientes[indice])
+                    pendientes[indice] = []
+            for indice, lote in enumerate(pendientes):
+                if lote:
+                    colas[indice].put(lote)
+        finally:
+            for cola in colas:
+                cola.put(FIN)
+            for hilo in hilos:
+                hilo.join()
+            if rechazos.get('escritor'):
+                rechazos['escritor'].cerrar()
+            if self._fallidos:
+                self._fallidos.cerrar()
+                self._fallidos = None
+
+        resumen = _nuevo_resumen()
+        for informe in self.informes:
+            _sumar_resumen(resumen, informe['resumen'])
+        self._informar(resumen, time.perf_counter() - inicio, rechazos, ruta_fallidos)
+
+        if not sum(resumen['expedientes'].values()):
+            raise ScraperDatabaseError("Datos inválidos para subir")
+        if not any(informe['fallidos'] for informe in self.informes):
+            lector._eliminar_archivo(archivo_datos_scrapeados)
+        return resumen
+
+    def _cargar_fragmento(self, cola: queue.Queue, fabrica: Callable, modo: str, usar_infile: bool,
+                          informe: Dict, ruta_fallidos: str) -> None:
+        subidor = SubidorDeBaseDeDatos(self.config, fabrica_conexion=fabrica)
+        subidor.ids_autoincrementales = True
+        subidor.indice = self.indice
+        inicio = time.perf_counter()
+        try:
+            while True:
+                lote = cola.get()
+                if lote is FIN:
+                    break
+                try:
+                    _sumar_resumen(informe['resumen'], self._subir_con_reintentos(subidor, lote, modo, usar_infile, informe))
+                    informe['lotes'] += 1
+                    informe['expedientes'] += len(lote)
+                except Exception as e:
+                    self.logger.error(f"Fragmento {informe['fragmento']}: lote de {len(lote)} expedientes fallido: {e}")
+                    informe['fallidos'] += len(lote)
+                    self._guardar_fallidos(lote, ruta_fallidos)
+        finally:
+            subidor.cerrar()
+            informe['segundos'] = time.perf_counter() - inicio
+
+    def _subir_con_reintentos(self, subidor: 'SubidorDeBaseDeDatos', lote: List[Dict], modo: str,
+                              usar_infile: bool, informe: Dict) -> Dict[str, Dict[str, int]]:
+        """
+        Sube y confirma un lote, reintentándolo ante errores transitorios.
+        
+        :raises Error: Si el error no es transitorio o se agotaron los reintentos
+        """
+        intento = 0
+        while True:
+            try:
+                return subidor.subir_lote(lote, modo, usar_infile)
+            except Error as e:
+                if e.errno not in ERRORES_REINTENTABLES or intento >= self.reintentos:
+                    raise
+                intento += 1
+                informe['reintentos'] += 1
+                metricas.contar('db_reintentos')
+                if e.errno in ERRORES_DE_CONEXION:
+                    subidor._soltar_conexion()
+                espera = self.espera_reintento * 2 ** (intento - 1)
+                self.logger.warning(
+                    f"Fragmento {informe['fragmento']}: {e}; reintento {intento} de {self.reintentos} en {espera:.1f} s"
+                )
+                time.sleep(espera)
+
+    def _guardar_fallidos(self, lote: List[Dict], ruta_fallidos: str) -> None:
+        with self._lock_fallidos:
+            if self._fallidos is None:
+                self._fallidos = EscritorJSONL(ruta_fallidos, fsync_segundos=0)
+            for caso in lote:
+                self._fallidos.escribir(caso)
+            self._fallidos.vaciar(sincronizar=True)
+
+    def _informar(self, resumen: Dict, segundos: float, rechazos: Dict, ruta_fallidos: str) -> None:
+        for informe in self.informes:
+            self.logger.info(
+                f"Fragmento {informe['fragmento']}: {informe['expedientes']} expedientes en {informe['lotes']} lotes, "
+                f"{informe['reintentos']} reintentos, {informe['fallidos']} fallidos, {informe['segundos']:.1f} s"
+            )
+        for tabla, contadores in resumen.items():
+            self.logger.info(
+                f"{tabla}: {contadores['insertados']} insertados, "
+                f"{contadores['actualizados']} actualizados, {contadores['sin_cambios']} sin cambios"
+            )
+        expedientes = sum(resumen['expedientes'].values())
+        ritmo = expedientes / segundos if segundos else 0.0
+        self.logger.info(
+            f"{expedientes} expedientes en {segundos:.1f} s ({ritmo:.0f} exp/s) con {self.trabajadores} conexiones"
+        )
+        if rechazos.get('cantidad'):
+            self.logger.warning(f"{rechazos['cantidad']} expedientes rechazados en {rechazos['escritor'].ruta}")
+        fallidos = sum(informe['fallidos'] for informe in self.informes)
+        if fallidos:
+            self.logger.warning(f"{fallidos} expedientes no se pudieron subir; se guardaron en {ruta_fallidos}")
+
+def parsear_argumentos(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Interpreta los argumentos de línea de comandos de la subida.
+    
+    :param argv: Argumentos a interpretar (por defecto, los del proceso)
+    :return: Argumentos interpretados
+    """
+    parser = argparse.ArgumentParser(description="Sube los expedientes scrapeados a MySQL")
+    parser.add_argument('archivo', nargs='?', default='src/expedientes.jsonl',
+                        help="Archivo JSON o JSONL con los expedientes")
+    parser.add_argument('--modo', choices=[MODO_FILA, MODO_LOTES, MODO_UPSERT], default=MODO_UPSERT,
+                        help="'upsert' (por defecto) actualiza los expedientes existentes e inserta solo lo nuevo; "
+                             "'fila' inserta cada expediente por separado y 'lotes' usa INSERT de varias filas, "
+                             "y ambos fallan si un expediente ya está cargado")
+    parser.add_argument('--tamano-lote', type=int, default=1000,
+                        help="Expedientes por lote en los modos 'lotes' y 'upsert'")
+    parser.add_argument('--confirmar-por-lote', action='store_true',
+                        help="Confirmar cada lote por separado en lugar de una única transacción")
+    parser.add_argument('--infile', action='store_true',
+                        help="Cargar movimientos y participantes con LOAD DATA LOCAL INFILE")
+    parser.add_argument('--paralelo', type=int, default=1,
+                        help="Cargar en N fragmentos en paralelo, con un pool de N conexiones "
+                             "(cada lote se confirma por separado)")
+    parser.add_argument('--reintentos', type=int, default=3,
+                        help="Reintentos por lote ante interbloqueos o conexiones perdidas en la carga en paralelo")
+    parser.add_argument('--indice',
+                        help="Base SQLite del índice invertido a actualizar con los expedientes subidos")
+    parser.add_argument('--diferir-indices', action='store_true',
+                        help="Quitar los índices secundarios de movimientos y participantes durante la carga "
+                             "y construirlos al final (cargas masivas en modo 'lotes')")
+    parser.add_argument('--sin-migrar', action='store_true',
+                        help="No aplicar las migraciones pendientes del esquema antes de cargar")
+    instrumentacion.agregar_argumentos(parser)
+    return parser.parse_args(argv)
 
 def main():
     """
     Función principal para ejecutar la subida de datos.
     Configuración centralizada y manejo de errores.
     """
-    # Configuración de conexión 
-    config_db = {
-        'host': '172.30.0.2',
-        'usuario': 'scraperuser',
-        'contrasena': 'scraperpass',
-        'base_de_datos': 'scraper_data'
-    }
+    args = parsear_argumentos()
+    indice = IndiceInvertido(args.indice) if args.indice else None
 
     try:
-        # Ruta al archivo JSON con los datos scrapeados
-        archivo_datos = 'src/expedientes.json'
-        
+        if not args.sin_migrar:
+            SubidorDeBaseDeDatos(CONFIG_DB).migrar_esquema()
+        diferidos = SubidorDeBaseDeDatos(CONFIG_DB).indices_diferidos() if args.diferir_indices else nullcontext()
+
         # Instanciar y ejecutar subidor
-        subidor = SubidorDeBaseDeDatos(config_db)
-        subidor.subir_expedientes(archivo_datos)
+        with instrumentacion.instrumentar(args), diferidos:
+            if args.paralelo > 1:
+                cargador = CargadorEnParalelo(CONFIG_DB, args.paralelo, reintentos=args.reintentos, indice=indice)
+                cargador.subir(args.archivo, modo=args.modo, tamano_lote=args.tamano_lote, usar_infile=args.infile)
+            else:
+                subidor = SubidorDeBaseDeDatos(CONFIG_DB)
+                subidor.indice = indice
+                subidor.subir_expedientes(
+                    args.archivo,
+                    modo=args.modo,
+                    tamano_lote=args.tamano_lote,
+                    atomico=not args.confirmar_por_lote,
+                    usar_infile=args.infile
+                )
 
     except ScraperDatabaseError as e:
         logging.error(f"Error en el proceso de subida: {e}")
     except Exception as e:
         logging.error(f"Error inesperado: {e}")
+    finally:
+        if indice:
+            indice.cerrar()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,430 @@
+import os
+import re
+import time
+import heapq
+import sqlite3
+import hashlib
+import argparse
+import threading
+import unicodedata
+from collections import Counter
+
+from salida import leer_expedientes
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    expediente TEXT NOT NULL UNIQUE,
+    caratula TEXT,
+    huella TEXT NOT NULL,
+    indexado_en REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS terminos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    termino TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS apariciones (
+    termino_id INTEGER NOT NULL,
+    documento_id INTEGER NOT NULL,
+    campo INTEGER NOT NULL,
+    frecuencia INTEGER NOT NULL,
+    PRIMARY KEY (termino_id, documento_id, campo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS apariciones_documento ON apariciones (documento_id);
+"""
+
+# Campos indexados de cada expediente; la posición es el código guardado en 'apariciones'
+CAMPOS = ("caratula", "actores", "demandados", "movimientos")
+
+# Peso de una aparición según el campo, para ordenar los resultados
+PESOS = {"caratula": 4, "actores": 3, "demandados": 3, "movimientos": 1}
+
+# Palabras demasiado frecuentes para distinguir expedientes; no se indexan
+PALABRAS_VACIAS = frozenset({
+    "a", "al", "c", "con", "de", "del", "e", "el", "en", "la", "las", "lo", "los",
+    "o", "p", "para", "por", "s", "se", "su", "y",
+})
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+
+class ErrorDeIndice(Exception):
+    """Error al leer o actualizar el índice invertido."""
+
+def plegar(texto):
+    """
+    Pasa el texto a minúsculas y le quita los acentos ('Peña' -> 'pena').
+
+    Args:
+        texto (str): Texto a plegar
+
+    Returns:
+        str: Texto plegado
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+def tokenizar(texto):
+    """
+    Divide el texto plegado en palabras, sin las palabras vacías.
+
+    Returns:
+        list: Términos, en orden y con repeticiones
+    """
+    return [token for token in _TOKEN.findall(plegar(texto)) if token not in PALABRAS_VACIAS]
+
+def textos_de_caso(caso):
+    """
+    Obtiene los textos de cada campo indexado de un expediente del scraper.
+
+    Returns:
+        tuple: Lista de textos por campo, en el orden de CAMPOS
+    """
+    movimientos = [
+        registro.get("detalle") or "" for registro in caso.get("registros_tabla") or [] if isinstance(registro, dict)
+    ]
+    return (
+        [caso.get("caratula") or ""],
+        [str(nombre) for nombre in caso.get("actores") or []],
+        [str(nombre) for nombre in caso.get("demandados") or []],
+        movimientos,
+    )
+
+def _normalizar_expediente(texto):
+    return " ".join(str(texto or "").split())
+
+class IndiceInvertido:
+    """
+    Índice invertido persistente (SQLite) sobre la carátula, los actores, los
+    demandados y el detalle de los movimientos de cada expediente.
+
+    Cada término (plegado a minúsculas y sin acentos) guarda los expedientes
+    y campos en los que aparece y cuántas veces. Una búsqueda lee solo las
+    apariciones de sus términos por la clave primaria, sin recorrer las
+    tablas; un término terminado en '*' se busca como prefijo recorriendo un
+    rango del índice de términos.
+
+    El índice se actualiza de forma incremental: un expediente se identifica
+    por su número y se vuelve a indexar solo si cambió alguno de sus textos.
+    """
+
+    def __init__(self, ruta=os.path.join("src", "indice.db")):
+        """
+        Args:
+            ruta (str): Ruta de la base SQLite del índice
+        """
+        self.ruta = ruta
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+        self._lock = threading.Lock()
+        # Ids de los términos ya vistos, para no consultarlos en cada expediente
+        self._terminos = {}
+
+    def indexar(self, casos):
+        """
+        Agrega o actualiza los expedientes en una única transacción.
+
+        Args:
+            casos (iterable): Expedientes con el formato de la salida del scraper
+
+        Returns:
+            dict: Cantidad de expedientes 'nuevos', 'actualizados', 'sin_cambios' y 'omitidos'
+
+        Raises:
+            ErrorDeIndice: Si falla la escritura (no se guarda ningún expediente)
+        """
+        resumen = Counter(nuevos=0, actualizados=0, sin_cambios=0, omitidos=0)
+        with self._lock:
+            try:
+                with self._conexion:
+                    for caso in casos:
+                        resumen[self._indexar_caso(caso)] += 1
+            except sqlite3.Error as e:
+                # Los ids de términos creados en la transacción revertida ya no existen
+                self._terminos.clear()
+                raise ErrorDeIndice(f"No se pudo actualizar el índice {self.ruta}: {e}") from e
+        return dict(resumen)
+
+    def _indexar_caso(self, caso):
+        expediente = _normalizar_expediente(caso.get("expediente"))
+        if not expediente:
+            return "omitidos"
+
+        textos = textos_de_caso(caso)
+        huella = hashlib.sha1("\x1e".join("\x1f".join(campo) for campo in textos).encode("utf-8")).hexdigest()
+        fila = self._conexion.execute(
+            "SELECT id, huella FROM documentos WHERE expediente = ?", (expediente,)
+        ).fetchone()
+        if fila and fila[1] == huella:
+            return "sin_cambios"
+
+        if fila:
+            documento_id = fila[0]
+            self._conexion.execute("DELETE FROM apariciones WHERE documento_id = ?", (documento_id,))
+            self._conexion.execute(
+                "UPDATE documentos SET caratula = ?, huella = ?, indexado_en = ? WHERE id = ?",
+                (caso.get("caratula"), huella, time.time(), documento_id)
+            )
+        else:
+            documento_id = self._conexion.execute(
+                "INSERT INTO documentos (expediente, caratula, huella, indexado_en) VALUES (?, ?, ?, ?)",
+                (expediente, caso.get("caratula"), huella, time.time())
+            ).lastrowid
+
+        apariciones = []
+        for campo, textos_campo in enumerate(textos):
+            conteo = Counter(token for texto in textos_campo for token in tokenizar(texto))
+            apariciones.extend(
+                (self._id_termino(termino), documento_id, campo, frecuencia) for termino, frecuencia in conteo.items()
+            )
+        self._conexion.executemany(
+            "INSERT INTO apariciones (termino_id, documento_id, campo, frecuencia) VALUES (?, ?, ?, ?)",
+            apariciones
+        )
+        return "actualizados" if fila else "nuevos"
+
+    def _id_termino(self, termino):
+        termino_id = self._terminos.get(termino)
+        if termino_id is None:
+            self._conexion.execute("INSERT OR IGNORE INTO terminos (termino) VALUES (?)", (termino,))
+            termino_id = self._conexion.execute(
+                "SELECT id FROM terminos WHERE termino = ?", (termino,)
+            ).fetchone()[0]
+            self._terminos[termino] = termino_id
+        return termino_id
+
+    def _apariciones(self, termino, prefijo, campos):
+        if prefijo:
+            condicion, parametros = "t.termino >= ? AND t.termino < ?", [termino, termino + "\uffff"]
+        else:
+            condicion, parametros = "t.termino = ?", [termino]
+        consulta = (
+            "SELECT a.documento_id, a.campo, a.frecuencia FROM terminos t "
+            f"JOIN apariciones a ON a.termino_id = t.id WHERE {condicion}"
+        )
+        if campos is not None:
+            consulta += f" AND a.campo IN ({', '.join('?' * len(campos))})"
+            parametros += campos
+
+        puntajes = {}
+        for documento_id, campo, frecuencia in self._conexion.execute(consulta, parametros):
+            puntajes[documento_id] = puntajes.get(documento_id, 0) + PESOS[CAMPOS[campo]] * frecuencia
+        return puntajes
+
+    def buscar(self, consulta, campos=None, limite=20):
+        """
+        Busca los expedientes que contienen todos los términos de la consulta.
+
+        Los términos se pliegan igual que al indexar, por lo que 'PEÑA' y 'pena'
+        son equivalentes. Un término terminado en '*' coincide con cualquier
+        palabra que empiece así ('contamin*').
+
+        Args:
+            consulta (str): Términos a buscar, separados por espacios
+            campos (list): Campos donde buscar (por defecto, todos los de CAMPOS)
+            limite (int): Cantidad máxima de resultados
+
+        Returns:
+            list: Diccionarios con 'expediente', 'caratula' y 'puntaje', de mayor a menor puntaje
+
+        Raises:
+            ErrorDeIndice: Si algún campo no existe
+        """
+        codigos = None
+        if campos:
+            desconocidos = set(campos) - set(CAMPOS)
+            if desconocidos:
+                raise ErrorDeIndice(f"Campos desconocidos: {', '.join(sorted(desconocidos))}")
+            codigos = [CAMPOS.index(campo) for campo in campos]
+
+        terminos = []
+        for palabra in consulta.split():
+            tokens = tokenizar(palabra)
+            terminos += [(token, False) for token in tokens[:-1]]
+            if tokens:
+                terminos.append((tokens[-1], palabra.endswith("*")))
+        if not terminos:
+            return []
+
+        with self._lock:
+            candidatos = None
+            for termino, prefijo in terminos:
+                puntajes = self._apariciones(termino, prefijo, codigos)
+                if candidatos is not None:
+                    puntajes = {doc: candidatos[doc] + puntaje for doc, puntaje in puntajes.items() if doc in candidatos}
+                candidatos = puntajes
+                if not candidatos:
+                    return []
+
+            mejores = heapq.nlargest(limite, candidatos.items(), key=lambda par: (par[1], -par[0]))
+            filas = self._conexion.execute(
+                f"SELECT id, expediente, caratula FROM documentos WHERE id IN ({', '.join('?' * len(mejores))})",
+                [documento_id for documento_id, _ in mejores]
+            ).fetchall()
+        documentos = {documento_id: (expediente, caratula) for documento_id, expediente, caratula in filas}
+        return [
+            {"expediente": documentos[documento_id][0], "caratula": documentos[documento_id][1], "puntaje": puntaje}
+            for documento_id, puntaje in mejores
+        ]
+
+    def completar(self, prefijo, limite=10):
+        """
+        Lista los términos indexados que empiezan con el prefijo.
+
+        Returns:
+            list: Pares (término, cantidad de expedientes), en orden alfabético
+        """
+        prefijo = plegar(prefijo).strip()
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT t.termino, COUNT(DISTINCT a.documento_id) FROM "
+                "(SELECT id, termino FROM terminos WHERE termino >= ? AND termino < ? ORDER BY termino LIMIT ?) t "
+                "JOIN apariciones a ON a.termino_id = t.id GROUP BY t.id ORDER BY t.termino",
+                (prefijo, prefijo + "\uffff", limite)
+            ).fetchall()
+
+    def estadisticas(self):
+        """
+        Returns:
+            dict: Cantidad de expedientes, términos y apariciones del índice
+        """
+        with self._lock:
+            return {
+                tabla: self._conexion.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+                for tabla in ("documentos", "terminos", "apariciones")
+            }
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+def casos_desde_mysql(config, fabrica_conexion=None, por_lectura=1000):
+    """
+    Reconstruye los textos indexados de los expedientes ya cargados en MySQL.
+
+    Los expedientes se leen por rangos de id ('por_lectura' por consulta),
+    junto con los movimientos y participantes de ese rango, para poblar el
+    índice de una base existente sin cargar las tablas completas en memoria.
+
+    Args:
+        config (dict): Configuración de conexión (como CONFIG_DB)
+        fabrica_conexion (callable): Función que crea la conexión, opcional
+        por_lectura (int): Expedientes por consulta
+
+    Yields:
+        dict: Expediente con 'expediente', 'caratula', 'actores', 'demandados'
+            y el 'detalle' de sus 'registros_tabla'
+    """
+    from guardarDb import SubidorDeBaseDeDatos
+
+    subidor = SubidorDeBaseDeDatos(config, fabrica_conexion=fabrica_conexion)
+    subidor._conectar()
+    cursor = subidor.conexion.cursor()
+    try:
+        ultimo = 0
+        while True:
+            cursor.execute(
+                "SELECT id, expediente, caratula FROM expedientes WHERE id > %s ORDER BY id LIMIT %s",
+                (ultimo, por_lectura)
+            )
+            filas = cursor.fetchall()
+            if not filas:
+                break
+            casos = {
+                expediente_id: {
+                    "expediente": expediente, "caratula": caratula,
+                    "actores": [], "demandados": [], "registros_tabla": [],
+                }
+                for expediente_id, expediente, caratula in filas
+            }
+            rango = (filas[0][0], filas[-1][0])
+            cursor.execute(
+                "SELECT expediente_id, detalle FROM movimientos "
+                "WHERE expediente_id BETWEEN %s AND %s ORDER BY expediente_id, id",
+                rango
+            )
+            for expediente_id, detalle in cursor.fetchall():
+                if expediente_id in casos:
+                    casos[expediente_id]["registros_tabla"].append({"detalle": detalle})
+            cursor.execute(
+                "SELECT expediente_id, tipo, nombre FROM vista_participantes "
+                "WHERE expediente_id BETWEEN %s AND %s ORDER BY expediente_id, id",
+                rango
+            )
+            for expediente_id, tipo, nombre in cursor.fetchall():
+                campo = {"ACTOR": "actores", "DEMANDADO": "demandados"}.get(tipo)
+                if campo and expediente_id in casos:
+                    casos[expediente_id][campo].append(nombre)
+            yield from casos.values()
+            ultimo = rango[1]
+    finally:
+        cursor.close()
+        subidor.cerrar()
+
+def main():
+    """
+    Indexa los expedientes y busca en el índice.
+
+    Uso:
+        python indice.py indexar src/expedientes.jsonl
+        python indice.py indexar --mysql
+        python indice.py buscar "perez contamin*" --campo actores --campo caratula
+        python indice.py completar contam
+    """
+    parser = argparse.ArgumentParser(description="Índice invertido de los expedientes")
+    parser.add_argument("--indice", default=os.path.join("src", "indice.db"), help="Base SQLite del índice")
+    acciones = parser.add_subparsers(dest="accion", required=True)
+
+    indexar = acciones.add_parser("indexar", help="Agregar o actualizar expedientes en el índice")
+    indexar.add_argument("archivos", nargs="*", help="Archivos JSONL o JSON del scraper")
+    indexar.add_argument("--mysql", action="store_true", help="Indexar los expedientes de la base de CONFIG_DB")
+
+    buscar = acciones.add_parser("buscar", help="Buscar expedientes que contengan todos los términos")
+    buscar.add_argument("consulta", help="Términos; 'palabra*' busca por prefijo")
+    buscar.add_argument("--campo", action="append", choices=CAMPOS, help="Restringir la búsqueda al campo (repetible)")
+    buscar.add_argument("--limite", type=int, default=20)
+
+    completar = acciones.add_parser("completar", help="Listar los términos que empiezan con un prefijo")
+    completar.add_argument("prefijo")
+    completar.add_argument("--limite", type=int, default=10)
+
+    args = parser.parse_args()
+    indice = IndiceInvertido(args.indice)
+    try:
+        inicio = time.perf_counter()
+        if args.accion == "indexar":
+            if args.mysql:
+                from guardarDb import CONFIG_DB
+
+                resumen = indice.indexar(casos_desde_mysql(CONFIG_DB))
+            else:
+                resumen = Counter()
+                for archivo in args.archivos:
+                    resumen.update(indice.indexar(leer_expedientes(archivo)))
+            print(
+                f"{resumen['nuevos']} expedientes nuevos, {resumen['actualizados']} actualizados, "
+                f"{resumen['sin_cambios']} sin cambios en {time.perf_counter() - inicio:.1f} s"
+            )
+            estadisticas = indice.estadisticas()
+            print(
+                f"El índice tiene {estadisticas['documentos']} expedientes, {estadisticas['terminos']} términos "
+                f"y {estadisticas['apariciones']} apariciones"
+            )
+        elif args.accion == "buscar":
+            resultados = indice.buscar(args.consulta, args.campo, args.limite)
+            for resultado in resultados:
+                print(f"{resultado['puntaje']:>6}  {resultado['expediente']}  {resultado['caratula'] or ''}")
+            print(f"{len(resultados)} resultados en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        else:
+            for termino, cantidad in indice.completar(args.prefijo, args.limite):
+                print(f"{cantidad:>8}  {termino}")
+    except ErrorDeIndice as e:
+        parser.exit(1, f"{e}\n")
+    finally:
+        indice.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+import os
+import json
+import time
+import cProfile
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+from esperas import percentil, telemetria
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+# Mediciones recientes conservadas por operación para calcular los percentiles
+MUESTRAS_POR_OPERACION = 2048
+
+# Percentiles exportados de cada operación
+PERCENTILES = (50, 90, 99)
+
+PERFILADORES = ("cprofile", "pyinstrument")
+
+class ErrorDeInstrumentacion(Exception):
+    """Error de configuración de las métricas o del perfilador."""
+
+class _Operacion:
+    __slots__ = ("cantidad", "total", "maximo", "errores", "muestras")
+
+    def __init__(self, muestras):
+        self.cantidad = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.errores = 0
+        self.muestras = deque(maxlen=muestras)
+
+class Metricas:
+    """
+    Temporizadores y contadores de las operaciones del scraper y de la carga.
+
+    Cada medición cuesta un perf_counter y un append bajo lock, por lo que
+    la instrumentación puede quedar activa en producción. Cantidad, total y
+    máximo son exactos; los percentiles se calculan sobre las últimas
+    MUESTRAS_POR_OPERACION mediciones de cada operación.
+    """
+
+    def __init__(self, muestras=MUESTRAS_POR_OPERACION):
+        self.muestras = muestras
+        self._operaciones = {}
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def observar(self, nombre, segundos, error=False):
+        with self._lock:
+            operacion = self._operaciones.get(nombre)
+            if operacion is None:
+                operacion = self._operaciones[nombre] = _Operacion(self.muestras)
+            operacion.cantidad += 1
+            operacion.total += segundos
+            if segundos > operacion.maximo:
+                operacion.maximo = segundos
+            if error:
+                operacion.errores += 1
+            operacion.muestras.append(segundos)
+
+    def contar(self, nombre, cantidad=1):
+        with self._lock:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+
+    @contextmanager
+    def medir(self, nombre):
+        """
+        Mide la duración del bloque; si el bloque lanza una excepción, se cuenta como error.
+
+        Args:
+            nombre (str): Nombre de la operación
+        """
+        inicio = time.perf_counter()
+        error = True
+        try:
+            yield
+            error = False
+        finally:
+            self.observar(nombre, time.perf_counter() - inicio, error)
+
+    def medido(self, nombre):
+        """
+        Decorador que mide cada llamada a la función con el nombre indicado.
+        """
+        def decorador(funcion):
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                inicio = time.perf_counter()
+                error = True
+                try:
+                    resultado = funcion(*args, **kwargs)
+                    error = False
+                    return resultado
+                finally:
+                    self.observar(nombre, time.perf_counter() - inicio, error)
+            return envoltura
+        return decorador
+
+    def reiniciar(self):
+        with self._lock:
+            self._operaciones.clear()
+            self._contadores.clear()
+
+    def resumen(self):
+        """
+        Returns:
+            dict: 'operaciones' (cantidad, total, percentiles, máximo y errores por
+                operación, en segundos) y 'contadores'
+        """
+        with self._lock:
+            operaciones = {
+                nombre: (op.cantidad, op.total, op.maximo, op.errores, sorted(op.muestras))
+                for nombre, op in self._operaciones.items()
+            }
+            contadores = dict(self._contadores)
+
+        resumen = {"operaciones": {}, "contadores": contadores}
+        for nombre, (cantidad, total, maximo, errores, ordenadas) in operaciones.items():
+            datos = {"cantidad": cantidad, "total_s": round(total, 6)}
+            for porcentaje in PERCENTILES:
+                datos[f"p{porcentaje}_s"] = round(percentil(ordenadas, porcentaje), 6)
+            datos["max_s"] = round(maximo, 6)
+            datos["errores"] = errores
+            resumen["operaciones"][nombre] = datos
+        return resumen
+
+    def exportar_json(self, ruta):
+        """
+        Guarda el resumen, junto con el de las esperas, como JSON.
+        """
+        datos = self.resumen()
+        datos["esperas"] = telemetria.resumen()
+        datos["generado"] = time.time()
+        _escribir_atomico(ruta, json.dumps(datos, indent=4, ensure_ascii=False) + "\n")
+
+    def exportar_prometheus(self, ruta):
+        """
+        Guarda las métricas en el formato de texto de Prometheus.
+
+        El archivo se reemplaza de forma atómica, por lo que puede leerlo el
+        colector de archivos de texto de node_exporter mientras la corrida sigue.
+        """
+        resumen = self.resumen()
+        lineas = [
+            "# HELP scraper_operacion_segundos Duración de las operaciones instrumentadas",
+            "# TYPE scraper_operacion_segundos summary",
+        ]
+        for nombre, datos in sorted(resumen["operaciones"].items()):
+            etiqueta = f'operacion="{_escapar(nombre)}"'
+            for porcentaje in PERCENTILES:
+                lineas.append(
+                    f'scraper_operacion_segundos{{{etiqueta},quantile="{porcentaje / 100}"}} '
+                    f'{datos[f"p{porcentaje}_s"]}'
+                )
+            lineas.append(f"scraper_operacion_segundos_sum{{{etiqueta}}} {datos['total_s']}")
+            lineas.append(f"scraper_operacion_segundos_count{{{etiqueta}}} {datos['cantidad']}")
+
+        lineas += [
+            "# HELP scraper_operacion_errores_total Operaciones terminadas con una excepción",
+            "# TYPE scraper_operacion_errores_total counter",
+        ]
+        for nombre, datos in sorted(resumen["operaciones"].items()):
+            lineas.append(f'scraper_operacion_errores_total{{operacion="{_escapar(nombre)}"}} {datos["errores"]}')
+
+        lineas += [
+            "# HELP scraper_eventos_total Contadores de la corrida",
+            "# TYPE scraper_eventos_total counter",
+        ]
+        for nombre, valor in sorted(resumen["contadores"].items()):
+            lineas.append(f'scraper_eventos_total{{evento="{_escapar(nombre)}"}} {valor}')
+
+        lineas += [
+            "# HELP scraper_espera_segundos Duración de las esperas al sitio",
+            "# TYPE scraper_espera_segundos summary",
+        ]
+        for nombre, datos in sorted(telemetria.resumen().items()):
+            etiqueta = f'espera="{_escapar(nombre)}"'
+            lineas.append(f'scraper_espera_segundos{{{etiqueta},quantile="0.5"}} {datos["p50_s"]}')
+            lineas.append(f'scraper_espera_segundos{{{etiqueta},quantile="0.95"}} {datos["p95_s"]}')
+            lineas.append(f"scraper_espera_segundos_sum{{{etiqueta}}} {datos['total_s']}")
+            lineas.append(f"scraper_espera_segundos_count{{{etiqueta}}} {datos['cantidad']}")
+
+        _escribir_atomico(ruta, "\n".join(lineas) + "\n")
+
+    def exportar(self, ruta):
+        """
+        Exporta en JSON si la ruta termina en '.json' y en formato Prometheus en otro caso.
+        """
+        if ruta.endswith(".json"):
+            self.exportar_json(ruta)
+        else:
+            self.exportar_prometheus(ruta)
+
+    def imprimir(self):
+        resumen = self.resumen()
+        if not resumen["operaciones"] and not resumen["contadores"]:
+            return
+        print("Operaciones:")
+        for nombre, r in sorted(resumen["operaciones"].items(), key=lambda item: -item[1]["total_s"]):
+            print(
+                f"  {nombre}: {r['cantidad']} veces, {r['total_s']:.1f} s en total "
+                f"(p50 {r['p50_s']:.3f} s, p90 {r['p90_s']:.3f} s, p99 {r['p99_s']:.3f} s, "
+                f"máx {r['max_s']:.3f} s), {r['errores']} con error"
+            )
+        if resumen["contadores"]:
+            print("  " + ", ".join(f"{nombre}: {valor}" for nombre, valor in sorted(resumen["contadores"].items())))
+
+# Métricas compartidas por todo el proceso
+metricas = Metricas()
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _escribir_atomico(ruta, contenido):
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, ruta)
+
+class ExportadorDeMetricas(threading.Thread):
+    """
+    Hilo que reescribe el archivo de métricas periódicamente y una última vez al detenerse.
+    """
+
+    def __init__(self, ruta, intervalo=None):
+        """
+        Args:
+            ruta (str): Archivo de salida ('.json' o formato Prometheus)
+            intervalo (float): Segundos entre exportaciones; None exporta solo al final
+        """
+        super().__init__(name="exportador-metricas", daemon=True)
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.wait(self.intervalo):
+            metricas.exportar(self.ruta)
+
+    def detener(self):
+        self._detener.set()
+        if self.is_alive():
+            self.join()
+        metricas.exportar(self.ruta)
+
+@contextmanager
+def perfilar(ruta, perfilador="cprofile"):
+    """
+    Perfila el bloque en el hilo actual y guarda el resultado en la ruta indicada.
+
+    Con cProfile se guardan las estadísticas (legibles con pstats o snakeviz);
+    con pyinstrument, un informe HTML si la ruta termina en '.html' y de texto
+    en otro caso. Sin ruta, el bloque se ejecuta sin perfilar.
+
+    Args:
+        ruta (str): Archivo de salida, o None
+        perfilador (str): 'cprofile' o 'pyinstrument'
+
+    Raises:
+        ErrorDeInstrumentacion: Si el perfilador no existe o no está instalado
+    """
+    if not ruta:
+        yield
+        return
+    if perfilador not in PERFILADORES:
+        raise ErrorDeInstrumentacion(f"Perfilador desconocido: {perfilador}")
+    if perfilador == "pyinstrument" and pyinstrument is None:
+        raise ErrorDeInstrumentacion("El perfilador pyinstrument requiere el paquete 'pyinstrument'")
+
+    if perfilador == "pyinstrument":
+        perfil = pyinstrument.Profiler()
+        perfil.start()
+        try:
+            yield
+        finally:
+            perfil.stop()
+            salida = perfil.output_html() if ruta.endswith(".html") else perfil.output_text()
+            _escribir_atomico(ruta, salida)
+            print(f"Perfil guardado en {ruta}")
+    else:
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            perfil.dump_stats(ruta)
+            print(f"Perfil guardado en {ruta}")
+
+def agregar_argumentos(parser):
+    """
+    Agrega al parser las opciones de métricas y perfilado.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser a extender
+    """
+    grupo = parser.add_argument_group("instrumentación")
+    grupo.add_argument(
+        "--metricas",
+        help="Archivo donde exportar las métricas ('.json' o, en otro caso, formato de texto de Prometheus)"
+    )
+    grupo.add_argument(
+        "--metricas-intervalo", type=float,
+        help="Segundos entre exportaciones de las métricas durante la corrida (por defecto, solo al final)"
+    )
+    grupo.add_argument("--perfilar", help="Archivo donde guardar el perfil de la corrida (hilo principal)")
+    grupo.add_argument("--perfilador", choices=PERFILADORES, default="cprofile")
+
+@contextmanager
+def instrumentar(args):
+    """
+    Exporta las métricas y perfila la corrida según los argumentos de agregar_argumentos.
+
+    Args:
+        args (argparse.Namespace): Argumentos interpretados
+    """
+    exportador = None
+    if args.metricas:
+        exportador = ExportadorDeMetricas(args.metricas, args.metricas_intervalo)
+        exportador.start()
+    try:
+        with perfilar(args.perfilar, args.perfilador):
+            yield
+    finally:
+        if exportador:
+            exportador.detener()
+        metricas.imprimir()
@@ -0,0 +1,192 @@
+import os
+import sys
+import threading
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _hijos(pid):
+    """Devuelve los pids de los procesos hijos directos (Linux, /proc)."""
+    hijos = []
+    try:
+        for tarea in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tarea}/children") as archivo:
+                hijos.extend(int(hijo) for hijo in archivo.read().split())
+    except OSError:
+        pass
+    return hijos
+
+def rss_de_proceso(pid):
+    """
+    Memoria residente de un proceso, en bytes.
+
+    Args:
+        pid (int): Id del proceso
+
+    Returns:
+        int: Bytes residentes, o 0 si el proceso no existe o no hay /proc
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as archivo:
+            return int(archivo.read().split()[1]) * _PAGINA
+    except (OSError, IndexError, ValueError):
+        return 0
+
+def rss_de_arbol(pid):
+    """
+    Memoria residente de un proceso y todos sus descendientes, en bytes.
+
+    Sirve para medir el navegador completo: chromedriver, Chrome y sus
+    procesos de renderizado.
+
+    Args:
+        pid (int): Id del proceso raíz
+
+    Returns:
+        int: Suma de bytes residentes del árbol de procesos
+    """
+    total = 0
+    pendientes = [pid]
+    vistos = set()
+    while pendientes:
+        actual = pendientes.pop()
+        if actual in vistos:
+            continue
+        vistos.add(actual)
+        total += rss_de_proceso(actual)
+        pendientes.extend(_hijos(actual))
+    return total
+
+def rss_maximo_propio():
+    """
+    Pico de memoria residente del proceso de Python, en bytes.
+    """
+    if resource is None:
+        return 0
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa bytes; Linux, kilobytes
+    return maximo if sys.platform == "darwin" else maximo * 1024
+
+class MuestreadorDeMemoria(threading.Thread):
+    """
+    Hilo que mide periódicamente la memoria residente de un árbol de procesos
+    y conserva el pico y la última muestra.
+    """
+
+    def __init__(self, pid, intervalo=0.5):
+        """
+        Args:
+            pid (int): Proceso raíz a medir (por ejemplo, el de chromedriver)
+            intervalo (float): Segundos entre muestras
+        """
+        super().__init__(name="muestreador-memoria", daemon=True)
+        self.pid = pid
+        self.intervalo = intervalo
+        self.pico = 0
+        self.ultimo = 0
+        self._detener = threading.Event()
+
+    def muestrear(self):
+        self.ultimo = rss_de_arbol(self.pid)
+        self.pico = max(self.pico, self.ultimo)
+        return self.ultimo
+
+    def run(self):
+        while not self._detener.is_set():
+            self.muestrear()
+            self._detener.wait(self.intervalo)
+
+    def detener(self):
+        self._detener.set()
+        if self.is_alive():
+            self.join()
+        self.muestrear()
+        return self.pico
+
+def formatear_bytes(cantidad):
+    """Formatea una cantidad de bytes en MiB con un decimal."""
+    return f"{cantidad / (1024 * 1024):.1f} MiB"
+
+class VigilanteDelNavegador:
+    """
+    Decide cuándo conviene reciclar el navegador de una corrida larga.
+
+    Muestrea en segundo plano la memoria residente del árbol de procesos del
+    driver (chromedriver, Chrome y sus procesos de renderizado) y conserva la
+    duración de las últimas cargas de expedientes. Indica que hay que reciclar
+    cuando la memoria supera su límite o cuando la mediana de las últimas
+    'ventana' cargas supera el límite de latencia. Tras comenzar a vigilar un
+    navegador nuevo se espera al menos una carga, para no reciclarlo en un
+    ciclo si ya arranca por encima del límite.
+    """
+
+    def __init__(self, limite_memoria=None, limite_latencia=None, ventana=20, intervalo=5.0):
+        """
+        Args:
+            limite_memoria (int): Bytes residentes a partir de los que se recicla, o None
+            limite_latencia (float): Segundos de mediana de carga a partir de los que se recicla, o None
+            ventana (int): Cargas consideradas para la mediana
+            intervalo (float): Segundos entre muestras de memoria
+        """
+        self.limite_memoria = limite_memoria
+        self.limite_latencia = limite_latencia
+        self.intervalo = intervalo
+        self.muestreador = None
+        self.cargas = 0
+        self._latencias = deque(maxlen=ventana)
+
+    def vigilar(self, pid):
+        """
+        Comienza a vigilar un nuevo proceso raíz y descarta las mediciones anteriores.
+
+        Args:
+            pid (int): Proceso raíz del navegador, o None para vigilar solo la latencia
+        """
+        self.detener()
+        self.cargas = 0
+        self._latencias.clear()
+        if self.limite_memoria and pid is not None:
+            self.muestreador = MuestreadorDeMemoria(pid, self.intervalo)
+            self.muestreador.start()
+
+    def registrar_latencia(self, segundos):
+        self.cargas += 1
+        self._latencias.append(segundos)
+
+    def mediana_latencia(self):
+        ordenadas = sorted(self._latencias)
+        return ordenadas[len(ordenadas) // 2] if ordenadas else 0.0
+
+    def motivo_de_reciclaje(self):
+        """
+        Returns:
+            str: Motivo para reciclar el navegador, o None si no hace falta
+        """
+        if not self.cargas:
+            return None
+        if self.muestreador and self.muestreador.ultimo > self.limite_memoria:
+            return (
+                f"memoria del navegador {formatear_bytes(self.muestreador.ultimo)} "
+                f"(límite {formatear_bytes(self.limite_memoria)})"
+            )
+        if self.limite_latencia and len(self._latencias) == self._latencias.maxlen:
+            mediana = self.mediana_latencia()
+            if mediana > self.limite_latencia:
+                return f"mediana de carga {mediana:.2f} s en las últimas {len(self._latencias)} (límite {self.limite_latencia:.2f} s)"
+        return None
+
+    def detener(self):
+        """
+        Returns:
+            int: Pico de memoria del proceso vigilado, en bytes (0 si no se vigilaba)
+        """
+        if self.muestreador is None:
+            return 0
+        pico = self.muestreador.detener()
+        self.muestreador = None
+        return pico
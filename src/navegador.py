@@ -0,0 +1,529 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from cliente_http import liberar_cliente
+
+# Directorio de la caché de drivers, del perfil reutilizable y del estado del daemon
+DIRECTORIO_CACHE = os.environ.get(
+    "SCRAPER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "scraper-qanlex")
+)
+
+# Patrones de URL bloqueados por tipo de recurso (Network.setBlockedURLs)
+RECURSOS_BLOQUEABLES = {
+    "imagenes": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"],
+    "fuentes": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "estilos": ["*.css"],
+}
+
+PUERTO_DAEMON = 9222
+
+# Ejecutables de Chrome que se buscan en el PATH para el daemon
+EJECUTABLES_CHROME = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+_VERSION = re.compile(r"(\d+(?:\.\d+)+)")
+
+# Rutas de chromedriver ya resueltas en este proceso, por versión pedida
+_rutas_resueltas = {}
+_rutas_lock = threading.Lock()
+
+class ErrorDeNavegador(Exception):
+    """Excepción para drivers o navegadores que no pudieron prepararse."""
+    pass
+
+class ConfiguracionNavegador:
+    """
+    Opciones con las que se crean los drivers de Selenium.
+
+    Attributes:
+        headless (bool): Ejecutar Chrome sin interfaz gráfica
+        bloquear (list): Tipos de recurso a no descargar ('imagenes', 'fuentes', 'estilos')
+        perfil (str): Directorio de perfil de Chrome reutilizable entre corridas
+        version_driver (str): Versión de chromedriver fijada (completa o solo la mayor, p. ej. '120')
+        sin_red (bool): No descargar chromedriver; usar solo la caché o el PATH
+        daemon (bool): Conectarse al Chrome del daemon en lugar de iniciar uno nuevo
+        puerto_daemon (int): Puerto de depuración remota del daemon
+    """
+
+    def __init__(self, headless=False, bloquear=None, perfil=None, version_driver=None,
+                 sin_red=False, daemon=False, puerto_daemon=PUERTO_DAEMON):
+        self.headless = headless
+        self.bloquear = list(bloquear or [])
+        self.perfil = perfil
+        self.version_driver = version_driver or os.environ.get("CHROMEDRIVER_VERSION")
+        self.sin_red = sin_red
+        self.daemon = daemon
+        self.puerto_daemon = puerto_daemon
+
+    @property
+    def patrones_bloqueados(self):
+        return [patron for recurso in self.bloquear for patron in RECURSOS_BLOQUEABLES[recurso]]
+
+# Configuración usada por setup_driver (y por los trabajadores del pool)
+configuracion = ConfiguracionNavegador()
+
+def _clave_version(version):
+    return tuple(int(parte) for parte in version.split("."))
+
+def _coincide(version, pedida):
+    return pedida is None or version == pedida or version.startswith(pedida + ".")
+
+def version_de_driver(ruta):
+    """
+    Obtiene la versión de un ejecutable de chromedriver.
+
+    Args:
+        ruta (str): Ruta del ejecutable
+
+    Returns:
+        str: Versión (por ejemplo '120.0.6099.109') o None si no pudo leerse
+    """
+    try:
+        salida = subprocess.run([ruta, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    coincidencia = _VERSION.search(salida)
+    return coincidencia.group(1) if coincidencia else None
+
+def version_de_chrome():
+    """
+    Obtiene la versión del Chrome instalado (el que usa el daemon y, sin
+    CHROME_BIN, normalmente también Selenium).
+
+    Returns:
+        str: Versión (por ejemplo '120.0.6099.109') o None si no se encontró Chrome
+    """
+    try:
+        ruta = buscar_chrome()
+    except ErrorDeNavegador:
+        return None
+    # El ejecutable de Chrome responde a '--version' igual que chromedriver
+    return version_de_driver(ruta)
+
+def _ruta_manifiesto(directorio):
+    return os.path.join(directorio, "drivers", "manifiesto.json")
+
+def _leer_manifiesto(directorio):
+    try:
+        with open(_ruta_manifiesto(directorio), encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return {}
+
+def _guardar_manifiesto(directorio, manifiesto):
+    ruta = _ruta_manifiesto(directorio)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+    with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+        json.dump(manifiesto, archivo, indent=4)
+    os.replace(temporal, ruta)
+
+def _buscar_en_cache(directorio, version):
+    candidatas = [
+        (version_cacheada, ruta)
+        for version_cacheada, ruta in _leer_manifiesto(directorio).items()
+        if _coincide(version_cacheada, version) and os.access(ruta, os.X_OK)
+    ]
+    if not candidatas:
+        return None
+    return max(candidatas, key=lambda par: _clave_version(par[0]))[1]
+
+def _guardar_en_cache(directorio, origen):
+    version = version_de_driver(origen)
+    if version is None:
+        raise ErrorDeNavegador(f"No se pudo leer la versión de {origen}")
+    destino = os.path.join(directorio, "drivers", version, os.path.basename(origen))
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    if os.path.abspath(origen) != os.path.abspath(destino):
+        shutil.copy2(origen, destino)
+        os.chmod(destino, 0o755)
+
+    manifiesto = _leer_manifiesto(directorio)
+    manifiesto[version] = destino
+    _guardar_manifiesto(directorio, manifiesto)
+    return destino
+
+def resolver_chromedriver(version=None, sin_red=False, directorio=DIRECTORIO_CACHE):
+    """
+    Devuelve la ruta de un chromedriver, sin descargarlo si ya está disponible.
+
+    Se busca, en orden: la caché local (la versión más nueva que coincida con
+    'version'), el chromedriver del PATH (si coincide con la versión fijada) y,
+    si se permite el acceso a la red, la descarga con webdriver_manager, que se
+    copia a la caché. Sin versión fijada se pide la versión mayor del Chrome
+    instalado, de modo que un Chrome actualizado no use un driver viejo de la
+    caché. El resultado se recuerda durante el proceso.
+
+    Args:
+        version (str): Versión fijada, completa o parcial (None: la del Chrome
+            instalado o, si no se encuentra, la más nueva disponible)
+        sin_red (bool): Fallar en lugar de descargar si no hay un driver local
+        directorio (str): Directorio de la caché
+
+    Returns:
+        str: Ruta del ejecutable
+
+    Raises:
+        ErrorDeNavegador: Si no hay un driver local y no puede descargarse
+    """
+    with _rutas_lock:
+        if version in _rutas_resueltas:
+            return _rutas_resueltas[version]
+
+        pedida = version
+        if pedida is None:
+            chrome = version_de_chrome()
+            pedida = chrome.split(".")[0] if chrome else None
+
+        ruta = _buscar_en_cache(directorio, pedida)
+
+        if ruta is None:
+            en_path = shutil.which("chromedriver")
+            if en_path and _coincide(version_de_driver(en_path) or "", pedida):
+                ruta = _guardar_en_cache(directorio, en_path)
+
+        if ruta is None:
+            if sin_red:
+                descripcion = f" {pedida}" if pedida else ""
+                raise ErrorDeNavegador(
+                    f"No hay chromedriver{descripcion} en {directorio} ni en el PATH, "
+                    "y no se permite descargarlo"
+                )
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            ruta = _guardar_en_cache(directorio, ChromeDriverManager(driver_version=version).install())
+
+        _rutas_resueltas[version] = ruta
+        return ruta
+
+def crear_opciones(config):
+    """
+    Arma las opciones de Chrome para la configuración indicada.
+
+    Args:
+        config (ConfiguracionNavegador): Configuración del navegador
+
+    Returns:
+        Options: Opciones de Chrome
+    """
+    chrome_options = Options()
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+
+    if config.daemon:
+        chrome_options.debugger_address = f"127.0.0.1:{config.puerto_daemon}"
+        return chrome_options
+
+    if config.headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1366,900")
+    if config.perfil:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(config.perfil)}")
+    if config.bloquear:
+        # Con recursos bloqueados no tiene sentido esperar a que termine de cargar la página
+        chrome_options.page_load_strategy = "eager"
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        if "imagenes" in config.bloquear:
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    return chrome_options
+
+def bloquear_recursos(driver, patrones):
+    """
+    Impide que el navegador descargue las URL que coinciden con los patrones.
+
+    Args:
+        driver: Instancia del webdriver de Chrome
+        patrones (list): Patrones de URL (comodín '*')
+    """
+    if patrones:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patrones})
+
+def daemon_activo(puerto=PUERTO_DAEMON):
+    """
+    Indica si hay un Chrome escuchando en el puerto de depuración remota.
+    """
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/json/version", timeout=1) as respuesta:
+            return respuesta.status == 200
+    except OSError:
+        return False
+
+def crear_driver(config=None):
+    """
+    Crea un driver de Chrome con la configuración indicada.
+
+    Con 'daemon', el driver se conecta al Chrome ya iniciado por
+    'python navegador.py iniciar' y abre su propia pestaña, lo que evita el
+    arranque en frío del navegador; varias corridas (o los trabajadores del pool)
+    pueden usar el mismo daemon a la vez.
+
+    Args:
+        config (ConfiguracionNavegador): Configuración (por defecto, la del módulo)
+
+    Returns:
+        WebDriver: Driver listo para usar
+
+    Raises:
+        ErrorDeNavegador: Si el daemon no está activo o no hay chromedriver disponible
+    """
+    config = config or configuracion
+    if config.daemon and not daemon_activo(config.puerto_daemon):
+        raise ErrorDeNavegador(
+            f"No hay un daemon de Chrome en el puerto {config.puerto_daemon}; "
+            "inícielo con 'python src/navegador.py iniciar'"
+        )
+
+    service = Service(resolver_chromedriver(config.version_driver, config.sin_red))
+    driver = webdriver.Chrome(service=service, options=crear_opciones(config))
+
+    if config.daemon:
+        driver.switch_to.new_window("tab")
+        driver.pestana_propia = driver.current_window_handle
+    bloquear_recursos(driver, config.patrones_bloqueados)
+    return driver
+
+def cerrar_driver(driver):
+    """
+    Cierra el driver. Si está conectado al daemon, cierra solo su pestaña y deja
+    el navegador abierto para la próxima corrida. También descarta el cliente
+    HTTP de su sesión, si el motor 'http' creó uno.
+
+    Args:
+        driver: Instancia del webdriver
+    """
+    liberar_cliente(driver)
+    pestana = getattr(driver, "pestana_propia", None)
+    if pestana:
+        try:
+            driver.switch_to.window(pestana)
+            driver.close()
+        except Exception:
+            pass
+    driver.quit()
+
+def _ruta_estado_daemon(puerto):
+    return os.path.join(DIRECTORIO_CACHE, f"daemon-{puerto}.json")
+
+def buscar_chrome():
+    """
+    Devuelve la ruta del ejecutable de Chrome o Chromium.
+
+    Raises:
+        ErrorDeNavegador: Si no se encuentra en el PATH ni en CHROME_BIN
+    """
+    for candidato in (os.environ.get("CHROME_BIN"),) + EJECUTABLES_CHROME:
+        ruta = candidato and shutil.which(candidato)
+        if ruta:
+            return ruta
+    raise ErrorDeNavegador("No se encontró Chrome; indique su ruta en la variable CHROME_BIN")
+
+def iniciar_daemon(config, espera=15):
+    """
+    Inicia un Chrome de larga duración con depuración remota, en segundo plano.
+
+    El proceso sigue activo al terminar este comando; sus datos (pid, puerto y
+    perfil) se guardan en la caché para 'detener_daemon'.
+
+    Args:
+        config (ConfiguracionNavegador): Configuración del navegador
+        espera (float): Segundos máximos para que el navegador acepte conexiones
+
+    Returns:
+        int: Pid del navegador
+    """
+    puerto = config.puerto_daemon
+    if daemon_activo(puerto):
+        raise ErrorDeNavegador(f"Ya hay un navegador escuchando en el puerto {puerto}")
+
+    perfil = os.path.abspath(config.perfil or os.path.join(DIRECTORIO_CACHE, "perfil-daemon"))
+    os.makedirs(perfil, exist_ok=True)
+    argumentos = [
+        buscar_chrome(),
+        f"--remote-debugging-port={puerto}",
+        f"--user-data-dir={perfil}",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--disable-background-networking",
+    ]
+    if config.headless:
+        argumentos += ["--headless=new", "--window-size=1366,900"]
+    if "imagenes" in config.bloquear:
+        argumentos.append("--blink-settings=imagesEnabled=false")
+    argumentos.append("about:blank")
+
+    proceso = subprocess.Popen(
+        argumentos, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    limite = time.monotonic() + espera
+    while not daemon_activo(puerto):
+        if proceso.poll() is not None or time.monotonic() > limite:
+            proceso.kill()
+            raise ErrorDeNavegador("El navegador del daemon no aceptó conexiones")
+        time.sleep(0.1)
+
+    os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+    with open(_ruta_estado_daemon(puerto), "w", encoding="utf-8") as archivo:
+        json.dump({"pid": proceso.pid, "puerto": puerto, "perfil": perfil}, archivo)
+    return proceso.pid
+
+def detener_daemon(puerto=PUERTO_DAEMON):
+    """
+    Detiene el navegador iniciado con 'iniciar_daemon'.
+
+    Returns:
+        bool: True si había un daemon registrado y se detuvo
+    """
+    ruta = _ruta_estado_daemon(puerto)
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            pid = json.load(archivo)["pid"]
+    except (OSError, ValueError, KeyError):
+        return False
+    try:
+        os.killpg(pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError, AttributeError):
+        pass
+    os.remove(ruta)
+    return True
+
+def pid_del_navegador(driver, config=None):
+    """
+    Devuelve el proceso raíz cuyo árbol contiene el Chrome del driver.
+
+    Sin daemon es el chromedriver, que inicia Chrome como hijo. Con daemon,
+    Chrome no desciende de chromedriver: se usa el pid registrado por
+    'iniciar_daemon' o, si el daemon se inició de otra forma, el del proceso
+    principal que informa el propio navegador.
+
+    Args:
+        driver: Instancia del webdriver
+        config (ConfiguracionNavegador): Configuración (por defecto, la del módulo)
+
+    Returns:
+        int: Pid del proceso raíz, o None si no pudo determinarse
+    """
+    config = config or configuracion
+    if not config.daemon:
+        return driver.service.process.pid
+    try:
+        with open(_ruta_estado_daemon(config.puerto_daemon), encoding="utf-8") as archivo:
+            return json.load(archivo)["pid"]
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        procesos = driver.execute_cdp_cmd("SystemInfo.getProcessInfo", {})["processInfo"]
+    except Exception:
+        return None
+    return next((proceso["id"] for proceso in procesos if proceso.get("type") == "browser"), None)
+
+def agregar_argumentos(parser):
+    """
+    Agrega al parser las opciones de provisión del navegador.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser a extender
+    """
+    grupo = parser.add_argument_group("navegador")
+    grupo.add_argument("--headless", action="store_true", help="Ejecutar Chrome sin interfaz gráfica")
+    grupo.add_argument(
+        "--bloquear", action="append", choices=sorted(RECURSOS_BLOQUEABLES), default=None,
+        help="Tipo de recurso a no descargar; puede repetirse"
+    )
+    grupo.add_argument(
+        "--liviano", action="store_true",
+        help="Atajo de --headless con imágenes, fuentes y estilos bloqueados"
+    )
+    grupo.add_argument("--perfil", help="Directorio de perfil de Chrome reutilizable entre corridas")
+    grupo.add_argument("--version-driver", help="Versión de chromedriver fijada (p. ej. 120 o 120.0.6099.109)")
+    grupo.add_argument(
+        "--sin-red-driver", action="store_true",
+        help="No descargar chromedriver; usar solo la caché local o el PATH"
+    )
+    grupo.add_argument("--daemon", action="store_true", help="Conectarse al Chrome del daemon en lugar de iniciar uno")
+    grupo.add_argument("--puerto-daemon", type=int, default=PUERTO_DAEMON)
+
+def configurar(args):
+    """
+    Actualiza la configuración del módulo con los argumentos de agregar_argumentos.
+
+    Args:
+        args (argparse.Namespace): Argumentos interpretados
+
+    Returns:
+        ConfiguracionNavegador: La configuración actualizada
+    """
+    bloquear = list(args.bloquear or [])
+    if args.liviano:
+        bloquear = sorted(RECURSOS_BLOQUEABLES)
+    nueva = ConfiguracionNavegador(
+        headless=args.headless or args.liviano,
+        bloquear=bloquear,
+        perfil=args.perfil,
+        version_driver=args.version_driver,
+        sin_red=args.sin_red_driver,
+        daemon=args.daemon,
+        puerto_daemon=args.puerto_daemon,
+    )
+    # Se actualiza el mismo objeto: setup_driver y los trabajadores lo leen del módulo
+    configuracion.headless = nueva.headless
+    configuracion.bloquear = nueva.bloquear
+    configuracion.perfil = nueva.perfil
+    configuracion.version_driver = nueva.version_driver
+    configuracion.sin_red = nueva.sin_red
+    configuracion.daemon = nueva.daemon
+    configuracion.puerto_daemon = nueva.puerto_daemon
+    return configuracion
+
+def main():
+    """
+    Administra la caché de chromedriver y el daemon de Chrome.
+
+    Uso:
+        python navegador.py preparar [--version-driver 120]   # descarga y cachea el driver
+        python navegador.py iniciar [--liviano]                 # inicia el daemon
+        python navegador.py estado
+        python navegador.py detener
+    """
+    parser = argparse.ArgumentParser(description="Provisión del navegador del scraper")
+    parser.add_argument("accion", choices=["preparar", "iniciar", "estado", "detener"])
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    config = configurar(args)
+
+    try:
+        if args.accion == "preparar":
+            ruta = resolver_chromedriver(config.version_driver, config.sin_red)
+            print(f"chromedriver {version_de_driver(ruta)} disponible en {ruta}")
+        elif args.accion == "iniciar":
+            resolver_chromedriver(config.version_driver, config.sin_red)
+            pid = iniciar_daemon(config)
+            print(f"Daemon de Chrome iniciado (pid {pid}, puerto {config.puerto_daemon})")
+        elif args.accion == "estado":
+            activo = daemon_activo(config.puerto_daemon)
+            print(f"Daemon en el puerto {config.puerto_daemon}: {'activo' if activo else 'inactivo'}")
+        elif args.accion == "detener":
+            detenido = detener_daemon(config.puerto_daemon)
+            print("Daemon detenido" if detenido else "No hay un daemon registrado en ese puerto")
+    except ErrorDeNavegador as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
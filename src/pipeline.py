@@ -0,0 +1,269 @@
+import time
+import queue
+import signal
+import logging
+import threading
+from collections import deque
+
+import instrumentacion
+from esperas import percentil
+from guardarDb import CONFIG_DB, MODO_FILA, MODO_LOTES, MODO_UPSERT, ScraperDatabaseError, SubidorDeBaseDeDatos
+from indice import IndiceInvertido
+from salida import EscritorJSONL, EscritorMultiple, registrar_escritor, ruta_derivada
+from scraper import crear_parser, ejecutar, ruta_salida, validar_argumentos
+
+# Marca de fin de la corrida en la cola
+FIN = object()
+
+# Latencias recientes conservadas para calcular los percentiles
+MUESTRAS_DE_LATENCIA = 2048
+
+class MetricasPipeline:
+    """
+    Métricas de la corrida: latencia extremo a extremo, lotes y ocupación de la cola.
+
+    La latencia de cada expediente se mide desde que el scraper lo entrega
+    hasta que su lote queda confirmado en la base de datos. El máximo es
+    exacto; los percentiles se calculan sobre las últimas 'muestras'
+    latencias, para que la memoria no crezca en corridas largas.
+    """
+
+    def __init__(self, muestras=MUESTRAS_DE_LATENCIA):
+        self.inicio = time.monotonic()
+        self.encolados = 0
+        self.confirmados = 0
+        self.fallidos = 0
+        self.lotes = 0
+        self.esperas_productor = 0.0
+        self.ocupacion_maxima = 0
+        self.primera_confirmacion = None
+        self.latencia_maxima = 0.0
+        self._latencias = deque(maxlen=muestras)
+        self._lock = threading.Lock()
+
+    def registrar_encolado(self, espera, ocupacion):
+        with self._lock:
+            self.encolados += 1
+            self.esperas_productor += espera
+            self.ocupacion_maxima = max(self.ocupacion_maxima, ocupacion)
+
+    def registrar_lote(self, marcas_de_tiempo, exitoso):
+        ahora = time.monotonic()
+        with self._lock:
+            self.lotes += 1
+            if not exitoso:
+                self.fallidos += len(marcas_de_tiempo)
+                return
+            self.confirmados += len(marcas_de_tiempo)
+            latencias = [ahora - marca for marca in marcas_de_tiempo]
+            self._latencias.extend(latencias)
+            self.latencia_maxima = max(self.latencia_maxima, max(latencias, default=0.0))
+            if self.primera_confirmacion is None:
+                self.primera_confirmacion = ahora - self.inicio
+
+    def resumen(self):
+        """
+        Returns:
+            dict: Totales, percentiles de latencia (segundos) y tiempos de la corrida
+        """
+        with self._lock:
+            latencias = sorted(self._latencias)
+            return {
+                "encolados": self.encolados,
+                "confirmados": self.confirmados,
+                "fallidos": self.fallidos,
+                "lotes": self.lotes,
+                "ocupacion_maxima_cola": self.ocupacion_maxima,
+                "espera_productor_s": round(self.esperas_productor, 3),
+                "primera_confirmacion_s": round(self.primera_confirmacion or 0.0, 3),
+                "latencia_p50_s": round(percentil(latencias, 50), 3),
+                "latencia_p95_s": round(percentil(latencias, 95), 3),
+                "latencia_max_s": round(self.latencia_maxima, 3),
+                "duracion_s": round(time.monotonic() - self.inicio, 3),
+            }
+
+    def imprimir(self):
+        r = self.resumen()
+        print(
+            f"Pipeline: {r['confirmados']}/{r['encolados']} expedientes confirmados en {r['lotes']} lotes "
+            f"({r['fallidos']} fallidos) en {r['duracion_s']:.1f} s"
+        )
+        print(
+            f"Latencia extremo a extremo: p50 {r['latencia_p50_s']:.2f} s, p95 {r['latencia_p95_s']:.2f} s, "
+            f"máx {r['latencia_max_s']:.2f} s; primer lote confirmado a los {r['primera_confirmacion_s']:.1f} s"
+        )
+        print(
+            f"Cola: ocupación máxima {r['ocupacion_maxima_cola']}, "
+            f"espera acumulada del scraper por contrapresión {r['espera_productor_s']:.1f} s"
+        )
+
+class EscritorEnCola:
+    """
+    Destino de salida que entrega cada expediente a una cola acotada.
+
+    Si la cola está llena, 'escribir' bloquea al scraper hasta que el escritor
+    de base de datos libere lugar (contrapresión). Al cerrarse encola la marca
+    de fin para que el consumidor termine de vaciar la cola.
+    """
+
+    def __init__(self, cola, metricas):
+        self.cola = cola
+        self.metricas = metricas
+        self._cerrado = False
+        self._lock = threading.Lock()
+
+    def escribir(self, registro):
+        inicio = time.monotonic()
+        self.cola.put((registro, inicio))
+        self.metricas.registrar_encolado(time.monotonic() - inicio, self.cola.qsize())
+
+    def cerrar(self):
+        with self._lock:
+            if self._cerrado:
+                return
+            self._cerrado = True
+        self.cola.put(FIN)
+
+class EscritorDeBaseDeDatos(threading.Thread):
+    """
+    Hilo consumidor que sube los expedientes de la cola a MySQL en lotes.
+
+    Un lote se confirma al alcanzar 'tamano_lote' expedientes o al pasar
+    'espera_maxima' segundos desde el primero, lo que ocurra antes. Los lotes
+    que fallan se guardan en un archivo JSONL de fallidos para reintentarlos
+    con guardarDb.py, y el consumo continúa para no bloquear al scraper.
+    """
+
+    def __init__(self, subidor, cola, metricas, modo=MODO_UPSERT, tamano_lote=100,
+                 espera_maxima=5.0, ruta_fallidos=None):
+        super().__init__(name="escritor-db", daemon=True)
+        self.subidor = subidor
+        self.cola = cola
+        self.metricas = metricas
+        self.modo = modo
+        self.tamano_lote = tamano_lote
+        self.espera_maxima = espera_maxima
+        self.ruta_fallidos = ruta_fallidos
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._fallidos = None
+
+    def _confirmar(self, lote):
+        registros = [registro for registro, _ in lote]
+        marcas = [marca for _, marca in lote]
+        try:
+            self.subidor.subir_lote(registros, self.modo)
+            self.metricas.registrar_lote(marcas, exitoso=True)
+        except Exception as e:
+            self.logger.error(f"Error al subir un lote de {len(lote)} expedientes: {e}")
+            self.metricas.registrar_lote(marcas, exitoso=False)
+            if self.ruta_fallidos:
+                if self._fallidos is None:
+                    self._fallidos = EscritorJSONL(self.ruta_fallidos, fsync_segundos=0)
+                for registro in registros:
+                    self._fallidos.escribir(registro)
+                self._fallidos.vaciar(sincronizar=True)
+
+    def run(self):
+        lote = []
+        limite = None
+        try:
+            while True:
+                espera = None if limite is None else max(0.0, limite - time.monotonic())
+                try:
+                    elemento = self.cola.get(timeout=espera)
+                except queue.Empty:
+                    elemento = None
+
+                if elemento is FIN:
+                    break
+                if elemento is not None:
+                    lote.append(elemento)
+                    if limite is None:
+                        limite = time.monotonic() + self.espera_maxima
+
+                if lote and (len(lote) >= self.tamano_lote or time.monotonic() >= limite):
+                    self._confirmar(lote)
+                    lote = []
+                    limite = None
+
+            if lote:
+                self._confirmar(lote)
+        finally:
+            self.subidor.cerrar()
+            if self._fallidos:
+                self._fallidos.cerrar()
+
+def _detener_con_interrupcion(signum, frame):
+    raise KeyboardInterrupt
+
+def main():
+    """
+    Ejecuta el scraper y la carga en MySQL en paralelo.
+
+    El scraper entrega cada expediente a una cola acotada y un hilo escritor lo
+    sube en lotes, de modo que los datos aparecen en la base durante la corrida.
+    Ante Ctrl+C o SIGTERM se detiene el scraper y se vacía la cola antes de salir.
+    """
+    parser = crear_parser("Scraper de expedientes con carga concurrente en MySQL")
+    parser.add_argument("--capacidad-cola", type=int, default=500,
+                        help="Expedientes en espera antes de frenar al scraper")
+    parser.add_argument("--tamano-lote-db", type=int, default=100,
+                        help="Expedientes por lote confirmado en la base")
+    parser.add_argument("--espera-lote", type=float, default=5.0,
+                        help="Segundos máximos que un expediente espera a completar su lote")
+    parser.add_argument("--modo-db", choices=[MODO_FILA, MODO_LOTES, MODO_UPSERT], default=MODO_UPSERT,
+                        help="Modo de subida de cada lote")
+    parser.add_argument("--archivo", action="store_true",
+                        help="Guardar además la salida JSONL intermedia")
+    parser.add_argument("--indice",
+                        help="Base SQLite del índice invertido a actualizar con cada lote confirmado")
+    parser.add_argument("--sin-migrar", action="store_true",
+                        help="No aplicar las migraciones pendientes del esquema antes de empezar")
+    args = validar_argumentos(parser, parser.parse_args())
+
+    signal.signal(signal.SIGTERM, _detener_con_interrupcion)
+
+    metricas = MetricasPipeline()
+    cola = queue.Queue(maxsize=args.capacidad_cola)
+    ruta = ruta_salida()
+
+    destino = EscritorEnCola(cola, metricas)
+    if args.archivo:
+        destino = EscritorMultiple([EscritorJSONL(ruta), destino])
+    registrar_escritor(ruta, destino)
+
+    subidor = SubidorDeBaseDeDatos(CONFIG_DB)
+    if not args.sin_migrar:
+        try:
+            subidor.migrar_esquema()
+        except ScraperDatabaseError as e:
+            # El scraper sigue: los lotes que no se puedan subir quedan en el archivo de fallidos
+            print(f"No se pudo migrar el esquema de la base: {e}")
+    if args.indice:
+        subidor.indice = IndiceInvertido(args.indice)
+    escritor_db = EscritorDeBaseDeDatos(
+        subidor, cola, metricas,
+        modo=args.modo_db,
+        tamano_lote=args.tamano_lote_db,
+        espera_maxima=args.espera_lote,
+        ruta_fallidos=ruta_derivada(ruta, "fallidos")
+    )
+    escritor_db.start()
+
+    try:
+        ejecutar(args)
+    except KeyboardInterrupt:
+        print("Interrupción recibida: se detiene el scraper y se vacía la cola...")
+    finally:
+        # ejecutar() ya cierra las salidas; se repite por si falló antes de abrirlas
+        destino.cerrar()
+        escritor_db.join()
+        if subidor.indice:
+            subidor.indice.cerrar()
+        metricas.imprimir()
+        # Los últimos lotes se confirman después de que ejecutar() exporta las métricas
+        if args.metricas:
+            instrumentacion.metricas.exportar(args.metricas)
+
+if __name__ == "__main__":
+    main()
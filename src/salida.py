@@ -0,0 +1,484 @@
+import os
+import io
+import sys
+import glob
+import gzip
+import json
+import time
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Extensiones asociadas a cada tipo de compresión soportado
+EXTENSIONES_COMPRESION = {
+    None: "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# Escritores compartidos, indexados por ruta de archivo
+_escritores = {}
+_escritores_lock = threading.Lock()
+
+class ErrorDeSalida(Exception):
+    """Excepción para errores al escribir o leer los archivos de salida."""
+    pass
+
+def _compresion_de(ruta):
+    """
+    Determina la compresión de un archivo a partir de su extensión.
+
+    Args:
+        ruta (str): Ruta del archivo
+
+    Returns:
+        str: 'gzip', 'zstd' o None si el archivo no está comprimido
+    """
+    if ruta.endswith(".gz"):
+        return "gzip"
+    if ruta.endswith(".zst"):
+        return "zstd"
+    return None
+
+def _validar_compresion(compresion):
+    if compresion not in EXTENSIONES_COMPRESION:
+        raise ErrorDeSalida(f"Compresión no soportada: {compresion}")
+    if compresion == "zstd" and zstandard is None:
+        raise ErrorDeSalida("La compresión zstd requiere el paquete 'zstandard'")
+
+def _partes_de_ruta(ruta):
+    """
+    Separa la ruta en prefijo y sufijo alrededor de la extensión '.jsonl'.
+
+    'src/expedientes.jsonl.gz' -> ('src/expedientes', '.jsonl.gz')
+    """
+    directorio, nombre = os.path.split(ruta)
+    if ".jsonl" in nombre:
+        indice = nombre.index(".jsonl")
+        return os.path.join(directorio, nombre[:indice]), nombre[indice:]
+    base, extension = os.path.splitext(ruta)
+    return base, extension
+
+def segmentos(ruta):
+    """
+    Lista los archivos que componen una salida JSONL, incluyendo los rotados.
+
+    Los segmentos rotados se nombran '<base>.<n>.jsonl[.gz|.zst]' y se devuelven
+    en orden de creación, seguidos del archivo activo si existe.
+
+    Args:
+        ruta (str): Ruta del archivo activo
+
+    Returns:
+        list: Rutas existentes, en el orden en que fueron escritas
+    """
+    prefijo, sufijo = _partes_de_ruta(ruta)
+    rotados = []
+    for candidato in glob.glob(f"{glob.escape(prefijo)}.*{glob.escape(sufijo)}"):
+        numero = candidato[len(prefijo) + 1:len(candidato) - len(sufijo)]
+        if numero.isdigit():
+            rotados.append((int(numero), candidato))
+    rutas = [candidato for _, candidato in sorted(rotados)]
+    if os.path.exists(ruta):
+        rutas.append(ruta)
+    return rutas
+
+class EscritorJSONL:
+    """
+    Escritor de solo-anexado en formato JSON Lines.
+
+    Cada registro se serializa en una línea y se acumula en un buffer en memoria
+    que se vuelca al disco al superar 'tamano_buffer'. Periódicamente se fuerza
+    un fsync para acotar la pérdida de datos ante una caída. Opcionalmente
+    comprime con gzip o zstd (cada apertura agrega un miembro/frame nuevo, por lo
+    que el archivo sigue siendo legible de corrido) y rota el archivo activo por
+    tamaño o por antigüedad.
+
+    Es seguro compartir una misma instancia entre varios hilos.
+    """
+
+    def __init__(self, ruta, compresion=None, tamano_buffer=64 * 1024,
+                 fsync_segundos=5.0, rotar_bytes=None, rotar_segundos=None):
+        """
+        Args:
+            ruta (str): Ruta del archivo activo (p. ej. 'src/expedientes.jsonl')
+            compresion (str): None, 'gzip' o 'zstd'
+            tamano_buffer (int): Bytes a acumular antes de escribir en disco
+            fsync_segundos (float): Intervalo máximo entre fsync; None lo desactiva
+            rotar_bytes (int): Tamaño (sin comprimir) a partir del cual se rota
+            rotar_segundos (float): Antigüedad a partir de la cual se rota
+        """
+        _validar_compresion(compresion)
+        extension = EXTENSIONES_COMPRESION[compresion]
+        if extension and not ruta.endswith(extension):
+            ruta += extension
+
+        self.ruta = ruta
+        self.compresion = compresion
+        self.tamano_buffer = tamano_buffer
+        self.fsync_segundos = fsync_segundos
+        self.rotar_bytes = rotar_bytes
+        self.rotar_segundos = rotar_segundos
+        self.registros_escritos = 0
+
+        self._buffer = []
+        self._bytes_en_buffer = 0
+        self._crudo = None
+        self._flujo = None
+        self._bytes_segmento = 0
+        self._abierto_en = None
+        self._ultimo_fsync = time.monotonic()
+        self._lock = threading.RLock()
+
+    def _abrir(self):
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        self._crudo = open(self.ruta, "ab")
+        if self.compresion == "gzip":
+            self._flujo = gzip.GzipFile(fileobj=self._crudo, mode="ab")
+        elif self.compresion == "zstd":
+            self._flujo = zstandard.ZstdCompressor().stream_writer(self._crudo, closefd=False)
+        else:
+            self._flujo = self._crudo
+
+        # Al reabrir una salida existente el segmento ya tiene datos. En los
+        # archivos comprimidos se cuenta su tamaño comprimido, que es menor
+        # que el original: el segmento nunca rota antes de tiempo
+        self._bytes_segmento = os.path.getsize(self.ruta) if self.rotar_bytes else 0
+        self._abierto_en = time.monotonic()
+
+    def _cerrar_archivo(self):
+        if self._flujo is None:
+            return
+        if self._flujo is not self._crudo:
+            self._flujo.close()
+        self._crudo.flush()
+        os.fsync(self._crudo.fileno())
+        self._crudo.close()
+        self._crudo = None
+        self._flujo = None
+
+    def _debe_rotar(self):
+        if self._flujo is None or self._bytes_segmento == 0:
+            return False
+        if self.rotar_bytes and self._bytes_segmento >= self.rotar_bytes:
+            return True
+        if self.rotar_segundos and time.monotonic() - self._abierto_en >= self.rotar_segundos:
+            return True
+        return False
+
+    def _rotar(self):
+        """Cierra el archivo activo y lo renombra como el siguiente segmento."""
+        self._cerrar_archivo()
+        prefijo, sufijo = _partes_de_ruta(self.ruta)
+        existentes = [ruta for ruta in segmentos(self.ruta) if ruta != self.ruta]
+        numero = len(existentes) + 1
+        destino = f"{prefijo}.{numero:05d}{sufijo}"
+        while os.path.exists(destino):
+            numero += 1
+            destino = f"{prefijo}.{numero:05d}{sufijo}"
+        os.replace(self.ruta, destino)
+
+    def escribir(self, registro):
+        """
+        Agrega un registro al final de la salida.
+
+        Args:
+            registro (dict): Datos a guardar
+        """
+        linea = (json.dumps(registro, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._buffer.append(linea)
+            self._bytes_en_buffer += len(linea)
+            self.registros_escritos += 1
+
+            if self._bytes_en_buffer >= self.tamano_buffer:
+                self.vaciar()
+            elif self.fsync_segundos is not None and \
+                    time.monotonic() - self._ultimo_fsync >= self.fsync_segundos:
+                self.vaciar(sincronizar=True)
+
+    def vaciar(self, sincronizar=False):
+        """
+        Escribe el buffer pendiente en disco.
+
+        Args:
+            sincronizar (bool): Fuerza un fsync aunque no haya vencido el intervalo
+        """
+        with self._lock:
+            if self._buffer:
+                if self._flujo is None:
+                    self._abrir()
+                if self._debe_rotar():
+                    self._rotar()
+                    self._abrir()
+
+                datos = b"".join(self._buffer)
+                self._flujo.write(datos)
+                self._bytes_segmento += len(datos)
+                self._buffer = []
+                self._bytes_en_buffer = 0
+
+            if self._flujo is None:
+                return
+
+            vencido = self.fsync_segundos is not None and \
+                time.monotonic() - self._ultimo_fsync >= self.fsync_segundos
+            if sincronizar or vencido:
+                if self.compresion == "zstd":
+                    self._flujo.flush(zstandard.FLUSH_BLOCK)
+                else:
+                    self._flujo.flush()
+                self._crudo.flush()
+                os.fsync(self._crudo.fileno())
+                self._ultimo_fsync = time.monotonic()
+
+    def cerrar(self):
+        """Vuelca los datos pendientes y cierra el archivo activo."""
+        with self._lock:
+            self.vaciar()
+            self._cerrar_archivo()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+def obtener_escritor(ruta, **opciones):
+    """
+    Devuelve el escritor compartido de la ruta indicada, creándolo si no existe.
+
+    Args:
+        ruta (str): Ruta del archivo activo
+        **opciones: Parámetros de EscritorJSONL (compresión, rotación, etc.)
+
+    Returns:
+        EscritorJSONL: Escritor compartido
+    """
+    with _escritores_lock:
+        if ruta not in _escritores:
+            _escritores[ruta] = EscritorJSONL(ruta, **opciones)
+        return _escritores[ruta]
+
+def registrar_escritor(ruta, escritor):
+    """
+    Reemplaza el escritor compartido de una ruta por otro destino.
+
+    Permite redirigir la salida del scraper (por ejemplo, a una cola) sin
+    modificar el código que llama a 'obtener_escritor'. El destino debe
+    implementar 'escribir(registro)' y 'cerrar()'.
+
+    Args:
+        ruta (str): Ruta a la que se asocia el destino
+        escritor: Destino de los registros
+    """
+    with _escritores_lock:
+        _escritores[ruta] = escritor
+
+class EscritorMultiple:
+    """
+    Destino que replica cada registro en varios escritores.
+    """
+
+    def __init__(self, escritores):
+        self.escritores = list(escritores)
+
+    def escribir(self, registro):
+        for escritor in self.escritores:
+            escritor.escribir(registro)
+
+    def cerrar(self):
+        for escritor in self.escritores:
+            escritor.cerrar()
+
+def cerrar_escritores():
+    """Vuelca y cierra todos los escritores compartidos."""
+    with _escritores_lock:
+        while _escritores:
+            _, escritor = _escritores.popitem()
+            escritor.cerrar()
+
+def _abrir_lectura(ruta):
+    compresion = _compresion_de(ruta)
+    if compresion == "gzip":
+        return gzip.open(ruta, "rt", encoding="utf-8")
+    if compresion == "zstd":
+        _validar_compresion(compresion)
+        crudo = zstandard.ZstdDecompressor().stream_reader(
+            open(ruta, "rb"), read_across_frames=True, closefd=True
+        )
+        return io.TextIOWrapper(crudo, encoding="utf-8")
+    return open(ruta, "r", encoding="utf-8")
+
+def leer_registros(ruta):
+    """
+    Itera los registros de una salida JSONL, incluyendo sus segmentos rotados.
+
+    Args:
+        ruta (str): Ruta del archivo activo
+
+    Yields:
+        dict: Cada registro en el orden en que fue escrito
+    """
+    for segmento in segmentos(ruta):
+        with _abrir_lectura(segmento) as archivo:
+            for numero, linea in enumerate(archivo, start=1):
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError as e:
+                    raise ErrorDeSalida(f"Línea inválida en {segmento}:{numero}: {e}")
+
+def leer_arreglo_json(ruta, tamano_bloque=64 * 1024):
+    """
+    Itera los elementos de un archivo con un arreglo JSON sin cargarlo completo.
+
+    Lee el archivo por bloques y decodifica un elemento a la vez, por lo que la
+    memoria depende del tamaño del elemento más grande y no del archivo.
+
+    Args:
+        ruta (str): Ruta del archivo (admite compresión gzip/zstd por extensión)
+        tamano_bloque (int): Caracteres a leer en cada bloque
+
+    Yields:
+        dict: Cada elemento del arreglo, en orden
+    """
+    decodificador = json.JSONDecoder()
+    with _abrir_lectura(ruta) as archivo:
+        buffer = ""
+        posicion = 0
+        fin_de_archivo = False
+        dentro_del_arreglo = False
+
+        while True:
+            # Saltear espacios y separadores entre elementos
+            while posicion < len(buffer) and (buffer[posicion].isspace() or
+                                              (dentro_del_arreglo and buffer[posicion] == ",")):
+                posicion += 1
+
+            if posicion >= len(buffer):
+                if fin_de_archivo:
+                    if dentro_del_arreglo:
+                        raise ErrorDeSalida(f"Arreglo JSON incompleto en {ruta}")
+                    return
+                buffer = archivo.read(tamano_bloque)
+                posicion = 0
+                fin_de_archivo = not buffer
+                continue
+
+            if not dentro_del_arreglo:
+                if buffer[posicion] != "[":
+                    raise ErrorDeSalida(f"{ruta} no contiene un arreglo JSON")
+                dentro_del_arreglo = True
+                posicion += 1
+                continue
+
+            if buffer[posicion] == "]":
+                return
+
+            try:
+                elemento, posicion = decodificador.raw_decode(buffer, posicion)
+            except json.JSONDecodeError as e:
+                if fin_de_archivo:
+                    raise ErrorDeSalida(f"JSON inválido en {ruta}: {e}")
+                # El elemento puede estar cortado al final del bloque: leer más
+                bloque = archivo.read(max(tamano_bloque, len(buffer) - posicion))
+                buffer = buffer[posicion:] + bloque
+                posicion = 0
+                fin_de_archivo = not bloque
+                continue
+
+            yield elemento
+
+            if posicion > tamano_bloque:
+                buffer = buffer[posicion:]
+                posicion = 0
+
+def leer_expedientes(ruta):
+    """
+    Itera los expedientes de un archivo en cualquiera de los formatos del scraper.
+
+    Detecta si se trata de una salida JSON Lines (por extensión o por contenido)
+    o del arreglo JSON legado, y en ambos casos los lee de a uno.
+
+    Args:
+        ruta (str): Ruta del archivo
+
+    Yields:
+        dict: Cada expediente, en orden
+    """
+    if es_jsonl(ruta):
+        yield from leer_registros(ruta)
+        return
+
+    with _abrir_lectura(ruta) as archivo:
+        inicio = archivo.read(1024).lstrip()
+
+    if inicio.startswith("["):
+        yield from leer_arreglo_json(ruta)
+    elif inicio:
+        yield from leer_registros(ruta)
+
+def es_jsonl(ruta):
+    """Indica si la ruta corresponde a una salida JSON Lines."""
+    return ".jsonl" in os.path.basename(ruta)
+
+def ruta_derivada(ruta, etiqueta):
+    """
+    Construye la ruta de un archivo JSONL asociado a otro.
+
+    'src/expedientes.jsonl' + 'rechazados' -> 'src/expedientes.rechazados.jsonl'
+    """
+    prefijo, _ = _partes_de_ruta(ruta)
+    return f"{prefijo}.{etiqueta}.jsonl"
+
+def exportar_json_legado(origen, destino):
+    """
+    Genera el archivo legado (un arreglo JSON con indentación de 4 espacios)
+    a partir de una salida JSONL, sin cargarla completa en memoria.
+
+    El resultado es idéntico al que producía 'json.dump(lista, indent=4)'.
+
+    Args:
+        origen (str): Ruta de la salida JSONL
+        destino (str): Ruta del archivo JSON a generar
+
+    Returns:
+        int: Cantidad de registros exportados
+    """
+    total = 0
+    temporal = destino + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        archivo.write("[")
+        for registro in leer_registros(origen):
+            texto = json.dumps(registro, ensure_ascii=False, indent=4)
+            archivo.write(",\n" if total else "\n")
+            archivo.write("\n".join("    " + linea for linea in texto.split("\n")))
+            total += 1
+        archivo.write("\n]" if total else "]")
+    os.replace(temporal, destino)
+    return total
+
+def main():
+    """
+    Exporta una salida JSONL al formato legado.
+
+    Uso: python salida.py <origen.jsonl> <destino.json>
+    """
+    if len(sys.argv) != 3:
+        print("Uso: python salida.py <origen.jsonl> <destino.json>")
+        sys.exit(1)
+
+    total = exportar_json_legado(sys.argv[1], sys.argv[2])
+    print(f"Se exportaron {total} expedientes a {sys.argv[2]}.")
+
+if __name__ == "__main__":
+    main()
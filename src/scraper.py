@@ -1,34 +1,71 @@
 import os
-import json
 import time
+import argparse
 from datetime import datetime
 
-from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import (
-    StaleElementReferenceException, 
-    TimeoutException, 
-    NoSuchElementException
+
+from salida import cerrar_escritores, obtener_escritor
+from requests.exceptions import RequestException
+
+import cache_html
+from cliente_http import ClienteJSF, ErrorHTTP
+from esperas import (
+    buscar_sin_esperar,
+    esperar,
+    esperar_ajax,
+    esperar_reemplazo,
+    limitador,
+    telemetria,
+)
+from estado import EstadoDeRastreo, PoliticaDeRefresco
+import instrumentacion
+from instrumentacion import metricas
+from memoria import VigilanteDelNavegador, formatear_bytes
+import navegador
+from extraccion import (
+    ErrorDeExtraccion,
+    clasificar_participantes,
+    extraer_detalle_por_script,
+    extraer_intervinientes_por_script,
+    leer_filas_resultados,
+    parsear_detalle,
+    parsear_intervinientes,
+    ubicar_icono_de_fila,
 )
 
+# Estrategias disponibles para extraer la vista de detalle del expediente
+MOTOR_SCRIPT = "script"
+MOTOR_HTML = "html"
+MOTOR_ELEMENTOS = "elementos"
+MOTOR_HTTP = "http"
+
+# Página de inicio de la consulta pública de expedientes
+URL_CONSULTA = "http://scw.pjn.gov.ar/scw/home.seam"
+
+# Búsqueda por defecto: "residuos" en la jurisdicción COM
+TERMINO_BUSQUEDA = "residuos"
+JURISDICCION_BUSQUEDA = "10"
+
+# Días tras los que el modo de refresco vuelve a abrir un expediente aunque su fila no cambie
+REFRESCO_DIAS = 7.0
+
+# Límites por defecto de la pausa adaptativa entre solicitudes al sitio (segundos)
+PAUSA_MINIMA = 0.2
+PAUSA_MAXIMA = 10.0
+
 def setup_driver():
     """
     Configura y retorna el driver de Selenium con opciones predeterminadas 
     para evitar problemas de ejecución en contenedores.
+    
+    Usa la configuración de 'navegador' (headless, recursos bloqueados, perfil,
+    daemon) y el chromedriver de la caché local, sin descargarlo en cada inicio.
     """
-    chrome_options = Options()
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    return driver
+    return navegador.crear_driver()
 
 def ensure_src_directory():
     """
@@ -41,30 +78,52 @@ def ensure_src_directory():
     os.makedirs(src_dir, exist_ok=True)
     return src_dir
 
-def save_json_data(data, filename="expedientes.json"):
+def ruta_salida(filename="expedientes.jsonl"):
     """
-    Guarda los datos extraídos en un archivo JSON dentro del directorio 'src'.
+    Devuelve la ruta de un archivo de salida dentro del directorio 'src'.
     
     Args:
-        data (dict): Datos a guardar
         filename (str): Nombre del archivo de salida
+    
+    Returns:
+        str: Ruta completa del archivo
     """
-    src_dir = ensure_src_directory()
-    filepath = os.path.join(src_dir, filename)
+    return os.path.join(ensure_src_directory(), filename)
+
+def obtener_salida(filename="expedientes.jsonl", **opciones):
+    """
+    Devuelve el escritor JSONL asociado al archivo indicado, creándolo si no existe.
     
-    # Leer datos existentes o iniciar lista vacía
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            existing_data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        existing_data = []
+    Args:
+        filename (str): Nombre del archivo de salida dentro de 'src'
+        **opciones: Parámetros adicionales para EscritorJSONL (compresión, rotación, etc.)
+    
+    Returns:
+        EscritorJSONL: Escritor de la salida
+    """
+    return obtener_escritor(ruta_salida(filename), **opciones)
 
-    # Agregar nuevos datos
-    existing_data.append(data)
+def cerrar_salidas():
+    """
+    Vuelca y cierra todas las salidas abiertas.
+    """
+    cerrar_escritores()
 
-    # Guardar datos actualizados
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(existing_data, f, ensure_ascii=False, indent=4)
+@metricas.medido("escritura_json")
+def save_json_data(data, filename="expedientes.jsonl"):
+    """
+    Agrega los datos extraídos a la salida JSON Lines dentro del directorio 'src'.
+    
+    A diferencia del formato anterior (un único arreglo JSON reescrito en cada
+    llamada), cada expediente se anexa como una línea, por lo que el costo no
+    depende de la cantidad de expedientes ya guardados. El archivo legado puede
+    generarse con 'python src/salida.py src/expedientes.jsonl src/expedientes.json'.
+    
+    Args:
+        data (dict): Datos a guardar
+        filename (str): Nombre del archivo de salida
+    """
+    obtener_salida(filename).escribir(data)
 
 def wait_for_element(driver, by, value, timeout=5):
     """
@@ -80,20 +139,33 @@ def wait_for_element(driver, by, value, timeout=5):
         WebElement: Elemento encontrado o None
     """
     try:
-        return WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable((by, value))
-        )
+        return esperar(driver, EC.element_to_be_clickable((by, value)), timeout, nombre=f"elemento {value}")
     except Exception:
         return None
 
-def buscar_parte(driver):
+def resolver_captcha_manualmente(driver):
+    """
+    Pausa la ejecución hasta que el usuario resuelva el CAPTCHA en el navegador.
+    
+    Args:
+        driver: Instancia del webdriver
+    """
+    input("Por favor, resuelve el CAPTCHA y presiona Enter...")
+
+@metricas.medido("busqueda")
+def buscar_parte(driver, termino=TERMINO_BUSQUEDA, jurisdiccion=JURISDICCION_BUSQUEDA,
+                 url=URL_CONSULTA, resolver_captcha=resolver_captcha_manualmente):
     """
     Realiza la búsqueda inicial en la página web con los filtros específicos.
     
     Args:
         driver: Instancia del webdriver de Selenium
+        termino (str): Texto a buscar en el nombre de la parte
+        jurisdiccion (str): Valor de la opción de 'camaraPartes' (por defecto "10", COM)
+        url (str): Página de inicio de la consulta pública
+        resolver_captcha (callable): Función que recibe el driver y resuelve el
+            CAPTCHA; None si el sitio no lo pide (por ejemplo, el sitio simulado)
     """
-    url = "http://scw.pjn.gov.ar/scw/home.seam"
     driver.get(url)
 
     # Hacer clic en el tab 'porParte'
@@ -101,24 +173,51 @@ def buscar_parte(driver):
     if tab:
         tab.click()
 
-    # Seleccionar "COM" en el <select> de jurisdicción
+    # Seleccionar la jurisdicción en el <select>
     jurisdiccion_select = wait_for_element(driver, By.ID, "formPublica:camaraPartes")
     if jurisdiccion_select:
         select = Select(jurisdiccion_select)
-        select.select_by_value("10")
+        select.select_by_value(jurisdiccion)
 
-    # Escribir 'residuos' en el campo de búsqueda
+    # Escribir el término en el campo de búsqueda
     input_element = wait_for_element(driver, By.XPATH, '//*[@id="formPublica:nomIntervParte"]')
     if input_element:
-        input_element.send_keys("residuos")
+        input_element.send_keys(termino)
 
     # Pausar para resolver CAPTCHA manualmente
-    input("Por favor, resuelve el CAPTCHA y presiona Enter...")
+    if resolver_captcha:
+        resolver_captcha(driver)
 
     # Hacer clic en el botón "Consultar"
     boton_consultar = wait_for_element(driver, By.ID, "formPublica:buscarPorParteButton")
     if boton_consultar:
-        boton_consultar.click()
+        with limitador.turno():
+            boton_consultar.click()
+            esperar_ajax(driver, nombre="búsqueda")
+
+def listar_jurisdicciones(driver, url=URL_CONSULTA):
+    """
+    Obtiene las jurisdicciones ofrecidas en el selector 'camaraPartes'.
+    
+    Args:
+        driver: Instancia del webdriver
+        url (str): Página de inicio de la consulta pública
+    
+    Returns:
+        list: Tuplas (valor, nombre) de cada opción, en el orden de la página
+    """
+    driver.get(url)
+    tab = wait_for_element(driver, By.XPATH, '//*[@id="formPublica:porParte:header:inactive"]')
+    if tab:
+        tab.click()
+    jurisdiccion_select = wait_for_element(driver, By.ID, "formPublica:camaraPartes")
+    if jurisdiccion_select is None:
+        return []
+    return [
+        (opcion.get_attribute("value"), opcion.text.strip())
+        for opcion in Select(jurisdiccion_select).options
+        if opcion.get_attribute("value")
+    ]
 
 def hacer_click_siguiente(driver):
     """
@@ -162,80 +261,159 @@ def hacer_click_expediente(driver):
     except Exception:
         return False
 
-def extraer_expediente(driver):
+def extraer_datos_por_elementos(driver):
     """
-    Extrae datos generales (expediente, carátula, y dependencia) de la página web,
-    incluyendo las fechas, tipos y detalles de la tabla, y los actores y demandados de la sección "Intervinientes".
+    Extrae los datos generales y los movimientos consultando cada elemento por separado.
+    
+    Es la estrategia original: una llamada al driver por campo y por celda.
+    Se conserva como respaldo y como referencia para las comparaciones de rendimiento.
+    
+    Args:
+        driver: Instancia del webdriver
+    
+    Returns:
+        dict: Datos generales del expediente y sus movimientos
     """
-    try:
-        # Diccionario para almacenar los datos extraídos
-        datos = {}
+    # Diccionario para almacenar los datos extraídos
+    datos = {}
 
-        # Extraer expediente
-        contenedor_expediente = driver.find_element(By.CLASS_NAME, "col-xs-10")
-        datos["expediente"] = contenedor_expediente.find_element(By.TAG_NAME, "span").text.strip()
+    # Extraer expediente
+    contenedor_expediente = driver.find_element(By.CLASS_NAME, "col-xs-10")
+    datos["expediente"] = contenedor_expediente.find_element(By.TAG_NAME, "span").text.strip()
 
-        # Extraer jurisdicción
-        jurisdiccion_contenedor = driver.find_element(By.ID, "expediente:j_idt90:detailCamera")
-        datos["jurisdiccion"] = jurisdiccion_contenedor.text.strip()
+    # Extraer jurisdicción
+    jurisdiccion_contenedor = driver.find_element(By.ID, "expediente:j_idt90:detailCamera")
+    datos["jurisdiccion"] = jurisdiccion_contenedor.text.strip()
 
-        # Extraer dependencia
-        dependencia_contenedor = driver.find_element(By.ID, "expediente:j_idt90:detailDependencia")
-        datos["dependencia"] = dependencia_contenedor.text.strip()
+    # Extraer dependencia
+    dependencia_contenedor = driver.find_element(By.ID, "expediente:j_idt90:detailDependencia")
+    datos["dependencia"] = dependencia_contenedor.text.strip()
 
-        # Extraer situación actual
-        situacion_contenedor = driver.find_element(By.ID, "expediente:j_idt90:detailSituation")
-        datos["situacion_actual"] = situacion_contenedor.text.strip()
+    # Extraer situación actual
+    situacion_contenedor = driver.find_element(By.ID, "expediente:j_idt90:detailSituation")
+    datos["situacion_actual"] = situacion_contenedor.text.strip()
 
-        # Extraer carátula
-        caratula_contenedor = driver.find_element(By.ID, "expediente:j_idt90:detailCover")
-        datos["caratula"] = caratula_contenedor.text.strip()
+    # Extraer carátula
+    caratula_contenedor = driver.find_element(By.ID, "expediente:j_idt90:detailCover")
+    datos["caratula"] = caratula_contenedor.text.strip()
 
-        # Extraer datos de la tabla de movimientos
-        try:
-            tabla = WebDriverWait(driver, 2).until(
-                EC.presence_of_element_located((By.ID, "expediente:action-table"))
-            )
-            filas = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#expediente\\:action-table tr"))
-            )
-
-            # Verificar si la tabla contiene filas (excluyendo encabezado)
-            registros_tabla = []
-            for fila in filas[1:]:
-                celdas = fila.find_elements(By.TAG_NAME, "td")
-                if len(celdas) >= 5:
-                    registros_tabla.append({
-                        "fecha": celdas[2].text.strip(),
-                        "tipo": celdas[3].text.strip(),
-                        "detalle": celdas[4].text.strip()
-                    })
-            datos["registros_tabla"] = registros_tabla
-        except TimeoutException:
-            datos["registros_tabla"] = []
+    # Extraer datos de la tabla de movimientos. La vista ya terminó de cargarse
+    # (ver abrir_y_extraer), así que si la tabla no está es porque el expediente
+    # no tiene movimientos: no se espera a que aparezca.
+    registros_tabla = []
+    tabla = buscar_sin_esperar(driver, By.ID, "expediente:action-table")
+    if tabla is not None:
+        for fila in tabla.find_elements(By.TAG_NAME, "tr")[1:]:
+            celdas = fila.find_elements(By.TAG_NAME, "td")
+            if len(celdas) >= 5:
+                registros_tabla.append({
+                    "fecha": celdas[2].text.strip(),
+                    "tipo": celdas[3].text.strip(),
+                    "detalle": celdas[4].text.strip()
+                })
+    datos["registros_tabla"] = registros_tabla
 
-        # Extraer datos de la sección "Intervinientes"
-        intervinientes_tab = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//span[text()='Intervinientes']"))
-        )
-        intervinientes_tab.click()
+    return datos
 
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#expediente\\:participantsTable"))
-        )
+def extraer_intervinientes_por_elementos(driver):
+    """
+    Extrae actores y demandados consultando cada celda por separado.
+    
+    Args:
+        driver: Instancia del webdriver
+    
+    Returns:
+        tuple: (actores, demandados)
+    """
+    participantes = []
+    filas = driver.find_elements(By.CSS_SELECTOR, "#expediente\\:participantsTable .rf-dt-r")
+    for fila in filas:
+        tipo = fila.find_element(By.CSS_SELECTOR, "td:nth-child(1)").text.strip()
+        nombre = fila.find_element(By.CSS_SELECTOR, "td:nth-child(2)").text.strip()
+        participantes.append((tipo, nombre))
+    return clasificar_participantes(participantes)
 
-        actores, demandados = [], []
-        filas = driver.find_elements(By.CSS_SELECTOR, "#expediente\\:participantsTable .rf-dt-r")
-        for fila in filas:
-            tipo = fila.find_element(By.CSS_SELECTOR, "td:nth-child(1)").text.strip().upper()
-            nombre = fila.find_element(By.CSS_SELECTOR, "td:nth-child(2)").text.strip()
-            if "ACTOR" in tipo:
-                actores.append(nombre)
-            elif "DEMANDADO" in tipo:
-                demandados.append(nombre)
+def abrir_intervinientes(driver):
+    """
+    Abre la pestaña "Intervinientes" y espera a que se muestre la tabla de participantes.
+    
+    Args:
+        driver: Instancia del webdriver
+    """
+    intervinientes_tab = esperar(
+        driver, EC.element_to_be_clickable((By.XPATH, "//span[text()='Intervinientes']")),
+        nombre="pestaña intervinientes"
+    )
+    intervinientes_tab.click()
 
-        datos["actores"] = actores
-        datos["demandados"] = demandados
+    esperar(
+        driver, EC.presence_of_element_located((By.CSS_SELECTOR, "#expediente\\:participantsTable")),
+        nombre="tabla intervinientes"
+    )
+    esperar_ajax(driver, nombre="ajax intervinientes")
+
+def extraer_datos_expediente(driver, motor=MOTOR_SCRIPT):
+    """
+    Extrae todos los datos del expediente abierto sin guardarlos.
+    
+    Args:
+        driver: Instancia del webdriver
+        motor (str): Estrategia de extracción:
+            - 'script': un único execute_script por vista (por defecto)
+            - 'html': un único page_source por vista, parseado localmente
+            - 'elementos': una llamada al driver por campo y por celda
+    
+    Returns:
+        dict: Datos del expediente
+    """
+    if motor not in (MOTOR_SCRIPT, MOTOR_HTML, MOTOR_ELEMENTOS):
+        raise ValueError(f"Motor de extracción desconocido: {motor}")
+
+    # Con la cache activa se guardan ambas vistas, aunque la extracción falle
+    cache = cache_html.cache_activa()
+    capturar = cache is not None or motor == MOTOR_HTML
+    html_detalle = html_intervinientes = None
+    datos = {}
+    try:
+        html_detalle = driver.page_source if capturar else None
+        if motor == MOTOR_SCRIPT:
+            datos = extraer_detalle_por_script(driver)
+        elif motor == MOTOR_HTML:
+            datos = parsear_detalle(html_detalle)
+        else:
+            datos = extraer_datos_por_elementos(driver)
+
+        abrir_intervinientes(driver)
+        html_intervinientes = driver.page_source if capturar else None
+        if motor == MOTOR_SCRIPT:
+            actores, demandados = extraer_intervinientes_por_script(driver)
+        elif motor == MOTOR_HTML:
+            actores, demandados = parsear_intervinientes(html_intervinientes)
+        else:
+            actores, demandados = extraer_intervinientes_por_elementos(driver)
+    finally:
+        if cache is not None and html_detalle is not None:
+            cache.guardar_visita(html_detalle, html_intervinientes, datos.get("expediente"), motor)
+
+    datos["actores"] = actores
+    datos["demandados"] = demandados
+    return datos
+
+@metricas.medido("extraccion")
+def extraer_expediente(driver, motor=MOTOR_SCRIPT):
+    """
+    Extrae datos generales (expediente, carátula, y dependencia) de la página web,
+    incluyendo las fechas, tipos y detalles de la tabla, y los actores y demandados de la sección "Intervinientes".
+    
+    Args:
+        driver: Instancia del webdriver
+        motor (str): Estrategia de extracción ('script', 'html' o 'elementos')
+    
+    Returns:
+        dict: Datos extraídos o None si ocurrió un error
+    """
+    try:
+        datos = extraer_datos_expediente(driver, motor)
 
         # Guardar los datos en un archivo JSON
         save_json_data(datos)
@@ -272,83 +450,681 @@ def volver_a_tabla(driver):
     except Exception:
         return False
 
-def navegar_y_extraer(driver):
+def abrir_y_extraer(driver, icono_ver, motor=MOTOR_SCRIPT):
+    """
+    Abre el expediente del ícono indicado, extrae sus datos y vuelve a la tabla.
+    
+    Args:
+        driver: Instancia del webdriver
+        icono_ver: Elemento del ícono 'fa-eye' de la fila
+        motor (str): Estrategia de extracción de la vista de detalle
+    
+    Returns:
+        dict: Datos extraídos o None si ocurrió un error
+    """
+    with limitador.turno():
+        esperar_reemplazo(
+            driver, lambda: driver.execute_script("arguments[0].click();", icono_ver),
+            By.CLASS_NAME, "col-xs-10", nombre="apertura de expediente"
+        )
+    
+    expediente = extraer_expediente(driver, motor)
+
+    with limitador.turno():
+        esperar_reemplazo(
+            driver, lambda: volver_a_tabla(driver),
+            By.CLASS_NAME, "table-striped", nombre="regreso a la tabla"
+        )
+    return expediente
+
+class InformeDePagina:
+    """
+    Resultado de procesar una página de resultados: expedientes extraídos y
+    filas omitidas o fallidas, con su motivo.
+    """
+
+    def __init__(self, pagina=None):
+        self.pagina = pagina
+        self.extraidos = 0
+        self.omitidas = []
+        self.fallidas = []
+
+    def omitir(self, fila, expediente, motivo):
+        self.omitidas.append((fila, expediente, motivo))
+
+    def fallar(self, fila, expediente, motivo):
+        self.fallidas.append((fila, expediente, motivo))
+
+    def contabilizar(self, completa=True):
+        """
+        Suma el resultado de la página a los contadores de la corrida.
+
+        Args:
+            completa (bool): False si la página se interrumpió y se retomará después
+        """
+        if completa:
+            metricas.contar("paginas")
+        metricas.contar("expedientes_extraidos", self.extraidos)
+        metricas.contar("filas_omitidas", len(self.omitidas))
+        metricas.contar("filas_fallidas", len(self.fallidas))
+
+    def imprimir(self):
+        titulo = "Página" if self.pagina is None else f"Página {self.pagina + 1}"
+        print(
+            f"{titulo}: {self.extraidos} expedientes extraídos, "
+            f"{len(self.omitidas)} filas omitidas, {len(self.fallidas)} fallidas"
+        )
+        for fila, expediente, motivo in self.fallidas:
+            print(f"  Fila {fila + 1} ({expediente or 'sin número'}) fallida: {motivo}")
+        motivos = {}
+        for _, _, motivo in self.omitidas:
+            motivos[motivo] = motivos.get(motivo, 0) + 1
+        for motivo, cantidad in motivos.items():
+            print(f"  {cantidad} filas omitidas: {motivo}")
+
+class ReciclajeNecesario(Exception):
+    """
+    Interrumpe una página de resultados para reciclar el navegador antes de abrir la fila indicada.
+    """
+
+    def __init__(self, motivo, fila, extraidos):
+        super().__init__(motivo)
+        self.motivo = motivo
+        self.fila = fila
+        self.extraidos = extraidos
+
+class SupervisorDelNavegador:
+    """
+    Recicla el navegador de una corrida larga cuando su memoria o su latencia
+    superan los límites del vigilante.
+
+    El reciclaje cierra el driver, crea uno nuevo y le restaura la sesión
+    como a los trabajadores del pool: cookies y la URL de resultados
+    guardadas, sin volver a resolver el CAPTCHA. Solo si eso falla se repite
+    la búsqueda. Luego avanza hasta la página en curso; la página continúa
+    desde la fila que no llegó a abrirse, por lo que no se pierden ni se
+    repiten expedientes.
+    """
+
+    def __init__(self, driver, busqueda, vigilante):
+        """
+        Args:
+            driver: Driver con la búsqueda ya realizada
+            busqueda (callable): Función que recibe un driver nuevo y repite la búsqueda,
+                si la sesión guardada no puede restaurarse
+            vigilante (VigilanteDelNavegador): Límites de memoria y latencia
+        """
+        self.driver = driver
+        self.busqueda = busqueda
+        self.vigilante = vigilante
+        self.reciclajes = []
+        self._cookies = []
+        self._url = None
+
+    def iniciar(self):
+        """Comienza a vigilar el driver actual y guarda su sesión."""
+        self._guardar_sesion()
+        pid = navegador.pid_del_navegador(self.driver)
+        if pid is None and self.vigilante.limite_memoria:
+            print("No se pudo identificar el proceso del navegador; no se medirá su memoria")
+        self.vigilante.vigilar(pid)
+
+    def _guardar_sesion(self):
+        try:
+            self._cookies = self.driver.get_cookies()
+            self._url = self.driver.current_url
+        except Exception:
+            # Un navegador colgado puede no responder; se usan las cookies anteriores
+            pass
+
+    def comprobar(self, fila, extraidos):
+        """
+        Raises:
+            ReciclajeNecesario: Si hay que reciclar el navegador antes de abrir la fila
+        """
+        motivo = self.vigilante.motivo_de_reciclaje()
+        if motivo:
+            raise ReciclajeNecesario(motivo, fila, extraidos)
+
+    def registrar_latencia(self, segundos):
+        self.vigilante.registrar_latencia(segundos)
+
+    def reciclar(self, motivo, pagina, fila):
+        """
+        Reemplaza el driver por uno nuevo que muestra la misma página de resultados.
+
+        Args:
+            motivo (str): Motivo del reciclaje, para el registro
+            pagina (int): Página en curso (desde 0)
+            fila (int): Fila desde la que continúa la página
+
+        Returns:
+            WebDriver: El driver nuevo
+
+        Raises:
+            ErrorDeExtraccion: Si la búsqueda repetida tiene menos páginas que la en curso
+        """
+        from trabajadores import restaurar_sesion
+
+        inicio = time.perf_counter()
+        self._guardar_sesion()
+        pico = self.vigilante.detener()
+        try:
+            navegador.cerrar_driver(self.driver)
+        except Exception as e:
+            print(f"No se pudo cerrar el navegador reciclado: {type(e).__name__}: {e}")
+
+        self.driver = setup_driver()
+        restaurada = False
+        if self._url and self._cookies:
+            try:
+                restaurar_sesion(self.driver, self._url, self._cookies)
+                restaurada = True
+            except Exception as e:
+                print(f"No se pudo restaurar la sesión ({type(e).__name__}: {e}); se repite la búsqueda")
+        if not restaurada:
+            self.busqueda(self.driver)
+        if not avanzar_paginas(self.driver, pagina):
+            raise ErrorDeExtraccion(f"La búsqueda repetida no llega a la página {pagina + 1}")
+        self.iniciar()
+
+        segundos = time.perf_counter() - inicio
+        self.reciclajes.append({
+            "momento": datetime.now().isoformat(timespec="seconds"),
+            "motivo": motivo, "pagina": pagina, "fila": fila,
+            "pico_memoria": pico, "segundos": round(segundos, 3),
+        })
+        metricas.contar("reciclajes_navegador")
+        metricas.observar("reciclaje_navegador", segundos)
+        print(
+            f"[{self.reciclajes[-1]['momento']}] Navegador reciclado por {motivo} "
+            f"(pico {formatear_bytes(pico)}); se continúa en la página {pagina + 1}, fila {fila + 1} "
+            f"tras {segundos:.1f} s"
+        )
+        return self.driver
+
+    def detener(self):
+        self.vigilante.detener()
+        if self.reciclajes:
+            print(f"El navegador se recicló {len(self.reciclajes)} veces")
+
+def _comprobar_supervisor(supervisor, informe, fila):
+    """Antes de abrir la fila, cierra el informe parcial si hay que reciclar el navegador."""
+    try:
+        supervisor.comprobar(fila, informe.extraidos)
+    except ReciclajeNecesario:
+        informe.contabilizar(completa=False)
+        informe.imprimir()
+        raise
+
+def asegurar_tabla(driver):
+    """
+    Verifica que el navegador muestre la tabla de resultados; si quedó en una
+    vista de detalle por un error anterior, vuelve a la tabla.
+    
+    Args:
+        driver: Instancia del webdriver
+    """
+    if buscar_sin_esperar(driver, By.CLASS_NAME, "table-striped") is None:
+        esperar_reemplazo(
+            driver, lambda: volver_a_tabla(driver),
+            By.CLASS_NAME, "table-striped", nombre="regreso a la tabla"
+        )
+
+def procesar_pagina_http(driver, progreso=None, pagina=None, desde_fila=0, supervisor=None):
+    """
+    Extrae los expedientes de la página de resultados actual mediante postbacks HTTP.
+    
+    Cada vista de detalle se pide con la sesión del navegador, sin hacer clic ni
+    renderizar la página. Si una respuesta no puede interpretarse, ese expediente
+    se extrae con Selenium.
+    
+    Args:
+        driver: Instancia del webdriver
+        progreso (ProgresoDeCorrida): Avance persistente de la corrida, opcional
+        pagina (int): Número de página (desde 0), solo para el informe
+        desde_fila (int): Primera fila a procesar (tras reciclar el navegador)
+        supervisor (SupervisorDelNavegador): Supervisor de memoria y latencia, opcional
+    
+    Returns:
+        int: Cantidad de expedientes extraídos en la página
+
+    Raises:
+        ReciclajeNecesario: Si hay que reciclar el navegador antes de terminar la página
+    """
+    informe = InformeDePagina(pagina)
+
+    esperar(driver, EC.presence_of_element_located((By.CLASS_NAME, "table-striped")), nombre="tabla de resultados")
+
+    cliente = ClienteJSF.para_driver(driver)
+    enlaces = cliente.cargar_resultados(driver.page_source, driver.current_url)
+
+    for enlace in enlaces:
+        if enlace.fila < desde_fila:
+            continue
+        if supervisor:
+            _comprobar_supervisor(supervisor, informe, enlace.fila)
+        if progreso and enlace.expediente and not progreso.reclamar(enlace.expediente):
+            informe.omitir(enlace.fila, enlace.expediente, "ya extraído")
+            continue
+        if progreso and progreso.sin_cambios(enlace.expediente, enlace.situacion, enlace.ultima_actualizacion):
+            informe.omitir(enlace.fila, enlace.expediente, "sin cambios desde la última extracción")
+            continue
+
+        datos = None
+        motivo = "la extracción con el navegador no devolvió datos"
+        inicio = time.perf_counter()
+        try:
+            with limitador.turno(), metricas.medir("extraccion_http"):
+                datos = cliente.obtener_expediente(enlace)
+            save_json_data(datos)
+            print(f"Expediente {datos['expediente']} extraído correctamente")
+        except (ErrorHTTP, ErrorDeExtraccion, RequestException) as e:
+            print(f"Extracción HTTP fallida para {enlace.id}, se usa el navegador: {e}")
+            try:
+                asegurar_tabla(driver)
+                icono_ver = driver.find_element(By.ID, enlace.id)
+                datos = abrir_y_extraer(driver, icono_ver)
+            except Exception as error_navegador:
+                motivo = f"{type(error_navegador).__name__}: {error_navegador}"
+                datos = None
+        if supervisor:
+            supervisor.registrar_latencia(time.perf_counter() - inicio)
+
+        if datos:
+            informe.extraidos += 1
+            if progreso:
+                progreso.registrar_expediente(enlace.expediente or datos["expediente"], enlace.fila, pagina, datos=datos)
+        else:
+            informe.fallar(enlace.fila, enlace.expediente, motivo)
+            if progreso:
+                progreso.registrar_fallo(motivo, pagina, enlace.fila, enlace.expediente)
+                if enlace.expediente:
+                    progreso.liberar(enlace.expediente)
+
+    informe.contabilizar()
+    informe.imprimir()
+    return informe.extraidos
+
+@metricas.medido("pagina")
+def procesar_pagina(driver, motor=MOTOR_SCRIPT, progreso=None, pagina=None, desde_fila=0, supervisor=None):
+    """
+    Abre cada expediente de la página de resultados actual y extrae su información.
+    
+    Las filas se leen una sola vez (número de expediente e id del enlace de cada
+    una, en un único execute_script). Al volver de cada vista de detalle solo se
+    vuelve a ubicar el ícono de la fila siguiente, verificando que siga mostrando
+    el mismo expediente. Las filas omitidas o fallidas se informan al final.
+    
+    Args:
+        driver: Instancia del webdriver
+        motor (str): Estrategia de extracción de la vista de detalle
+        progreso (ProgresoDeCorrida): Avance persistente de la corrida; si se indica,
+            se omiten los expedientes ya extraídos (y, en modo de refresco, los que
+            no cambiaron) y se registran los nuevos
+        pagina (int): Número de página (desde 0), solo para el informe
+        desde_fila (int): Primera fila a procesar (tras reciclar el navegador)
+        supervisor (SupervisorDelNavegador): Supervisor de memoria y latencia; antes
+            de abrir cada fila se comprueba si hay que reciclar el navegador
+    
+    Returns:
+        int: Cantidad de expedientes extraídos en la página
+
+    Raises:
+        ReciclajeNecesario: Si hay que reciclar el navegador antes de terminar la página
+    """
+    if motor == MOTOR_HTTP:
+        return procesar_pagina_http(driver, progreso, pagina, desde_fila, supervisor)
+
+    informe = InformeDePagina(pagina)
+
+    esperar(driver, EC.presence_of_element_located((By.CLASS_NAME, "table-striped")), nombre="tabla de resultados")
+
+    for fila in leer_filas_resultados(driver):
+        numero = fila["expediente"]
+        if fila["fila"] < desde_fila:
+            continue
+        if not fila["tiene_enlace"]:
+            informe.omitir(fila["fila"], numero, "la fila no tiene enlace al expediente")
+            continue
+        if supervisor:
+            _comprobar_supervisor(supervisor, informe, fila["fila"])
+        if progreso and numero and not progreso.reclamar(numero):
+            informe.omitir(fila["fila"], numero, "ya extraído")
+            continue
+        if progreso and progreso.sin_cambios(numero, fila["situacion"], fila["ultima_actualizacion"]):
+            informe.omitir(fila["fila"], numero, "sin cambios desde la última extracción")
+            continue
+
+        expediente = None
+        motivo = "la extracción no devolvió datos"
+        inicio = time.perf_counter()
+        try:
+            asegurar_tabla(driver)
+            icono_ver = ubicar_icono_de_fila(driver, fila)
+            if icono_ver is None:
+                motivo = "la fila ya no muestra el expediente de la instantánea"
+            else:
+                expediente = abrir_y_extraer(driver, icono_ver, motor)
+        except Exception as e:
+            motivo = f"{type(e).__name__}: {e}"
+        if supervisor:
+            supervisor.registrar_latencia(time.perf_counter() - inicio)
+
+        if expediente:
+            informe.extraidos += 1
+            if progreso:
+                progreso.registrar_expediente(numero or expediente["expediente"], fila["fila"], pagina, datos=expediente)
+        else:
+            informe.fallar(fila["fila"], numero, motivo)
+            if progreso:
+                progreso.registrar_fallo(motivo, pagina, fila["fila"], numero)
+                if numero:
+                    progreso.liberar(numero)
+
+    informe.contabilizar()
+    informe.imprimir()
+    return informe.extraidos
+
+@metricas.medido("paginacion")
+def avanzar_paginas(driver, cantidad):
+    """
+    Avanza la cantidad indicada de páginas de resultados.
+    
+    En lugar de una pausa fija, cada clic espera a que la tabla anterior quede
+    obsoleta y la nueva esté cargada, respetando el turno del limitador adaptativo.
+    
+    Args:
+        driver: Instancia del webdriver
+        cantidad (int): Cantidad de páginas a avanzar
+    
+    Returns:
+        bool: True si se pudo avanzar todas las páginas, False si se llegó al final
+    """
+    for _ in range(cantidad):
+        with limitador.turno():
+            if not esperar_reemplazo(driver, lambda: hacer_click_siguiente(driver), nombre="cambio de página"):
+                return False
+    return True
+
+def _interrumpir_por_demora(progreso, pagina):
+    """
+    Informa y registra un cambio de página que agotó su espera.
+
+    No se reintenta el clic: si el sitio terminó de cambiar de página tarde,
+    un segundo clic salteraría una. La corrida se detiene sin completarse y la
+    reanudación parte de la última página registrada.
+    """
+    motivo = f"El cambio a la página {pagina + 1} agotó la espera; la corrida se detiene"
+    print(motivo)
+    if progreso:
+        progreso.registrar_fallo(motivo, pagina)
+
+def navegar_y_extraer(driver, motor=MOTOR_SCRIPT, progreso=None, supervisor=None):
     """
     Navega por las páginas de la tabla, hace clic en los expedientes y extrae información.
     
     Args:
         driver: Instancia del webdriver
+        motor (str): Estrategia de extracción de la vista de detalle
+        progreso (ProgresoDeCorrida): Avance persistente de la corrida; si se indica,
+            se retoma desde la última página registrada
+        supervisor (SupervisorDelNavegador): Si se indica, recicla el navegador al
+            superar sus límites y la corrida continúa con el driver nuevo
+            ('supervisor.driver')
     
     Returns:
         int: Total de expedientes extraídos
     """
     total_expedientes = 0
+    pagina = 0
+    desde_fila = 0
+
+    if progreso and progreso.pagina:
+        print(
+            f"Retomando en la página {progreso.pagina + 1} "
+            f"({progreso.total_extraidos} expedientes ya extraídos)"
+        )
+        try:
+            if not avanzar_paginas(driver, progreso.pagina):
+                print("La búsqueda tiene menos páginas que las registradas.")
+                return total_expedientes
+        except TimeoutException:
+            _interrumpir_por_demora(progreso, progreso.pagina)
+            return total_expedientes
+        pagina = progreso.pagina
 
     while True:
         try:
-            tabla = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "table-striped"))
-            )
-            
-            def procesar_tabla():
-                nonlocal total_expedientes
-                filas = driver.find_elements(By.TAG_NAME, "tr")[1:]
-                
-                for i in range(len(filas)):
-                    try:
-                        filas = driver.find_elements(By.TAG_NAME, "tr")[1:]
-                        fila_actual = filas[i]
-                        
-                        try:
-                            icono_ver = fila_actual.find_element(By.CLASS_NAME, "fa-eye")
-                        except Exception:
-                            continue
-                        
-                        driver.execute_script("arguments[0].click();", icono_ver)
-                        
-                        WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.CLASS_NAME, "col-xs-10"))
-                        )
-                        
-                        expediente = extraer_expediente(driver)
-                        if expediente:
-                            total_expedientes += 1
-
-                        volver_a_tabla(driver)
-                        
-                        WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.CLASS_NAME, "table-striped"))
-                        )
-                        
-                    except StaleElementReferenceException:
-                        continue
-                    except Exception:
-                        continue
-            
-            procesar_tabla()
+            total_expedientes += procesar_pagina(driver, motor, progreso, pagina, desde_fila, supervisor)
+        except ReciclajeNecesario as reciclaje:
+            total_expedientes += reciclaje.extraidos
+            try:
+                driver = supervisor.reciclar(reciclaje.motivo, pagina, reciclaje.fila)
+            except Exception as e:
+                motivo = f"No se pudo reciclar el navegador: {type(e).__name__}: {e}"
+                print(motivo)
+                if progreso:
+                    progreso.registrar_fallo(motivo, pagina, reciclaje.fila)
+                return total_expedientes
+            desde_fila = reciclaje.fila
+            continue
+        except Exception as e:
+            motivo = f"Error al procesar la página {pagina + 1}: {type(e).__name__}: {e}"
+            print(motivo)
+            if progreso:
+                progreso.registrar_fallo(motivo, pagina)
+            return total_expedientes
+        desde_fila = 0
 
-        except Exception:
-            break
+        if progreso:
+            progreso.registrar_pagina_completa(pagina)
 
-        if not hacer_click_siguiente(driver):
-            break
+        try:
+            if not avanzar_paginas(driver, 1):
+                break
+        except TimeoutException:
+            _interrumpir_por_demora(progreso, pagina + 1)
+            return total_expedientes
+        pagina += 1
 
-        time.sleep(2)
+    if progreso:
+        progreso.completar()
     
     return total_expedientes
 
-def main():
+def crear_parser(descripcion="Scraper de expedientes del PJN"):
     """
-    Función principal que orquesta el proceso de scraping.
+    Crea el parser de argumentos del scraper, para extenderlo desde otros comandos.
+    
+    Args:
+        descripcion (str): Descripción del comando
+    
+    Returns:
+        argparse.ArgumentParser: Parser con las opciones del scraper
+    """
+    parser = argparse.ArgumentParser(description=descripcion)
+    parser.add_argument(
+        "--trabajadores", type=int, default=1,
+        help="Cantidad de navegadores que comparten la sesión (por defecto 1)"
+    )
+    parser.add_argument(
+        "--motor", choices=[MOTOR_SCRIPT, MOTOR_HTML, MOTOR_ELEMENTOS, MOTOR_HTTP], default=MOTOR_SCRIPT,
+        help="Estrategia de extracción de la vista de detalle"
+    )
+    parser.add_argument(
+        "--estado", default=os.path.join("src", "rastreo.db"),
+        help="Base SQLite con el avance de la corrida, para retomarla tras una interrupción"
+    )
+    parser.add_argument(
+        "--sin-estado", action="store_true",
+        help="No registrar ni retomar el avance de la corrida"
+    )
+    parser.add_argument(
+        "--pausa-minima", type=float, default=PAUSA_MINIMA,
+        help="Segundos mínimos entre solicitudes al sitio (la pausa se adapta a su latencia)"
+    )
+    parser.add_argument(
+        "--pausa-maxima", type=float, default=PAUSA_MAXIMA,
+        help="Segundos máximos entre solicitudes cuando el sitio está lento o falla"
+    )
+    parser.add_argument(
+        "--cache-html",
+        help="Directorio donde guardar las páginas de cada expediente para re-extraerlas sin el sitio"
+    )
+    parser.add_argument(
+        "--cache-limite-mb", type=float,
+        help="Tamaño máximo de la cache HTML; se eliminan primero las páginas usadas hace más tiempo"
+    )
+    parser.add_argument(
+        "--refrescar", action="store_true",
+        help="Abrir solo los expedientes nuevos o cuya fila de resultados cambió desde la última extracción"
+    )
+    parser.add_argument(
+        "--refresco-dias", type=float, default=REFRESCO_DIAS,
+        help="Días tras los que --refrescar vuelve a abrir un expediente aunque no cambie"
+    )
+    parser.add_argument(
+        "--reciclar-memoria-mb", type=float,
+        help="Reciclar el navegador cuando su memoria residente (con sus procesos hijos) supere estos MiB"
+    )
+    parser.add_argument(
+        "--reciclar-latencia", type=float,
+        help="Reciclar el navegador cuando la mediana de las últimas cargas de expedientes supere estos segundos"
+    )
+    parser.add_argument(
+        "--reciclar-ventana", type=int, default=20,
+        help="Cargas de expedientes consideradas para la mediana de --reciclar-latencia"
+    )
+    navegador.agregar_argumentos(parser)
+    instrumentacion.agregar_argumentos(parser)
+    return parser
+
+def crear_refresco(args, estado):
+    """
+    Crea la política del modo de refresco según los argumentos de crear_parser().
+
+    Args:
+        args (argparse.Namespace): Argumentos interpretados
+        estado (EstadoDeRastreo): Almacén del avance, o None si se usa --sin-estado
+
+    Returns:
+        PoliticaDeRefresco: Política a asignar a cada ProgresoDeCorrida, o None sin --refrescar
+
+    Raises:
+        SystemExit: Si se pide el refresco sin base de estado
+    """
+    if not args.refrescar:
+        return None
+    if estado is None:
+        raise SystemExit("--refrescar necesita la base de estado (no puede combinarse con --sin-estado)")
+    return PoliticaDeRefresco(estado, args.refresco_dias * 86400)
+
+def validar_argumentos(parser, args):
     """
+    Rechaza las combinaciones de opciones que no pueden usarse juntas.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser que interpretó los argumentos
+        args (argparse.Namespace): Argumentos interpretados
+
+    Returns:
+        argparse.Namespace: Los mismos argumentos
+    """
+    if args.trabajadores < 1:
+        parser.error("--trabajadores debe ser al menos 1")
+    if args.trabajadores > 1 and (args.reciclar_memoria_mb or args.reciclar_latencia):
+        parser.error("--reciclar-memoria-mb y --reciclar-latencia solo se admiten con --trabajadores 1")
+    return args
+
+def parsear_argumentos(argv=None):
+    """
+    Interpreta los argumentos de línea de comandos del scraper.
+    
+    Args:
+        argv (list): Argumentos a interpretar (por defecto, los del proceso)
+    
+    Returns:
+        argparse.Namespace: Argumentos interpretados
+    """
+    parser = crear_parser()
+    return validar_argumentos(parser, parser.parse_args(argv))
+
+def crear_vigilante(args):
+    """
+    Crea el vigilante de reciclaje del navegador según los argumentos.
+
+    Args:
+        args (argparse.Namespace): Argumentos de crear_parser()
+
+    Returns:
+        VigilanteDelNavegador: Vigilante, o None si no se pidió reciclar
+    """
+    if not (args.reciclar_memoria_mb or args.reciclar_latencia):
+        return None
+    return VigilanteDelNavegador(
+        limite_memoria=int(args.reciclar_memoria_mb * 1024 * 1024) if args.reciclar_memoria_mb else None,
+        limite_latencia=args.reciclar_latencia,
+        ventana=args.reciclar_ventana
+    )
+
+def ejecutar(args):
+    """
+    Ejecuta una corrida completa del scraper con los argumentos indicados.
+    
+    Args:
+        args (argparse.Namespace): Argumentos de crear_parser()
+    
+    Returns:
+        int: Total de expedientes extraídos
+    """
+    estado = None if args.sin_estado else EstadoDeRastreo(args.estado)
+    refresco = crear_refresco(args, estado)
+    limitador.configurar(minimo=args.pausa_minima, maximo=args.pausa_maxima, trabajadores=args.trabajadores)
+    navegador.configurar(args)
+    if args.cache_html:
+        cache_html.activar_cache(args.cache_html, args.cache_limite_mb)
     driver = setup_driver()
+    supervisor = None
 
     try:
-        buscar_parte(driver)
-        total_expedientes = navegar_y_extraer(driver)
+        with instrumentacion.instrumentar(args):
+            buscar_parte(driver)
+            vigilante = crear_vigilante(args)
+            if vigilante:
+                supervisor = SupervisorDelNavegador(driver, buscar_parte, vigilante)
+                supervisor.iniciar()
+            progreso = estado.iniciar_corrida(TERMINO_BUSQUEDA, JURISDICCION_BUSQUEDA) if estado else None
+            if progreso:
+                progreso.refresco = refresco
+            if args.trabajadores > 1:
+                from trabajadores import ejecutar_pool
+
+                estadisticas = ejecutar_pool(driver, args.trabajadores, args.motor, progreso=progreso)
+                total_expedientes = sum(est.expedientes for est in estadisticas)
+            else:
+                total_expedientes = navegar_y_extraer(driver, args.motor, progreso, supervisor)
         print(f"Se extrajeron {total_expedientes} expedientes.")
+        return total_expedientes
     finally:
-        driver.quit()
+        telemetria.imprimir()
+        limitador.imprimir()
+        if refresco:
+            refresco.imprimir()
+        cerrar_salidas()
+        cache_html.cerrar_cache()
+        if estado:
+            estado.cerrar()
+        if supervisor:
+            supervisor.detener()
+            driver = supervisor.driver
+        navegador.cerrar_driver(driver)
+
+def main():
+    """
+    Función principal que orquesta el proceso de scraping.
+    """
+    ejecutar(parsear_argumentos())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
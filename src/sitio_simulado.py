@@ -0,0 +1,399 @@
+import sys
+import time
+import random
+import argparse
+import threading
+import uuid
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Identificadores de la consulta pública que usa el scraper
+ID_FORMULARIO_LISTA = "j_idt118"
+ID_SIGUIENTE = "j_idt118:j_idt208:j_idt215"
+ID_VOLVER = "expediente:volver"
+
+JURISDICCIONES = {
+    "0": "CSJ - Corte Suprema de Justicia de la Nación",
+    "1": "CIV - Cámara Nacional de Apelaciones en lo Civil",
+    "2": "CAF - Cámara Nacional de Apelaciones en lo Contencioso Administrativo Federal",
+    "3": "CCF - Cámara Nacional de Apelaciones en lo Civil y Comercial Federal",
+    "4": "CNE - Cámara Nacional Electoral",
+    "5": "CSS - Cámara Federal de la Seguridad Social",
+    "6": "CPE - Cámara Nacional de Apelaciones en lo Penal Económico",
+    "7": "CNT - Cámara Nacional de Apelaciones del Trabajo",
+    "8": "CFP - Cámara Criminal y Correccional Federal",
+    "9": "CCC - Cámara Nacional de Apelaciones en lo Criminal y Correccional",
+    "10": "COM - Cámara Nacional de Apelaciones en lo Comercial",
+}
+
+TIPOS_MOVIMIENTO = [
+    "Despacho", "Cédula electrónica", "Escrito agregado", "Resolución",
+    "Oficio", "Notificación", "Audiencia", "Sentencia",
+]
+SITUACIONES = ["EN LETRA", "EN DESPACHO", "A SENTENCIA", "ARCHIVADO", "EN CASILLERO"]
+NOMBRES = [
+    "GÓMEZ, MARÍA JOSÉ", "PÉREZ, JUAN", "RODRÍGUEZ, ANA", "FERNÁNDEZ, LUIS",
+    "MUNICIPALIDAD DE ÑANDUBAY", "FISCO NACIONAL", "ESTADO NACIONAL",
+    "LIMPIEZA & RECOLECCIÓN S.R.L.", "TRANSPORTES DEL OESTE S.A.",
+]
+
+# Implementación mínima de mojarra.jsfcljs: agrega los parámetros al formulario y lo envía
+_SCRIPT_JSF = """
+<script>
+var mojarra = {
+    jsfcljs: function (form, params, target) {
+        for (var nombre in params) {
+            var campo = document.createElement('input');
+            campo.type = 'hidden';
+            campo.name = nombre;
+            campo.value = params[nombre];
+            form.appendChild(campo);
+        }
+        form.submit();
+    }
+};
+</script>
+"""
+
+def _enlace_jsf(id_formulario, id_enlace, contenido, clase=""):
+    clase = f' class="{clase}"' if clase else ""
+    return (
+        f'<a id="{id_enlace}" href="#"{clase} onclick="mojarra.jsfcljs(document.getElementById(\'{id_formulario}\'),'
+        f'{{\'{id_enlace}\':\'{id_enlace}\'}},\'\');return false">{contenido}</a>'
+    )
+
+class DatosSinteticos:
+    """
+    Genera de forma determinística los expedientes de una búsqueda.
+
+    Cada expediente se construye a partir de su índice y de la semilla, por lo
+    que no hace falta mantener el conjunto completo en memoria.
+    """
+
+    def __init__(self, cantidad=200, movimientos=30, participantes=4, semilla=1):
+        self.cantidad = cantidad
+        self.movimientos = movimientos
+        self.participantes = participantes
+        self.semilla = semilla
+
+    def expediente(self, indice, termino, jurisdiccion):
+        """
+        Returns:
+            dict: Datos del expediente con el mismo formato que produce el scraper
+        """
+        azar = random.Random(f"{self.semilla}:{termino}:{jurisdiccion}:{indice}")
+        sigla = JURISDICCIONES.get(jurisdiccion, JURISDICCIONES["10"]).split(" - ")[0]
+        actor = azar.choice(NOMBRES)
+        demandado = azar.choice(NOMBRES)
+
+        registros = []
+        for _ in range(max(0, int(azar.gauss(self.movimientos, self.movimientos / 3)))):
+            tipo = azar.choice(TIPOS_MOVIMIENTO)
+            registros.append({
+                "fecha": f"Fecha: {azar.randint(1, 28):02d}/{azar.randint(1, 12):02d}/{azar.randint(2010, 2024)}",
+                "tipo": tipo,
+                "detalle": f"{tipo.upper()} N° {azar.randint(1, 9999)} - {termino.upper()}",
+            })
+
+        actores, demandados = [actor], [demandado]
+        for _ in range(max(0, self.participantes - 2)):
+            (actores if azar.random() < 0.5 else demandados).append(azar.choice(NOMBRES))
+
+        return {
+            "expediente": f"{sigla} {10000 + indice:06d}/{azar.randint(2010, 2024)}",
+            "jurisdiccion": JURISDICCIONES.get(jurisdiccion, JURISDICCIONES["10"]).split(" - ")[1],
+            "dependencia": f"JUZGADO {sigla} {azar.randint(1, 30)} - SECRETARIA N° {azar.randint(1, 60)}",
+            "situacion_actual": azar.choice(SITUACIONES),
+            "caratula": f"{actor} c/ {demandado} s/ {termino.upper()}",
+            "registros_tabla": registros,
+            "actores": actores,
+            "demandados": demandados,
+        }
+
+class SitioSimulado(ThreadingHTTPServer):
+    """
+    Servidor HTTP local que reproduce la consulta pública de expedientes del PJN.
+
+    Reproduce el formulario 'formPublica', la tabla paginada 'table-striped' con
+    el botón siguiente 'j_idt118:j_idt208:j_idt215', y las vistas de detalle,
+    'expediente:action-table' y 'expediente:participantsTable'. La página y la
+    fila se codifican en el 'javax.faces.ViewState', como en una vista JSF, por
+    lo que varios navegadores pueden compartir la misma sesión.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, direccion=("127.0.0.1", 0), datos=None, por_pagina=10, latencia=0.0):
+        """
+        Args:
+            direccion (tuple): Host y puerto (0 elige uno libre)
+            datos (DatosSinteticos): Generador de expedientes
+            por_pagina (int): Filas por página de resultados
+            latencia (float): Segundos de demora artificial por respuesta
+        """
+        super().__init__(direccion, _Manejador)
+        self.datos = datos or DatosSinteticos()
+        self.por_pagina = por_pagina
+        self.latencia = latencia
+        self.sesiones = {}
+        self.solicitudes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}/scw/home.seam"
+
+    @property
+    def paginas(self):
+        return max(1, -(-self.datos.cantidad // self.por_pagina))
+
+    def iniciar_en_segundo_plano(self):
+        """Atiende solicitudes en un hilo daemon y devuelve el servidor."""
+        threading.Thread(target=self.serve_forever, name="sitio-simulado", daemon=True).start()
+        return self
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    # Utilidades
+
+    def _sesion(self):
+        cookies = self.headers.get("Cookie", "")
+        for parte in cookies.split(";"):
+            nombre, _, valor = parte.strip().partition("=")
+            if nombre == "JSESSIONID":
+                return valor, self.server.sesiones.get(valor)
+        return None, None
+
+    def _responder(self, html, estado=200, cabeceras=None):
+        if self.server.latencia:
+            time.sleep(self.server.latencia)
+        with self.server._lock:
+            self.server.solicitudes += 1
+
+        cuerpo = html.encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _redirigir(self, destino, cabeceras=None):
+        cabeceras = dict(cabeceras or {})
+        cabeceras["Location"] = destino
+        self._responder("", estado=303, cabeceras=cabeceras)
+
+    def _formulario(self):
+        largo = int(self.headers.get("Content-Length", 0))
+        campos = parse_qs(self.rfile.read(largo).decode("utf-8"), keep_blank_values=True)
+        return {nombre: valores[-1] for nombre, valores in campos.items()}
+
+    # Rutas
+
+    def do_GET(self):
+        ruta = urlparse(self.path).path
+        if ruta == "/scw/home.seam":
+            return self._responder(self._pagina_inicio())
+        if ruta == "/scw/consultaListaRelacionados.seam":
+            _, consulta = self._sesion()
+            if consulta is None:
+                return self._redirigir("/scw/home.seam")
+            return self._responder(self._pagina_resultados(consulta, 0))
+        if ruta == "/favicon.ico":
+            return self._responder("", estado=404)
+        return self._responder("<html><body>No encontrado</body></html>", estado=404)
+
+    def do_POST(self):
+        ruta = urlparse(self.path).path
+        campos = self._formulario()
+
+        if ruta == "/scw/home.seam":
+            id_sesion = uuid.uuid4().hex
+            self.server.sesiones[id_sesion] = (
+                campos.get("formPublica:nomIntervParte", ""),
+                campos.get("formPublica:camaraPartes", "10"),
+            )
+            return self._redirigir(
+                "/scw/consultaListaRelacionados.seam?cid=1",
+                {"Set-Cookie": f"JSESSIONID={id_sesion}; Path=/scw; HttpOnly"}
+            )
+
+        _, consulta = self._sesion()
+        if consulta is None:
+            return self._redirigir("/scw/home.seam")
+
+        vista = campos.get("javax.faces.ViewState", "lista:0")
+        tipo, _, posicion = vista.partition(":")
+
+        if ruta == "/scw/consultaListaRelacionados.seam" and tipo == "lista":
+            pagina = int(posicion or 0)
+            if ID_SIGUIENTE in campos:
+                return self._responder(self._pagina_resultados(consulta, min(pagina + 1, self.server.paginas - 1)))
+            for fila in range(self.server.por_pagina):
+                if f"{ID_FORMULARIO_LISTA}:j_idt119:{fila}:j_idt228" in campos:
+                    return self._responder(self._pagina_detalle(consulta, pagina, fila))
+            return self._responder(self._pagina_resultados(consulta, pagina))
+
+        if ruta == "/scw/expediente.seam" and tipo == "detalle":
+            pagina = int(posicion.split(".")[0] or 0)
+            return self._responder(self._pagina_resultados(consulta, pagina))
+
+        return self._responder("<html><body>Vista expirada</body></html>", estado=500)
+
+    # Páginas
+
+    def _pagina_inicio(self):
+        opciones = "\n".join(
+            f'<option value="{valor}">{escape(nombre)}</option>' for valor, nombre in JURISDICCIONES.items()
+        )
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"/><title>Consulta pública de expedientes</title></head>
+<body>
+<form id="formPublica" name="formPublica" method="post" action="/scw/home.seam">
+    <table><tr>
+        <td id="formPublica:porExpediente:header:inactive">Por expediente</td>
+        <td id="formPublica:porParte:header:inactive" onclick="document.getElementById('porParte').style.display='block';">Por parte</td>
+    </tr></table>
+    <div id="porParte">
+        <select id="formPublica:camaraPartes" name="formPublica:camaraPartes">
+{opciones}
+        </select>
+        <input type="text" id="formPublica:nomIntervParte" name="formPublica:nomIntervParte"/>
+        <input type="submit" id="formPublica:buscarPorParteButton" name="formPublica:buscarPorParteButton" value="Consultar"/>
+    </div>
+</form>
+</body></html>"""
+
+    def _pagina_resultados(self, consulta, pagina):
+        termino, jurisdiccion = consulta
+        servidor = self.server
+        inicio = pagina * servidor.por_pagina
+        fin = min(inicio + servidor.por_pagina, servidor.datos.cantidad)
+
+        filas = []
+        for fila, indice in enumerate(range(inicio, fin)):
+            datos = servidor.datos.expediente(indice, termino, jurisdiccion)
+            ultima = datos["registros_tabla"][-1]["fecha"].replace("Fecha: ", "") if datos["registros_tabla"] else ""
+            enlace = _enlace_jsf(
+                ID_FORMULARIO_LISTA, f"{ID_FORMULARIO_LISTA}:j_idt119:{fila}:j_idt228",
+                '<i class="fa fa-eye"></i>', clase="btn btn-link"
+            )
+            filas.append(
+                f"<tr><td>{escape(datos['expediente'])}</td><td>{escape(datos['dependencia'])}</td>"
+                f"<td>{escape(datos['caratula'])}</td><td>{escape(datos['situacion_actual'])}</td>"
+                f"<td>{ultima}</td><td>{enlace}</td></tr>"
+            )
+
+        siguiente = ""
+        if pagina + 1 < servidor.paginas:
+            siguiente = _enlace_jsf(ID_FORMULARIO_LISTA, ID_SIGUIENTE, "Siguiente &raquo;")
+
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"/><title>Resultados</title>{_SCRIPT_JSF}</head>
+<body>
+<form id="{ID_FORMULARIO_LISTA}" name="{ID_FORMULARIO_LISTA}" method="post" action="/scw/consultaListaRelacionados.seam">
+    <input type="hidden" name="{ID_FORMULARIO_LISTA}" value="{ID_FORMULARIO_LISTA}"/>
+    <table class="table table-striped">
+        <thead><tr><th>Expediente</th><th>Dependencia</th><th>Carátula</th><th>Situación</th><th>Últ. act.</th><th></th></tr></thead>
+        <tbody>
+{chr(10).join(filas)}
+        </tbody>
+    </table>
+    <div class="paginacion">Página {pagina + 1} de {servidor.paginas} {siguiente}</div>
+    <input type="hidden" name="javax.faces.ViewState" value="lista:{pagina}"/>
+</form>
+</body></html>"""
+
+    def _pagina_detalle(self, consulta, pagina, fila):
+        termino, jurisdiccion = consulta
+        indice = pagina * self.server.por_pagina + fila
+        datos = self.server.datos.expediente(indice, termino, jurisdiccion)
+
+        movimientos = "\n".join(
+            f'<tr class="rf-dt-r"><td class="rf-dt-c"></td><td class="rf-dt-c"></td>'
+            f'<td class="rf-dt-c"><span>{escape(registro["fecha"])}</span></td>'
+            f'<td class="rf-dt-c"><span>{escape(registro["tipo"])}</span></td>'
+            f'<td class="rf-dt-c"><span>{escape(registro["detalle"])}</span></td></tr>'
+            for registro in datos["registros_tabla"]
+        )
+        tabla_movimientos = ""
+        if datos["registros_tabla"]:
+            tabla_movimientos = f"""<table id="expediente:action-table" class="table rf-dt">
+        <thead><tr><th></th><th>Oficina</th><th>Fecha</th><th>Tipo</th><th>Descripción</th></tr></thead>
+        <tbody>
+{movimientos}
+        </tbody>
+    </table>"""
+
+        participantes = "\n".join(
+            f'<tr class="rf-dt-r"><td class="rf-dt-c">{tipo}</td><td class="rf-dt-c">{escape(nombre)}</td></tr>'
+            for tipo, nombres in (("ACTOR", datos["actores"]), ("DEMANDADO", datos["demandados"]))
+            for nombre in nombres
+        )
+        volver = _enlace_jsf("expediente", ID_VOLVER, "Volver", clase="btn btn-default")
+
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"/><title>Expediente</title>{_SCRIPT_JSF}</head>
+<body>
+<form id="expediente" name="expediente" method="post" action="/scw/expediente.seam">
+    <input type="hidden" name="expediente" value="expediente"/>
+    <div class="row"><div class="col-xs-2"><label>Expediente:</label></div>
+        <div class="col-xs-10"><span>{escape(datos['expediente'])}</span></div></div>
+    <div id="expediente:j_idt90">
+        <span id="expediente:j_idt90:detailCamera">{escape(datos['jurisdiccion'])}</span>
+        <span id="expediente:j_idt90:detailDependencia">{escape(datos['dependencia'])}</span>
+        <span id="expediente:j_idt90:detailSituation">{escape(datos['situacion_actual'])}</span>
+        <span id="expediente:j_idt90:detailCover">{escape(datos['caratula'])}</span>
+    </div>
+    <ul class="nav nav-tabs">
+        <li><span>Actuaciones</span></li>
+        <li><span onclick="document.getElementById('intervinientes').style.display='block';">Intervinientes</span></li>
+    </ul>
+    {tabla_movimientos}
+    <div id="intervinientes" style="display:none">
+        <table id="expediente:participantsTable" class="table rf-dt">
+            <thead><tr><th>Tipo</th><th>Nombre</th></tr></thead>
+            <tbody>
+{participantes}
+            </tbody>
+        </table>
+    </div>
+    {volver}
+    <input type="hidden" name="javax.faces.ViewState" value="detalle:{pagina}.{fila}"/>
+</form>
+</body></html>"""
+
+def main():
+    """
+    Levanta el sitio simulado en primer plano.
+
+    Uso: python sitio_simulado.py [--puerto 8080] [--expedientes 500] [--por-pagina 10]
+    """
+    parser = argparse.ArgumentParser(description="Sitio local que simula la consulta pública del PJN")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--expedientes", type=int, default=200)
+    parser.add_argument("--por-pagina", type=int, default=10)
+    parser.add_argument("--movimientos", type=int, default=30, help="Movimientos promedio por expediente")
+    parser.add_argument("--participantes", type=int, default=4)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Demora por respuesta en segundos")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+
+    datos = DatosSinteticos(args.expedientes, args.movimientos, args.participantes, args.semilla)
+    servidor = SitioSimulado(("127.0.0.1", args.puerto), datos, args.por_pagina, args.latencia)
+    print(f"Sitio simulado en {servidor.url} ({args.expedientes} expedientes, {servidor.paginas} páginas)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import time
+import threading
+from urllib.parse import urlparse
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from navegador import cerrar_driver
+from scraper import MOTOR_SCRIPT, avanzar_paginas, procesar_pagina, setup_driver
+
+# Atributos de cookie aceptados por 'add_cookie'
+ATRIBUTOS_COOKIE = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+# Veces que un trabajador recrea su navegador para reintentar una página antes de abandonarla
+REINTENTOS_TRABAJADOR = 2
+
+class ErrorDeSesion(Exception):
+    """Excepción para sesiones que no pudieron clonarse en un trabajador."""
+    pass
+
+class EstadisticasTrabajador:
+    """
+    Contadores de un trabajador del pool.
+    """
+
+    def __init__(self, indice):
+        self.indice = indice
+        self.paginas = 0
+        self.expedientes = 0
+        self.errores = []
+        self.abandonada = None
+        self.inicio = None
+        self.fin = None
+
+    @property
+    def duracion(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fin or time.perf_counter()) - self.inicio
+
+    @property
+    def expedientes_por_segundo(self):
+        return self.expedientes / self.duracion if self.duracion else 0.0
+
+def obtener_view_state(driver):
+    """
+    Obtiene el valor de 'javax.faces.ViewState' de la página actual.
+
+    Args:
+        driver: Instancia del webdriver
+
+    Returns:
+        str: Valor del ViewState o None si la página no lo tiene
+    """
+    return driver.execute_script(
+        "const campo = document.querySelector(\"input[name='javax.faces.ViewState']\");"
+        "return campo ? campo.value : null;"
+    )
+
+def restaurar_sesion(destino, url, cookies):
+    """
+    Abre en 'destino' una página de resultados con las cookies de una sesión.
+
+    Args:
+        destino: Driver en el que se restaura la sesión
+        url (str): URL de la página de resultados
+        cookies (list): Cookies de la sesión, como las devuelve 'get_cookies'
+
+    Raises:
+        ErrorDeSesion: Si el driver no llega a la tabla de resultados
+    """
+    partes = urlparse(url)
+
+    # Selenium solo permite agregar cookies del dominio que está abierto
+    destino.get(f"{partes.scheme}://{partes.netloc}/favicon.ico")
+    destino.delete_all_cookies()
+    for cookie in cookies:
+        destino.add_cookie({clave: valor for clave, valor in cookie.items() if clave in ATRIBUTOS_COOKIE})
+
+    destino.get(url)
+    try:
+        WebDriverWait(destino, 10).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "table-striped"))
+        )
+    except Exception:
+        raise ErrorDeSesion(f"No se pudo abrir la página de resultados {url}")
+
+def clonar_sesion(origen, destino):
+    """
+    Replica en 'destino' la sesión de 'origen' (con el CAPTCHA ya resuelto).
+
+    Copia las cookies de sesión, abre la misma página de resultados y reemplaza
+    el 'javax.faces.ViewState' recibido por el de 'origen', de modo que los
+    postbacks del trabajador partan de la misma vista JSF del servidor.
+
+    Args:
+        origen: Driver que resolvió el CAPTCHA y muestra los resultados
+        destino: Driver del trabajador
+
+    Raises:
+        ErrorDeSesion: Si el trabajador no llega a la tabla de resultados
+    """
+    restaurar_sesion(destino, origen.current_url, origen.get_cookies())
+
+    view_state = obtener_view_state(origen)
+    if view_state:
+        destino.execute_script(
+            "document.querySelectorAll(\"input[name='javax.faces.ViewState']\")"
+            ".forEach((campo) => { campo.value = arguments[0]; });",
+            view_state
+        )
+
+def _recrear_driver(driver, principal, sesion, crear_driver):
+    """
+    Reemplaza el driver de un trabajador por uno nuevo con la sesión guardada.
+
+    El driver principal no se cierra aquí: lo cierra quien inició la corrida.
+
+    Returns:
+        WebDriver: Driver nuevo en la primera página de resultados
+    """
+    if driver is not principal:
+        try:
+            cerrar_driver(driver)
+        except Exception:
+            pass
+    nuevo = crear_driver()
+    try:
+        restaurar_sesion(nuevo, *sesion)
+    except Exception:
+        cerrar_driver(nuevo)
+        raise
+    return nuevo
+
+def _trabajar(drivers, principal, estadisticas, total_trabajadores, motor, progreso, sesion, crear_driver,
+              desde=0, reintentos=REINTENTOS_TRABAJADOR):
+    """
+    Procesa las páginas que le corresponden a un trabajador.
+
+    El trabajador i procesa las páginas desde + i, desde + i + N, ... (con N
+    trabajadores). Si una página falla, el trabajador recrea su navegador con
+    la sesión guardada y la reintenta; agotados los reintentos, registra la
+    página como fallida y abandona las siguientes, que quedan pendientes para
+    una reanudación.
+
+    'principal' es el driver con el que se inició la corrida: el trabajador 0
+    lo reemplaza si falla, pero nunca lo cierra; sus reemplazos sí se cierran.
+    """
+    estadisticas.inicio = time.perf_counter()
+    driver = drivers[estadisticas.indice]
+    actual = 0
+    pagina = desde + estadisticas.indice
+    intentos = 0
+    try:
+        while True:
+            try:
+                if not avanzar_paginas(driver, pagina - actual):
+                    break
+                actual = pagina
+                estadisticas.expedientes += procesar_pagina(driver, motor, progreso, pagina)
+                estadisticas.paginas += 1
+                if progreso:
+                    progreso.registrar_pagina_completa(pagina)
+                pagina += total_trabajadores
+                intentos = 0
+                continue
+            except Exception as e:
+                motivo = f"{type(e).__name__}: {e}"
+                estadisticas.errores.append(motivo)
+                print(f"Trabajador {estadisticas.indice}: error en la página {pagina + 1}: {motivo}")
+
+            intentos += 1
+            if intentos <= reintentos:
+                try:
+                    driver = drivers[estadisticas.indice] = _recrear_driver(driver, principal, sesion, crear_driver)
+                    actual = 0
+                    continue
+                except Exception as e:
+                    motivo = f"no se pudo recrear el navegador: {type(e).__name__}: {e}"
+                    estadisticas.errores.append(motivo)
+
+            estadisticas.abandonada = pagina
+            motivo = (
+                f"Trabajador {estadisticas.indice}: se abandonan las páginas {pagina + 1}, "
+                f"{pagina + 1 + total_trabajadores}, ... tras {intentos} errores ({motivo})"
+            )
+            print(motivo)
+            if progreso:
+                progreso.registrar_fallo(motivo, pagina)
+            break
+    finally:
+        estadisticas.fin = time.perf_counter()
+
+def imprimir_resumen(estadisticas):
+    """
+    Muestra las estadísticas de cada trabajador y el total del pool.
+
+    Args:
+        estadisticas (list): Lista de EstadisticasTrabajador
+    """
+    for est in estadisticas:
+        print(
+            f"Trabajador {est.indice}: {est.expedientes} expedientes en {est.paginas} páginas, "
+            f"{est.duracion:.1f} s ({est.expedientes_por_segundo:.2f} exp/s), {len(est.errores)} errores"
+            + (f", páginas abandonadas desde la {est.abandonada + 1}" if est.abandonada is not None else "")
+        )
+
+    total = sum(est.expedientes for est in estadisticas)
+    duracion = max((est.duracion for est in estadisticas), default=0.0)
+    tasa = total / duracion if duracion else 0.0
+    print(f"Total: {total} expedientes en {duracion:.1f} s ({tasa:.2f} exp/s)")
+
+def ejecutar_pool(driver_principal, cantidad, motor=MOTOR_SCRIPT, crear_driver=setup_driver, progreso=None,
+                  reintentos=REINTENTOS_TRABAJADOR):
+    """
+    Reparte las páginas de resultados entre varios navegadores que comparten la sesión.
+
+    El driver principal ya debe mostrar la primera página de resultados (con el
+    CAPTCHA resuelto). Se crean 'cantidad - 1' drivers adicionales que clonan su
+    sesión; el driver principal actúa como el trabajador 0. Todos escriben en la
+    misma salida JSONL, que es segura entre hilos.
+
+    Args:
+        driver_principal: Driver con la búsqueda ya realizada
+        cantidad (int): Cantidad total de trabajadores
+        motor (str): Estrategia de extracción de la vista de detalle
+        crear_driver (callable): Fábrica de drivers adicionales
+        progreso (ProgresoDeCorrida): Avance persistente de la corrida; si se indica,
+            se retoma desde la primera página sin terminar, se omiten los expedientes
+            ya extraídos y la corrida se completa si ningún trabajador abandonó páginas
+        reintentos (int): Veces que un trabajador recrea su navegador para reintentar una página
+
+    Returns:
+        list: EstadisticasTrabajador de cada trabajador
+    """
+    desde = progreso.pagina if progreso else 0
+    if desde:
+        print(f"Retomando en la página {desde + 1} ({progreso.total_extraidos} expedientes ya extraídos)")
+
+    # Sesión con la que los trabajadores recrean su navegador tras un error
+    sesion = (driver_principal.current_url, driver_principal.get_cookies())
+    drivers = [driver_principal]
+    try:
+        # Los drivers se crean y clonan antes de que el principal avance de página
+        for _ in range(cantidad - 1):
+            driver = crear_driver()
+            drivers.append(driver)
+            clonar_sesion(driver_principal, driver)
+
+        estadisticas = [EstadisticasTrabajador(indice) for indice in range(len(drivers))]
+        hilos = [
+            threading.Thread(
+                target=_trabajar,
+                args=(drivers, driver_principal, est, len(drivers), motor, progreso, sesion, crear_driver, desde, reintentos),
+                name=f"trabajador-{est.indice}"
+            )
+            for est in estadisticas
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        imprimir_resumen(estadisticas)
+        if progreso and all(est.abandonada is None for est in estadisticas):
+            progreso.completar()
+        return estadisticas
+    finally:
+        for driver in drivers:
+            if driver is not driver_principal:
+                try:
+                    cerrar_driver(driver)
+                except Exception:
+                    # Un driver cuyo reemplazo falló ya fue cerrado por su trabajador
+                    pass
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(RAIZ, "src", "fixtures")
+
+# Los módulos se importan como desde src/ (por ejemplo, 'from guardarDb import ...')
+sys.path.insert(0, os.path.join(RAIZ, "src"))
+
+from extraccion import parsear_detalle, parsear_intervinientes  # noqa: E402
+
+@pytest.fixture(scope="session")
+def html_expediente():
+    """HTML guardado de la vista de detalle de un expediente."""
+    with open(os.path.join(FIXTURES, "expediente.html"), encoding="utf-8") as archivo:
+        return archivo.read()
+
+@pytest.fixture
+def caso(html_expediente):
+    """Expediente del fixture tal como lo escribe el scraper."""
+    datos = parsear_detalle(html_expediente)
+    datos["actores"], datos["demandados"] = parsear_intervinientes(html_expediente)
+    return datos
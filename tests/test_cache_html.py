@@ -0,0 +1,59 @@
+from cache_html import CacheHTML, reextraer
+from salida import leer_registros, ruta_derivada
+
+def test_guardar_visita_deduplica_objetos(tmp_path, html_expediente):
+    cache = CacheHTML(str(tmp_path / "cache"))
+    try:
+        primera = cache.guardar_visita(html_expediente, expediente="COM 012345/2019", motor="html")
+        segunda = cache.guardar_visita(html_expediente, expediente="COM 012345/2019", motor="html")
+
+        assert [captura[0] for captura in cache.capturas("COM 012345/2019")] == [segunda, primera]
+        estadisticas = cache.estadisticas()
+        assert estadisticas["objetos"] == 1
+        assert estadisticas["capturas"] == 2
+        assert estadisticas["bytes_comprimidos"] < estadisticas["bytes"]
+        assert cache.leer(cache.capturas("COM 012345/2019")[0][2]) == html_expediente
+    finally:
+        cache.cerrar()
+
+def test_limite_desaloja_los_objetos_mas_viejos(tmp_path, html_expediente):
+    cache = CacheHTML(str(tmp_path / "cache"), limite_bytes=1)
+    try:
+        cache.guardar_visita(html_expediente, expediente="A")
+        cache.guardar_visita(html_expediente.replace("EN LETRA", "ARCHIVADO"), expediente="B")
+
+        assert cache.capturas("A") == []
+        assert len(cache.capturas("B")) == 1
+    finally:
+        cache.cerrar()
+
+def test_reextraer(tmp_path, html_expediente, caso):
+    directorio = str(tmp_path / "cache")
+    cache = CacheHTML(directorio)
+    try:
+        cache.guardar_visita(html_expediente, expediente="COM 012345/2019")
+        # Solo se re-extrae la última captura de cada expediente
+        cache.guardar_visita(html_expediente, html_expediente, expediente="COM 012345/2019")
+        cache.guardar_visita("<html><body>Error 500</body></html>")
+    finally:
+        cache.cerrar()
+    destino = str(tmp_path / "reextraidos.jsonl")
+
+    assert reextraer(directorio, destino, procesos=1) == (1, 1)
+    assert list(leer_registros(destino)) == [caso]
+    rechazos = list(leer_registros(ruta_derivada(destino, "rechazados")))
+    assert len(rechazos) == 1
+    assert rechazos[0]["motivo"].startswith("ErrorDeExtraccion")
+
+def test_reextraer_todas(tmp_path, html_expediente, caso):
+    directorio = str(tmp_path / "cache")
+    cache = CacheHTML(directorio)
+    try:
+        for _ in range(3):
+            cache.guardar_visita(html_expediente, expediente="COM 012345/2019")
+    finally:
+        cache.cerrar()
+    destino = str(tmp_path / "reextraidos.jsonl")
+
+    assert reextraer(directorio, destino, procesos=1, todas=True) == (3, 0)
+    assert list(leer_registros(destino)) == [caso] * 3
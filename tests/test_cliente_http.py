@@ -0,0 +1,38 @@
+import cliente_http
+import navegador
+from cliente_http import ClienteJSF
+
+class DriverSimulado:
+    """Driver con la sesión mínima que usa ClienteJSF.para_driver."""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.cerrado = False
+
+    def execute_script(self, script):
+        return "Mozilla/5.0"
+
+    def get_cookies(self):
+        return [{"name": "JSESSIONID", "value": self.session_id, "domain": "scw.pjn.gov.ar", "path": "/scw"}]
+
+    def quit(self):
+        self.cerrado = True
+
+def test_cerrar_driver_libera_su_cliente():
+    driver, otro = DriverSimulado("a"), DriverSimulado("b")
+    cliente = ClienteJSF.para_driver(driver)
+    ClienteJSF.para_driver(otro)
+    assert ClienteJSF.para_driver(driver) is cliente
+    assert cliente.sesion.cookies.get("JSESSIONID") == "a"
+
+    navegador.cerrar_driver(driver)
+
+    assert driver.cerrado
+    assert "a" not in cliente_http._clientes
+    assert "b" in cliente_http._clientes
+    navegador.cerrar_driver(otro)
+    assert "b" not in cliente_http._clientes
+
+def test_liberar_driver_sin_cliente():
+    cliente_http.liberar_cliente(DriverSimulado("sin cliente"))
+    cliente_http.liberar_cliente(object())
@@ -0,0 +1,87 @@
+import copy
+import datetime
+from collections import Counter
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+import columnar  # noqa: E402
+from salida import EscritorJSONL  # noqa: E402
+
+@pytest.fixture
+def archivo_de_casos(tmp_path, caso):
+    """
+    JSONL con el expediente del fixture y una copia con valores nuevos.
+
+    La copia agrega una jurisdicción y un tipo de movimiento que no estaban en
+    los primeros grupos, de modo que los diccionarios crecen entre grupos.
+    """
+    segundo = copy.deepcopy(caso)
+    segundo["expediente"] = "COM 054321/2020"
+    segundo["jurisdiccion"] = "Cámara Nacional de Apelaciones en lo Civil"
+    segundo["registros_tabla"][-1]["tipo"] = "Sentencia definitiva"
+    segundo["registros_tabla"][0]["fecha"] = "sin fecha"
+
+    ruta = tmp_path / "expedientes.jsonl"
+    escritor = EscritorJSONL(str(ruta), fsync_segundos=None)
+    for expediente in (caso, segundo):
+        escritor.escribir(expediente)
+    escritor.cerrar()
+    return str(ruta), [caso, segundo]
+
+@pytest.mark.parametrize("formato", sorted(columnar.FORMATOS))
+def test_exportar_y_leer_el_fixture(tmp_path, archivo_de_casos, formato):
+    ruta, casos = archivo_de_casos
+    destino = str(tmp_path / formato)
+
+    filas = columnar.exportar_desde_archivo(ruta, destino, formato, filas_por_grupo=16)
+
+    movimientos_esperados = sum(len(c["registros_tabla"]) for c in casos)
+    participantes_esperados = sum(len(c["actores"]) + len(c["demandados"]) for c in casos)
+    assert filas == {
+        "expedientes": 2,
+        "movimientos": movimientos_esperados,
+        "participantes": participantes_esperados,
+    }
+
+    expedientes = columnar.leer_tabla(destino, "expedientes")
+    assert pa.types.is_dictionary(expedientes.schema.field("jurisdiccion").type)
+    assert expedientes.column("expediente").to_pylist() == [c["expediente"] for c in casos]
+    assert expedientes.column("jurisdiccion").to_pylist() == [c["jurisdiccion"] for c in casos]
+    assert expedientes.column("caratula").to_pylist() == [c["caratula"] for c in casos]
+
+    movimientos = columnar.leer_tabla(destino, "movimientos")
+    esperados = [
+        (indice, registro["tipo"], registro["detalle"])
+        for indice, c in enumerate(casos, start=1)
+        for registro in c["registros_tabla"]
+    ]
+    obtenidos = list(zip(
+        movimientos.column("expediente_id").to_pylist(),
+        movimientos.column("tipo").to_pylist(),
+        movimientos.column("detalle").to_pylist(),
+    ))
+    assert obtenidos == esperados
+
+    fechas = movimientos.column("fecha").to_pylist()
+    assert fechas[0] == datetime.date(2021, 3, 11)
+    assert fechas[len(casos[0]["registros_tabla"])] is None
+
+def test_contar_por_usa_los_valores_del_diccionario(tmp_path, archivo_de_casos):
+    ruta, casos = archivo_de_casos
+    destino = str(tmp_path / "arrow")
+    columnar.exportar_desde_archivo(ruta, destino, "arrow", filas_por_grupo=16)
+
+    esperado = Counter(r["tipo"] for c in casos for r in c["registros_tabla"])
+    assert dict(columnar.contar_por(destino, "movimientos", "tipo", limite=100)) == dict(esperado)
+
+    participantes = dict(columnar.contar_por(destino, "participantes", "tipo"))
+    assert participantes == {
+        "ACTOR": sum(len(c["actores"]) for c in casos),
+        "DEMANDADO": sum(len(c["demandados"]) for c in casos),
+    }
+
+def test_leer_tabla_inexistente(tmp_path):
+    with pytest.raises(columnar.ErrorColumnar):
+        columnar.leer_tabla(str(tmp_path), "expedientes")
@@ -0,0 +1,78 @@
+import re
+
+import pytest
+from mysql.connector import Error, errorcode
+
+import esquema
+
+class CursorSimulado:
+    """
+    Cursor que lleva las columnas de cada tabla y responde las consultas a
+    information_schema.COLUMNS. Con 'interrumpir', la primera sentencia que
+    contiene ese texto falla como si la conexión se hubiera cortado.
+    """
+
+    def __init__(self, columnas, interrumpir=None):
+        self.columnas = columnas
+        self.interrumpir = interrumpir
+        self.agregadas = []
+        self._resultado = None
+
+    def execute(self, sentencia, parametros=()):
+        if self.interrumpir and self.interrumpir in sentencia:
+            self.interrumpir = None
+            raise Error(msg="Lost connection to MySQL server during query", errno=errorcode.CR_SERVER_LOST)
+        if "information_schema.COLUMNS" in sentencia:
+            tabla, columna = parametros
+            self._resultado = (int(columna in self.columnas[tabla]),)
+            return
+        alter = re.match(r"ALTER TABLE (\w+) (.*)", sentencia)
+        if alter:
+            tabla, cambios = alter.groups()
+            for columna in re.findall(r"ADD COLUMN (\w+)", cambios):
+                if columna in self.columnas[tabla]:
+                    raise Error(msg=f"Duplicate column name '{columna}'", errno=errorcode.ER_DUP_FIELDNAME)
+                self.columnas[tabla].add(columna)
+                self.agregadas.append((tabla, columna))
+            for columna in re.findall(r"DROP COLUMN (\w+)", cambios):
+                self.columnas[tabla].remove(columna)
+
+    def fetchone(self):
+        return self._resultado
+
+def estructura_original():
+    return {
+        "expedientes": {"id", "expediente", "jurisdiccion", "dependencia", "situacion_actual", "caratula"},
+        "movimientos": {"id", "expediente_id", "fecha", "tipo", "detalle"},
+        "participantes": {"id", "expediente_id", "tipo", "nombre"},
+    }
+
+def estructura_normalizada():
+    return {
+        "expedientes": {"id", "expediente", "jurisdiccion_id", "dependencia_id", "situacion_actual", "caratula"},
+        "movimientos": {"id", "expediente_id", "fecha", "tipo_id", "detalle"},
+        "participantes": {"id", "expediente_id", "tipo_id", "nombre"},
+    }
+
+@pytest.mark.parametrize("interrumpir", [
+    "UPDATE expedientes",
+    "DROP COLUMN dependencia",
+    "UPDATE movimientos",
+    "UPDATE participantes",
+])
+def test_normalizar_columnas_se_puede_repetir(interrumpir):
+    cursor = CursorSimulado(estructura_original(), interrumpir)
+    with pytest.raises(Error):
+        esquema._normalizar_columnas_de_texto(cursor)
+
+    esquema._normalizar_columnas_de_texto(cursor)
+
+    assert cursor.columnas == estructura_normalizada()
+    assert len(cursor.agregadas) == len(set(cursor.agregadas)) == 4
+
+def test_normalizar_columnas_de_una_base_nueva():
+    cursor = CursorSimulado(estructura_normalizada())
+
+    esquema._normalizar_columnas_de_texto(cursor)
+
+    assert cursor.agregadas == []
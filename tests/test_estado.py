@@ -0,0 +1,179 @@
+import sqlite3
+
+import pytest
+
+from estado import (
+    TRABAJO_COMPLETADO,
+    TRABAJO_PENDIENTE,
+    Deduplicador,
+    EstadoDeRastreo,
+    PoliticaDeRefresco,
+    fecha_iso,
+    normalizar_expediente,
+)
+
+@pytest.fixture
+def estado(tmp_path):
+    estado = EstadoDeRastreo(str(tmp_path / "rastreo.db"))
+    yield estado
+    estado.cerrar()
+
+def test_normalizar_expediente():
+    assert normalizar_expediente("  COM   012345/2019 ") == "COM 012345/2019"
+    assert normalizar_expediente(None) == ""
+
+def test_reanudar_corrida(tmp_path):
+    ruta = str(tmp_path / "rastreo.db")
+    estado = EstadoDeRastreo(ruta)
+    progreso = estado.iniciar_corrida("residuos", "10")
+    progreso.registrar_expediente("COM 1/2020", 0)
+    progreso.registrar_pagina_completa(0)
+    progreso.registrar_expediente(" COM  2/2020", 3)
+    estado.cerrar()
+
+    estado = EstadoDeRastreo(ruta)
+    try:
+        retomado = estado.iniciar_corrida("residuos", "10")
+        assert retomado.corrida_id == progreso.corrida_id
+        assert (retomado.pagina, retomado.fila) == (1, 3)
+        assert retomado.total_extraidos == 2
+        assert retomado.ya_extraido("COM 2/2020")
+        assert not retomado.reclamar("COM 1/2020")
+
+        retomado.completar()
+        assert estado.iniciar_corrida("residuos", "10").corrida_id != progreso.corrida_id
+    finally:
+        estado.cerrar()
+
+def test_paginas_terminadas_fuera_de_orden(estado):
+    progreso = estado.iniciar_corrida("residuos", "10")
+    progreso.registrar_expediente("COM 1/2020", 4, pagina=1)
+    progreso.registrar_pagina_completa(2)
+    progreso.registrar_pagina_completa(1)
+
+    # La página 0 sigue pendiente: la reanudación empieza en ella y no en la fila de la página 1
+    assert (progreso.pagina, progreso.fila) == (0, 0)
+    assert estado.iniciar_corrida("residuos", "10").pagina == 0
+
+    progreso.registrar_pagina_completa(0)
+    assert progreso.pagina == 3
+    assert (estado.iniciar_corrida("residuos", "10").pagina, progreso.fila) == (3, 0)
+
+def test_registrar_fallos(estado):
+    progreso = estado.iniciar_corrida("residuos", "10")
+    progreso.registrar_fallo("TimeoutException", pagina=2)
+    progreso.registrar_fallo("ErrorDeExtraccion", fila=5, expediente=" COM  3/2020 ")
+
+    assert estado.fallos_de_corrida(progreso.corrida_id) == [
+        (2, None, None, "TimeoutException"),
+        (0, 5, "COM 3/2020", "ErrorDeExtraccion"),
+    ]
+
+def test_corridas_de_trabajos_separadas(estado):
+    suelta = estado.iniciar_corrida("residuos", "10")
+    de_trabajo = estado.iniciar_corrida("residuos", "10", trabajo_id=1)
+    de_otro_trabajo = estado.iniciar_corrida("residuos", "10", trabajo_id=2)
+
+    assert len({suelta.corrida_id, de_trabajo.corrida_id, de_otro_trabajo.corrida_id}) == 3
+    assert estado.iniciar_corrida("residuos", "10", trabajo_id=1).corrida_id == de_trabajo.corrida_id
+    assert estado.iniciar_corrida("residuos", "10").corrida_id == suelta.corrida_id
+
+def test_migrar_base_sin_trabajo_id(tmp_path):
+    ruta = str(tmp_path / "rastreo.db")
+    conexion = sqlite3.connect(ruta)
+    conexion.executescript(
+        "CREATE TABLE corridas (id INTEGER PRIMARY KEY, termino TEXT NOT NULL, jurisdiccion TEXT NOT NULL, "
+        "pagina INTEGER NOT NULL DEFAULT 0, fila INTEGER NOT NULL DEFAULT 0, "
+        "completada INTEGER NOT NULL DEFAULT 0, iniciada_en TEXT, actualizada_en TEXT);"
+        "INSERT INTO corridas (termino, jurisdiccion, pagina) VALUES ('residuos', '10', 7);"
+    )
+    conexion.commit()
+    conexion.close()
+
+    estado = EstadoDeRastreo(ruta)
+    try:
+        assert estado.iniciar_corrida("residuos", "10").pagina == 7
+    finally:
+        estado.cerrar()
+
+def test_deduplicador():
+    deduplicador = Deduplicador(["A"])
+
+    assert not deduplicador.reclamar("A")
+    assert deduplicador.reclamar("B")
+    assert not deduplicador.reclamar("B")
+    deduplicador.liberar("B")
+    assert deduplicador.reclamar("B")
+    assert (len(deduplicador), deduplicador.omitidos) == (2, 2)
+
+def test_campana_reparte_trabajos_por_prioridad(estado):
+    campana = estado.crear_campana("residuos")
+    assert estado.crear_campana("residuos") == campana
+    assert estado.agregar_trabajos(campana, [("residuos", "10", 0), ("residuos", "7", 5)]) == 2
+    assert estado.agregar_trabajos(campana, [("residuos", "10", 0)]) == 0
+
+    trabajo_id, termino, jurisdiccion, _, intentos = estado.tomar_trabajo(campana, ahora=100)
+    assert (termino, jurisdiccion, intentos) == ("residuos", "7", 1)
+
+    # Un trabajo postergado no se entrega antes de su disponibilidad
+    estado.finalizar_trabajo(trabajo_id, TRABAJO_PENDIENTE, disponible_desde=200)
+    otro = estado.tomar_trabajo(campana, ahora=100)
+    assert otro[2] == "10"
+    assert estado.tomar_trabajo(campana, ahora=100) is None
+    assert estado.proxima_disponibilidad(campana) == 200
+
+    progreso = estado.iniciar_corrida("residuos", "10", trabajo_id=otro[0])
+    estado.asignar_corrida(otro[0], progreso.corrida_id)
+    progreso.registrar_expediente("COM 1/2020", 0)
+    estado.finalizar_trabajo(otro[0], TRABAJO_COMPLETADO, expedientes=1)
+
+    assert estado.expedientes_de_campana(campana) == {"COM 1/2020"}
+    assert estado.resumen_campana(campana) == {
+        TRABAJO_PENDIENTE: {"trabajos": 1, "expedientes": 0},
+        TRABAJO_COMPLETADO: {"trabajos": 1, "expedientes": 1},
+    }
+
+def test_reiniciar_trabajos_en_curso(estado):
+    campana = estado.crear_campana("residuos")
+    estado.agregar_trabajos(campana, [("residuos", "10", 0)])
+    estado.tomar_trabajo(campana, ahora=0)
+    assert estado.tomar_trabajo(campana, ahora=0) is None
+
+    estado.reiniciar_trabajos_en_curso(campana)
+
+    assert estado.tomar_trabajo(campana, ahora=0)[4] == 2
+
+def test_fecha_iso():
+    assert fecha_iso("Fecha: 11/03/2021") == "2021-03-11"
+    assert fecha_iso("sin fecha") is None
+    assert fecha_iso(None) is None
+
+def test_politica_de_refresco(estado):
+    politica = PoliticaDeRefresco(estado, ttl=3600)
+    estado.registrar_verificacion("COM 1/2020", "EN LETRA", "2021-03-11", 120, 1000.0)
+
+    assert politica.motivo_de_visita("COM 2/2020", ahora=1000.0) == "nuevo"
+    assert politica.motivo_de_visita("COM  1/2020", "EN LETRA", "11/03/2021", ahora=1000.0) is None
+    assert politica.motivo_de_visita("COM 1/2020", "EN LETRA", "12/03/2021", ahora=1000.0) == "nueva actuación"
+    assert politica.motivo_de_visita("COM 1/2020", "ARCHIVADO", "11/03/2021", ahora=1000.0) == "cambió la situación"
+    assert politica.motivo_de_visita("COM 1/2020", "EN LETRA", "11/03/2021", ahora=5000.0) == "verificación vencida"
+    assert politica.motivos["sin cambios"] == 1
+
+def test_registrar_expediente_con_datos(estado, caso):
+    progreso = estado.iniciar_corrida("residuos", "10")
+    progreso.registrar_expediente(caso["expediente"], 0, datos=caso)
+
+    situacion, ultima_fecha, movimientos, _ = estado.expediente_conocido("COM 012345/2019")
+    fechas = [fecha_iso(registro["fecha"]) for registro in caso["registros_tabla"]]
+    assert (situacion, ultima_fecha, movimientos) == ("EN LETRA", max(filter(None, fechas)), 120)
+
+def test_progreso_omite_sin_cambios(estado, caso):
+    progreso = estado.iniciar_corrida("residuos", "10")
+    assert not progreso.sin_cambios(caso["expediente"], "EN LETRA")
+
+    progreso.registrar_expediente(caso["expediente"], 0, datos=caso)
+    progreso.refresco = PoliticaDeRefresco(estado, ttl=3600)
+
+    assert progreso.sin_cambios(caso["expediente"], "EN LETRA", "11/03/2021")
+    assert not progreso.sin_cambios(caso["expediente"], "ARCHIVADO", "11/03/2021")
+    assert not progreso.sin_cambios("COM 9/2024", "EN LETRA")
@@ -0,0 +1,70 @@
+import pytest
+
+from extraccion import (
+    ErrorDeExtraccion,
+    clasificar_participantes,
+    extraer_detalle_por_script,
+    extraer_intervinientes_por_script,
+    parsear_detalle,
+    parsear_intervinientes,
+)
+
+def test_parsear_detalle(html_expediente):
+    datos = parsear_detalle(html_expediente)
+
+    assert datos["expediente"] == "COM 012345/2019"
+    assert datos["jurisdiccion"] == "Cámara Nacional de Apelaciones en lo Comercial"
+    assert datos["dependencia"] == "JUZGADO COMERCIAL 14 - SECRETARIA N° 27"
+    assert datos["situacion_actual"] == "EN LETRA"
+    assert datos["caratula"] == "RESIDUOS DEL SUR S.A. c/ MUNICIPALIDAD DE ÑANDUBAY s/ ORDINARIO"
+    assert len(datos["registros_tabla"]) == 120
+    assert datos["registros_tabla"][0] == {
+        "fecha": "Fecha: 11/03/2021",
+        "tipo": "Despacho",
+        "detalle": "DESPACHO N° 1 – a despacho del juzgado\nFirmado por: SECRETARÍA 1",
+    }
+
+def test_parsear_intervinientes(html_expediente):
+    actores, demandados = parsear_intervinientes(html_expediente)
+
+    assert actores == ["RESIDUOS DEL SUR S.A.", "GÓMEZ, MARÍA JOSÉ"]
+    assert demandados == ["MUNICIPALIDAD DE ÑANDUBAY", "LIMPIEZA & RECOLECCIÓN S.R.L.", "FISCO NACIONAL"]
+
+def test_parsear_detalle_sin_encabezado():
+    with pytest.raises(ErrorDeExtraccion, match="No se encontraron los campos"):
+        parsear_detalle("<html><body><p>Sesión expirada</p></body></html>")
+
+def test_parsear_intervinientes_sin_tabla():
+    assert parsear_intervinientes("<html><body></body></html>") == ([], [])
+
+def test_clasificar_participantes():
+    participantes = [("Actor", "A"), ("DEMANDADO", "B"), ("Perito", "C"), ("actora", "D")]
+
+    assert clasificar_participantes(participantes) == (["A", "D"], ["B"])
+
+class DriverSimulado:
+    """Devuelve un resultado fijo en cada 'execute_script'."""
+
+    def __init__(self, resultado):
+        self.resultado = resultado
+        self.scripts = 0
+
+    def execute_script(self, script, *argumentos):
+        self.scripts += 1
+        return self.resultado
+
+def test_extraer_detalle_por_script_en_un_viaje(caso):
+    datos = {clave: valor for clave, valor in caso.items() if clave not in ("actores", "demandados")}
+    driver = DriverSimulado(datos)
+
+    assert extraer_detalle_por_script(driver) == datos
+    assert driver.scripts == 1
+
+def test_extraer_detalle_por_script_sin_encabezado():
+    with pytest.raises(ErrorDeExtraccion, match="expediente"):
+        extraer_detalle_por_script(DriverSimulado({"expediente": None, "registros_tabla": []}))
+
+def test_extraer_intervinientes_por_script():
+    driver = DriverSimulado([["ACTOR", "A"], ["DEMANDADO", "B"]])
+
+    assert extraer_intervinientes_por_script(driver) == (["A"], ["B"])
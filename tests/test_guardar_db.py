@@ -0,0 +1,183 @@
+import copy
+from datetime import date
+
+import pytest
+
+from db_simulada import FabricaSimulada
+from guardarDb import (
+    CONFIG_DB,
+    MODO_FILA,
+    MODO_LOTES,
+    MODO_UPSERT,
+    InternadorDeValores,
+    SubidorDeBaseDeDatos,
+    _valor_tsv,
+    agrupar_en_lotes,
+    huella,
+)
+from salida import EscritorJSONL, leer_registros, ruta_derivada
+
+@pytest.fixture
+def fabrica():
+    fabrica = FabricaSimulada()
+    yield fabrica
+    fabrica.base.cerrar_definitivamente()
+
+@pytest.fixture
+def subidor(fabrica):
+    return SubidorDeBaseDeDatos(CONFIG_DB, fabrica_conexion=fabrica)
+
+def escribir(ruta, casos):
+    with EscritorJSONL(str(ruta), fsync_segundos=None) as escritor:
+        for caso in casos:
+            escritor.escribir(caso)
+    return str(ruta)
+
+def copias(caso, cantidad):
+    """Copias del expediente con números distintos y una cantidad distinta de movimientos."""
+    resultado = []
+    for numero in range(cantidad):
+        copia = copy.deepcopy(caso)
+        copia["expediente"] = f"COM {numero:06d}/2020"
+        copia["registros_tabla"] = copia["registros_tabla"][:numero + 1]
+        resultado.append(copia)
+    return resultado
+
+def test_huella():
+    assert huella(1, date(2021, 3, 11), "x") == huella("1", "2021-03-11", "x")
+    assert huella(None, "a") == huella("", "a")
+    assert huella("a", "b") != huella("ab", "")
+
+def test_agrupar_en_lotes():
+    assert list(agrupar_en_lotes(iter(range(7)), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(agrupar_en_lotes([], 3)) == []
+
+def test_valor_tsv():
+    assert _valor_tsv(None) == "\\N"
+    assert _valor_tsv(date(2021, 3, 11)) == "2021-03-11"
+    assert _valor_tsv("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+
+def test_limpiar_fecha(subidor):
+    assert subidor.limpiar_fecha("Fecha: 11/03/2021") == date(2021, 3, 11)
+    assert subidor.limpiar_fecha("11/03/2021") == date(2021, 3, 11)
+    assert subidor.limpiar_fecha("sin fecha") is None
+    assert subidor.limpiar_fecha(None) is None
+
+def test_validar_caso(subidor, caso):
+    assert subidor._validar_caso(caso) is None
+    assert subidor._validar_caso([]) == "El registro no es un objeto"
+    assert "dependencia" in subidor._validar_caso({"expediente": "A", "jurisdiccion": "B"})
+    assert subidor._validar_caso(dict(caso, registros_tabla=[{"fecha": "x"}])) == "Movimientos con formato inválido"
+    assert subidor._validar_caso(dict(caso, actores="A")) == "El campo 'actores' no es una lista"
+
+def test_valores_de_las_filas(subidor, fabrica, caso):
+    cursor = fabrica().cursor()
+    subidor._internar(cursor, [caso])
+    internador = subidor.internador
+
+    assert subidor._valores_expediente(caso) == (
+        "COM 012345/2019",
+        internador.id("jurisdicciones", caso["jurisdiccion"]),
+        internador.id("dependencias", caso["dependencia"]),
+        "EN LETRA",
+        caso["caratula"],
+    )
+
+    movimientos = subidor._valores_movimientos(7, caso)
+    assert len(movimientos) == 120
+    assert movimientos[0] == (
+        7, date(2021, 3, 11), internador.id("tipos_movimiento", "Despacho"), caso["registros_tabla"][0]["detalle"]
+    )
+
+    actor = internador.id("tipos_participante", "ACTOR")
+    demandado = internador.id("tipos_participante", "DEMANDADO")
+    assert actor != demandado
+    assert subidor._valores_participantes(7, caso) == (
+        [(7, actor, nombre) for nombre in caso["actores"]] +
+        [(7, demandado, nombre) for nombre in caso["demandados"]]
+    )
+
+
+def test_internar_reutiliza_los_ids(subidor, fabrica, caso):
+    cursor = fabrica().cursor()
+    subidor._internar(cursor, [caso])
+    consultas = subidor.internador.consultas
+    subidor._internar(cursor, [caso])
+
+    assert subidor.internador.consultas == consultas
+    assert fabrica.base.contar("tipos_participante") == 2
+
+
+def test_internador_descarta_lo_revertido(fabrica):
+    internador = InternadorDeValores()
+    conexion = fabrica()
+    cursor = conexion.cursor()
+    internador.resolver(cursor, "jurisdicciones", ["COM"])
+    internador.confirmar()
+    internador.resolver(cursor, "jurisdicciones", ["CIV", "COM"])
+    conexion.rollback()
+
+    internador.descartar()
+
+    assert set(internador.ids["jurisdicciones"]) == {"COM"}
+    assert internador.normalizar("  CIV ") == "CIV"
+    assert internador.normalizar(None) == ""
+
+def test_carga_por_lotes(tmp_path, fabrica, caso):
+    casos = copias(caso, 5)
+    ruta = escribir(tmp_path / "datos.jsonl", casos)
+
+    resumen = SubidorDeBaseDeDatos(CONFIG_DB, fabrica_conexion=fabrica).subir_expedientes(
+        ruta, modo=MODO_LOTES, tamano_lote=2
+    )
+
+    assert resumen["expedientes"]["insertados"] == 5
+    assert resumen["movimientos"]["insertados"] == 15
+    assert resumen["participantes"]["insertados"] == 25
+    # Cada movimiento quedó asociado al expediente del que proviene
+    filas = fabrica.base._conexion.execute(
+        "SELECT e.expediente, COUNT(*) FROM movimientos m JOIN expedientes e ON e.id = m.expediente_id "
+        "GROUP BY e.expediente ORDER BY e.expediente"
+    ).fetchall()
+    assert filas == [(c["expediente"], len(c["registros_tabla"])) for c in casos]
+
+def test_upsert_actualiza_solo_lo_nuevo(tmp_path, fabrica, caso):
+    subir = SubidorDeBaseDeDatos(CONFIG_DB, fabrica_conexion=fabrica).subir_expedientes
+
+    resumen = subir(escribir(tmp_path / "primera.jsonl", [caso]), modo=MODO_UPSERT)
+    assert resumen["expedientes"]["insertados"] == 1
+    assert resumen["movimientos"]["insertados"] == 120
+    assert resumen["participantes"]["insertados"] == 5
+    assert not (tmp_path / "primera.jsonl").exists()
+
+    actualizado = copy.deepcopy(caso)
+    actualizado["situacion_actual"] = "ARCHIVADO"
+    actualizado["registros_tabla"].append({"fecha": "Fecha: 01/06/2024", "tipo": "Archivo", "detalle": "SE ARCHIVA"})
+    resumen = subir(escribir(tmp_path / "segunda.jsonl", [actualizado]), modo=MODO_UPSERT)
+
+    assert resumen["expedientes"]["actualizados"] == 1
+    assert resumen["movimientos"]["insertados"] == 1
+    assert resumen["movimientos"]["sin_cambios"] == 120
+    assert resumen["participantes"]["sin_cambios"] == 5
+    assert fabrica.base.contar("expedientes") == 1
+    assert fabrica.base.contar("movimientos") == 121
+
+def test_rechazados(tmp_path, fabrica, caso):
+    ruta = escribir(tmp_path / "datos.jsonl", [caso, {"expediente": "SIN DATOS"}])
+
+    SubidorDeBaseDeDatos(CONFIG_DB, fabrica_conexion=fabrica).subir_expedientes(ruta, modo=MODO_UPSERT)
+
+    rechazos = list(leer_registros(ruta_derivada(ruta, "rechazados")))
+    assert [(r["numero"], r["registro"]) for r in rechazos] == [(2, {"expediente": "SIN DATOS"})]
+    assert fabrica.base.contar("expedientes") == 1
+
+@pytest.mark.parametrize("modo", [MODO_FILA, MODO_LOTES, MODO_UPSERT])
+def test_listas_nulas(tmp_path, fabrica, caso, modo):
+    vacio = dict(caso, expediente="COM 000001/2021", registros_tabla=None, actores=None, demandados=None)
+    ruta = escribir(tmp_path / "datos.jsonl", [vacio, caso])
+
+    resumen = SubidorDeBaseDeDatos(CONFIG_DB, fabrica_conexion=fabrica).subir_expedientes(ruta, modo=modo)
+
+    assert resumen["expedientes"]["insertados"] == 2
+    assert fabrica.base.contar("movimientos") == len(caso["registros_tabla"])
+    assert fabrica.base.contar("participantes") == len(caso["actores"]) + len(caso["demandados"])
@@ -0,0 +1,62 @@
+import copy
+
+import pytest
+
+from indice import ErrorDeIndice, IndiceInvertido, plegar, tokenizar
+
+@pytest.fixture
+def indice(tmp_path):
+    indice = IndiceInvertido(str(tmp_path / "indice.db"))
+    yield indice
+    indice.cerrar()
+
+@pytest.fixture
+def casos(caso):
+    otro = copy.deepcopy(caso)
+    otro["expediente"] = "CIV 000777/2022"
+    otro["caratula"] = "PEÑA, JUAN c/ FISCO NACIONAL s/ CONTAMINACIÓN AMBIENTAL"
+    otro["actores"] = ["PEÑA, JUAN"]
+    otro["registros_tabla"] = [{"fecha": "Fecha: 01/02/2022", "tipo": "Despacho", "detalle": "Contaminante vertido"}]
+    return [caso, otro]
+
+def test_plegar_y_tokenizar():
+    assert plegar("PEÑA Ñandubay Acción") == "pena nandubay accion"
+    assert tokenizar("Residuos del Sur S.A. c/ la Municipalidad") == ["residuos", "sur", "municipalidad"]
+
+def test_indexar_y_buscar(indice, casos):
+    assert indice.indexar(casos) == {"nuevos": 2, "actualizados": 0, "sin_cambios": 0, "omitidos": 0}
+
+    resultados = indice.buscar("fisco nacional")
+    assert {resultado["expediente"] for resultado in resultados} == {"COM 012345/2019", "CIV 000777/2022"}
+    # La carátula pesa más que los demandados
+    assert resultados[0]["expediente"] == "CIV 000777/2022"
+
+    assert [r["expediente"] for r in indice.buscar("peña")] == ["CIV 000777/2022"]
+    assert [r["expediente"] for r in indice.buscar("ÑANDUBAY residuos")] == ["COM 012345/2019"]
+    assert indice.buscar("residuos peña") == []
+
+def test_buscar_por_prefijo_y_campo(indice, casos):
+    indice.indexar(casos)
+
+    assert [r["expediente"] for r in indice.buscar("contamin*")] == ["CIV 000777/2022"]
+    assert [r["expediente"] for r in indice.buscar("contamin*", campos=["movimientos"])] == ["CIV 000777/2022"]
+    assert indice.buscar("residuos", campos=["demandados"]) == []
+    assert [termino for termino, _ in indice.completar("contam")] == ["contaminacion", "contaminante"]
+
+    with pytest.raises(ErrorDeIndice, match="Campos desconocidos"):
+        indice.buscar("residuos", campos=["domicilio"])
+
+def test_indexado_incremental(indice, casos):
+    indice.indexar(casos)
+    antes = indice.estadisticas()
+
+    cambiado = copy.deepcopy(casos[1])
+    cambiado["demandados"] = ["ESTADO NACIONAL"]
+    sin_numero = dict(casos[0], expediente="  ")
+
+    assert indice.indexar([casos[0], cambiado, sin_numero]) == {
+        "nuevos": 0, "actualizados": 1, "sin_cambios": 1, "omitidos": 1,
+    }
+    assert indice.estadisticas()["documentos"] == antes["documentos"]
+    assert [r["expediente"] for r in indice.buscar("fisco", campos=["demandados"])] == ["COM 012345/2019"]
+    assert [r["expediente"] for r in indice.buscar("estado")] == ["CIV 000777/2022"]
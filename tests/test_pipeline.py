@@ -0,0 +1,19 @@
+import time
+
+from pipeline import MetricasPipeline
+
+def test_metricas_conservan_pocas_latencias():
+    metricas = MetricasPipeline(muestras=10)
+    ahora = time.monotonic()
+
+    metricas.registrar_lote([ahora - 60.0], exitoso=True)
+    for _ in range(100):
+        metricas.registrar_lote([ahora, ahora], exitoso=True)
+    metricas.registrar_lote([ahora], exitoso=False)
+
+    resumen = metricas.resumen()
+    assert len(metricas._latencias) == 10
+    assert (resumen["confirmados"], resumen["fallidos"], resumen["lotes"]) == (201, 1, 102)
+    # El máximo es exacto aunque su muestra ya no esté entre las recientes
+    assert resumen["latencia_max_s"] >= 60.0
+    assert resumen["latencia_p95_s"] < 60.0
@@ -0,0 +1,113 @@
+import gzip
+import json
+
+import pytest
+
+from salida import (
+    ErrorDeSalida,
+    EscritorJSONL,
+    exportar_json_legado,
+    leer_arreglo_json,
+    leer_expedientes,
+    leer_registros,
+    ruta_derivada,
+    segmentos,
+)
+
+REGISTROS = [{"expediente": f"COM {numero:06d}/2020", "caratula": "PÉREZ c/ GÓMEZ s/ DAÑOS"} for numero in range(50)]
+
+def escribir(ruta, registros, **opciones):
+    with EscritorJSONL(str(ruta), fsync_segundos=None, **opciones) as escritor:
+        for registro in registros:
+            escritor.escribir(registro)
+
+@pytest.mark.parametrize("nombre, compresion", [("salida.jsonl", None), ("salida.jsonl.gz", "gzip")])
+def test_escribir_y_leer(tmp_path, nombre, compresion):
+    ruta = tmp_path / nombre
+    escribir(ruta, REGISTROS, compresion=compresion, tamano_buffer=64)
+
+    assert list(leer_registros(str(ruta))) == REGISTROS
+    if compresion == "gzip":
+        with gzip.open(ruta, "rt", encoding="utf-8") as archivo:
+            assert json.loads(archivo.readline()) == REGISTROS[0]
+
+def test_reabrir_anexa_al_archivo(tmp_path):
+    ruta = tmp_path / "salida.jsonl.gz"
+    escribir(ruta, REGISTROS[:10], compresion="gzip")
+    escribir(ruta, REGISTROS[10:], compresion="gzip")
+
+    assert list(leer_registros(str(ruta))) == REGISTROS
+
+def test_rotacion_por_tamano(tmp_path):
+    ruta = tmp_path / "salida.jsonl"
+    escribir(ruta, REGISTROS, tamano_buffer=1, rotar_bytes=500)
+
+    rutas = segmentos(str(ruta))
+    assert len(rutas) > 2
+    assert rutas[-1] == str(ruta)
+    assert rutas[0] == str(tmp_path / "salida.00001.jsonl")
+    assert list(leer_registros(str(ruta))) == REGISTROS
+
+def test_rotacion_cuenta_el_archivo_existente(tmp_path):
+    ruta = tmp_path / "salida.jsonl"
+    escribir(ruta, REGISTROS[:20])
+    tamano = ruta.stat().st_size
+
+    # Al reanudar, el segmento activo ya supera el límite: rota antes de anexar
+    escribir(ruta, REGISTROS[20:21], tamano_buffer=1, rotar_bytes=tamano)
+
+    rutas = segmentos(str(ruta))
+    assert rutas == [str(tmp_path / "salida.00001.jsonl"), str(ruta)]
+    assert list(leer_registros(rutas[0])) == REGISTROS[:20]
+    assert list(leer_registros(str(ruta))) == REGISTROS[:21]
+
+def test_linea_invalida(tmp_path):
+    ruta = tmp_path / "salida.jsonl"
+    ruta.write_text('{"expediente": "A"}\n{"expediente": \n', encoding="utf-8")
+
+    with pytest.raises(ErrorDeSalida, match=":2"):
+        list(leer_registros(str(ruta)))
+
+def test_leer_arreglo_json_por_bloques(tmp_path):
+    ruta = tmp_path / "expedientes.json"
+    ruta.write_text(json.dumps(REGISTROS, ensure_ascii=False, indent=4), encoding="utf-8")
+
+    # Bloques más chicos que un elemento obligan a leer más en medio de un registro
+    assert list(leer_arreglo_json(str(ruta), tamano_bloque=16)) == REGISTROS
+
+@pytest.mark.parametrize("contenido", ['[{"expediente": "A"}, {"expediente": ', '{"expediente": "A"}'])
+def test_leer_arreglo_json_invalido(tmp_path, contenido):
+    ruta = tmp_path / "expedientes.json"
+    ruta.write_text(contenido, encoding="utf-8")
+
+    with pytest.raises(ErrorDeSalida):
+        list(leer_arreglo_json(str(ruta)))
+
+def test_leer_expedientes_detecta_el_formato(tmp_path):
+    legado = tmp_path / "expedientes.json"
+    legado.write_text(json.dumps(REGISTROS[:3]), encoding="utf-8")
+    lineas = tmp_path / "expedientes.txt"
+    lineas.write_text("".join(json.dumps(registro) + "\n" for registro in REGISTROS[:3]), encoding="utf-8")
+
+    assert list(leer_expedientes(str(legado))) == REGISTROS[:3]
+    assert list(leer_expedientes(str(lineas))) == REGISTROS[:3]
+
+def test_exportar_json_legado(tmp_path):
+    origen = tmp_path / "salida.jsonl"
+    destino = tmp_path / "expedientes.json"
+    escribir(origen, REGISTROS)
+
+    assert exportar_json_legado(str(origen), str(destino)) == len(REGISTROS)
+    assert destino.read_text(encoding="utf-8") == json.dumps(REGISTROS, ensure_ascii=False, indent=4)
+
+def test_exportar_json_legado_vacio(tmp_path):
+    origen = tmp_path / "salida.jsonl"
+    origen.write_text("", encoding="utf-8")
+    destino = tmp_path / "expedientes.json"
+
+    assert exportar_json_legado(str(origen), str(destino)) == 0
+    assert json.loads(destino.read_text(encoding="utf-8")) == []
+
+def test_ruta_derivada():
+    assert ruta_derivada("src/expedientes.jsonl.gz", "rechazados") == "src/expedientes.rechazados.jsonl"
+    assert ruta_derivada("src/expedientes.json", "rechazados") == "src/expedientes.rechazados.jsonl"
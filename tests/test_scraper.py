@@ -0,0 +1,60 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+import scraper
+from estado import EstadoDeRastreo
+
+def fila(numero, expediente, tiene_enlace=True):
+    return {
+        "fila": numero,
+        "expediente": expediente,
+        "situacion": "EN LETRA",
+        "ultima_actualizacion": "11/03/2021",
+        "id_enlace": f"enlace{numero}",
+        "tiene_enlace": tiene_enlace,
+    }
+
+@pytest.fixture
+def pagina_simulada(monkeypatch):
+    """
+    Reemplaza el acceso al navegador de procesar_pagina por una instantánea fija.
+
+    'COM 4' ya no está en su fila al volver a ubicarla y abrir 'COM 5' vence el tiempo de espera.
+    """
+    filas = [fila(0, "COM 1"), fila(1, "COM 2", tiene_enlace=False), fila(2, "COM 3"), fila(3, "COM 4"), fila(4, "COM 5")]
+    abiertos = []
+
+    def abrir_y_extraer(driver, icono_ver, motor):
+        abiertos.append(icono_ver)
+        if icono_ver == "COM 5":
+            raise TimeoutException("sin respuesta")
+        return {"expediente": icono_ver}
+
+    monkeypatch.setattr(scraper, "esperar", lambda *args, **kwargs: None)
+    monkeypatch.setattr(scraper, "asegurar_tabla", lambda driver: None)
+    monkeypatch.setattr(scraper, "leer_filas_resultados", lambda driver: filas)
+    monkeypatch.setattr(
+        scraper, "ubicar_icono_de_fila", lambda driver, f: None if f["expediente"] == "COM 4" else f["expediente"]
+    )
+    monkeypatch.setattr(scraper, "abrir_y_extraer", abrir_y_extraer)
+    return abiertos
+
+def test_procesar_pagina_informa_cada_fila(tmp_path, pagina_simulada, capsys):
+    estado = EstadoDeRastreo(str(tmp_path / "rastreo.db"))
+    try:
+        progreso = estado.iniciar_corrida("residuos", "10")
+        progreso.registrar_expediente("COM 3", 2)
+
+        assert scraper.procesar_pagina(None, progreso=progreso, pagina=0) == 1
+
+        # Las filas sin enlace o ya extraídas no se abren
+        assert pagina_simulada == ["COM 1", "COM 5"]
+        assert progreso.ya_extraido("COM 1")
+        assert [(f, expediente) for _, f, expediente, _ in estado.fallos_de_corrida(progreso.corrida_id)] == [
+            (3, "COM 4"), (4, "COM 5"),
+        ]
+        salida = capsys.readouterr().out
+        assert "Página 1: 1 expedientes extraídos, 2 filas omitidas, 2 fallidas" in salida
+        assert "Fila 5 (COM 5) fallida: TimeoutException" in salida
+    finally:
+        estado.cerrar()
@@ -0,0 +1,43 @@
+import trabajadores
+
+class DriverSimulado:
+    """Driver con la sesión mínima que usa ejecutar_pool."""
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.current_url = "http://scw.pjn.gov.ar/scw/expediente.seam"
+        self.pagina = 0
+
+    def get_cookies(self):
+        return [{"name": "JSESSIONID", "value": "abc"}]
+
+def test_reemplazos_del_principal_se_cierran(monkeypatch):
+    principal = DriverSimulado("principal")
+    creados, cerrados, errores = [], [], []
+
+    def crear_driver():
+        creados.append(DriverSimulado(f"reemplazo {len(creados) + 1}"))
+        return creados[-1]
+
+    def avanzar_paginas(driver, cantidad):
+        driver.pagina += cantidad
+        return driver.pagina < 3
+
+    def procesar_pagina(driver, motor, progreso, pagina):
+        # La página 1 falla en el principal y en su primer reemplazo
+        if pagina == 1 and len(errores) < 2:
+            errores.append(driver.nombre)
+            raise RuntimeError("sesión expirada")
+        return 1
+
+    monkeypatch.setattr(trabajadores, "avanzar_paginas", avanzar_paginas)
+    monkeypatch.setattr(trabajadores, "procesar_pagina", procesar_pagina)
+    monkeypatch.setattr(trabajadores, "restaurar_sesion", lambda driver, url, cookies: None)
+    monkeypatch.setattr(trabajadores, "cerrar_driver", lambda driver: cerrados.append(driver.nombre))
+
+    (estadisticas,) = trabajadores.ejecutar_pool(principal, 1, crear_driver=crear_driver, reintentos=2)
+
+    assert errores == ["principal", "reemplazo 1"]
+    assert (estadisticas.paginas, estadisticas.abandonada) == (3, None)
+    # El principal lo cierra quien inició la corrida; cada reemplazo se cierra una vez
+    assert sorted(cerrados) == ["reemplazo 1", "reemplazo 2"]